@@ -1,5 +1,6 @@
 import time
-import json
+import os
+import sys
 import random
 import re
 from selenium import webdriver
@@ -13,6 +14,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, fanout, memory, metrics, pagination, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = "div[data-component-type='s-search-result']"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -31,8 +39,13 @@ def setup_driver():
     
     chrome_options.add_argument("--log-level=3")
     
+    profile, profile_args = profiles.chrome_arguments("amazon")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("amazon")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     
 
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -44,36 +57,18 @@ def scroll_amazon(driver):
     Scroll aleatorio y humano para Amazon.
     """
     print("   -> Comportamiento humano: Bajando para ver productos...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    
-
-    current_pos = 0
-    while current_pos < last_height:
-        step = random.randint(400, 800)
-        current_pos += step
-        driver.execute_script(f"window.scrollTo(0, {current_pos});")
-        time.sleep(random.uniform(0.1, 0.4))
-        
-
-        if current_pos > last_height * 0.8:
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1.5)
+    scrolling.scroll("amazon", driver)
 
 def extract_page_data(html_content):
     """
     Extrae datos de Amazon manejando su estructura de rejilla (Grid).
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    page_products = []
-
-
-    if "Enter the characters you see below" in soup.get_text() or "Robot Check" in soup.title.string:
+    if blocks.detect("amazon", html_content).blocked:
         print("   !!! ALERTA: Amazon detectó tráfico inusual (CAPTCHA). !!!")
         return []
 
-
+    soup = BeautifulSoup(html_content, 'html.parser')
+    page_products = []
 
     cards = soup.select('div[data-component-type="s-search-result"]')
 
@@ -133,73 +128,113 @@ def extract_page_data(html_content):
         
     return page_products
 
+def scrape_page(driver, url):
+    """
+    Carga una página de resultados, espera los productos, hace scroll y extrae.
+    Lanza PageBlocked (vía core.blocks) si Amazon responde con su página de CAPTCHA.
+    """
+    with metrics.timer("amazon", "load"):
+        driver.get(url)
+
+    time.sleep(random.uniform(2, 4))
+
+    try:
+        with metrics.timer("amazon", "wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+            )
+    except TimeoutException:
+        metrics.count("timeouts", "amazon")
+        print("   -> Alerta: No se detectaron productos. Verificando posible CAPTCHA...")
+
+    blocks.check("amazon", driver)
+
+    with metrics.timer("amazon", "scroll"):
+        scroll_amazon(driver)
+
+    with metrics.timer("amazon", "parse"):
+        products = extract_page_data(driver.page_source)
+    metrics.record_page("amazon", len(products))
+    memory.check("amazon", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+TOTAL_PAGES = 10  # tope mientras no se detecte la paginación real
+
+LISTING = "/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&language=es"
+
+
+def page_url(page):
+    return sites.base_url("amazon") + f"{LISTING}&page={page}"
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): una por página hasta el tope.
+    """
+    return [(page_url(page),) for page in range(1, TOTAL_PAGES + 1)]
+
+
 def main():
 
-    urls = [
-        "https://www.amazon.com/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&language=es&ref=lp_565108_sar",
-        "https://www.amazon.com/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=2&language=es&qid=1764484056&xpid=KnbWhSpQY3doM&ref=sr_pg_2",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=3&language=es&qid=1764484803&xpid=KnbWhSpQY3doM&ref=sr_pg_3",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=4&language=es&qid=1764485164&xpid=YFF_xqLNeb_f6&ref=sr_pg_4",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=5&language=es&qid=1764485172&xpid=YFF_xqLNeb_f6&ref=sr_pg_5",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=6&language=es&qid=1764485180&xpid=YFF_xqLNeb_f6&ref=sr_pg_6",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=7&language=es&qid=1764485224&xpid=YFF_xqLNeb_f6&ref=sr_pg_7",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=8&language=es&qid=1764485233&xpid=YFF_xqLNeb_f6&ref=sr_pg_8",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=9&language=es&qid=1764485240&xpid=YFF_xqLNeb_f6&ref=sr_pg_9",
-        "https://www.amazon.com/-/es/s?i=computers&rh=n%3A565108&s=popularity-rank&fs=true&page=10&language=es&qid=1764485248&xpid=YFF_xqLNeb_f6&ref=sr_pg_10"
-    ]
+    n_workers = fanout.workers("amazon")
     
-    all_products = []
+    run = Run("amazon")
     driver = None
 
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = setup_driver()
+
     try:
         print("--- Iniciando Scraping Amazon (Modo Ninja) ---")
         driver = setup_driver()
 
-        for i, url in enumerate(urls):
-            print(f"\nProcesando Página {i+1}/10: {url}")
+        pager = pagination.Paginator("amazon", page_url, max_pages=TOTAL_PAGES)
+        for page, url in pager:
+            print(f"\nProcesando Página {pager.label()}: {url}")
             
             try:
-                driver.get(url)
-                
-
-                time.sleep(random.uniform(2, 4))
-                
-
-                try:
-                    WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-component-type='s-search-result']"))
-                    )
-                except TimeoutException:
-                    print("   -> Alerta: No se detectaron productos. Verificando posible CAPTCHA...")
-                
-
-                scroll_amazon(driver)
-                
-
-                current_products = extract_page_data(driver.page_source)
+                current_products = retry.call("amazon", lambda: scrape_page(driver, url), recover=restart_driver)
                 print(f"   -> Encontrados: {len(current_products)} productos.")
+                if not pager.accept(current_products, driver):
+                    break
                 
-                if len(current_products) == 0:
-
-
-                    print("   -> Fallo en extracción. Posible bloqueo.")
-                else:
-                    all_products.extend(current_products)
+                run.add(current_products)
+                if n_workers > 1 and pager.last_page:
+                    handed, driver = driver, None
+                    fanout.run_pages("amazon", pager, scrape_page, setup_driver, n_workers, run, driver=handed)
+                    break
                 
 
                 wait_time = random.uniform(5, 8)
                 print(f"   -> Esperando {wait_time:.1f}s antes de la siguiente página...")
                 time.sleep(wait_time)
 
+            except retry.EmptyPage:
+                print("   -> Página sin productos: fin de la paginación.")
+                break
+            except (retry.PageBlocked, retry.CircuitOpen) as e:
+                print(f"   -> Tienda bloqueada ({e}). Se detiene el scraping.")
+                run.fail(e)
+                break
             except Exception as e:
-                print(f"   -> Error en página {i+1}: {e}")
+                print(f"   -> Error en página {page}: {e}")
+                run.fail(e)
 
 
         output_file = 'amazon_laptops.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN: Se extrajeron {len(all_products)} productos en total.")
+        print(f"\nRESUMEN: Se extrajeron {len(run.products)} productos en total.")
         print(f"Archivo guardado: {output_file}")
 
     except Exception as e:
@@ -1,5 +1,6 @@
 import time
-import json
+import os
+import sys
 import random
 import re
 from selenium import webdriver
@@ -13,6 +14,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, fanout, memory, metrics, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = "div[class*='ProductCardNormalGrid__productCardContainer']"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -23,8 +31,13 @@ def setup_driver():
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
     chrome_options.add_argument("--log-level=3")
     
+    profile, profile_args = profiles.chrome_arguments("asus")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("asus")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     return driver
 
 def scroll_asus(driver):
@@ -33,26 +46,7 @@ def scroll_asus(driver):
     ASUS carga muchas imágenes de alta calidad, es vital bajar lento.
     """
     print("   -> Bajando para cargar catálogo ASUS...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    
-
-    step = 400
-    for pos in range(0, last_height, step):
-        driver.execute_script(f"window.scrollTo(0, {pos});")
-        time.sleep(0.1)
-        
-
-
-        if pos % 1500 == 0:
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height > last_height:
-                last_height = new_height
-
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2)
-
-    driver.execute_script("window.scrollBy(0, -600);") 
-    time.sleep(1)
+    scrolling.scroll("asus", driver)
 
 def extract_category_data(html_content, category_name):
     """
@@ -140,67 +134,109 @@ def extract_category_data(html_content, category_name):
         
     return page_products
 
+def scrape_page(driver, url, category):
+    """
+    Carga una categoría, espera los productos, hace scroll y extrae.
+    """
+    with metrics.timer("asus", "load"):
+        driver.get(url)
+
+    try:
+        with metrics.timer("asus", "wait"):
+            WebDriverWait(driver, 25).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+            )
+    except TimeoutException:
+        metrics.count("timeouts", "asus")
+        print(f"   -> Alerta: No se detectaron productos en {category} (Timeout).")
+
+    blocks.check("asus", driver)
+
+    with metrics.timer("asus", "scroll"):
+        scroll_asus(driver)
+
+    with metrics.timer("asus", "parse"):
+        products = extract_category_data(driver.page_source, category)
+    metrics.record_page("asus", len(products))
+    memory.check("asus", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+CATEGORIES = [
+    ("ROG Zephyrus", "/pe/laptops/for-gaming/rog-republic-of-gamers/filter?SubSeries=ROG-Zephyrus"),
+    ("ROG Flow", "/pe/laptops/for-gaming/rog-republic-of-gamers/filter?SubSeries=ROG-Flow"),
+    ("ROG Strix", "/pe/laptops/for-gaming/rog-republic-of-gamers/filter?SubSeries=ROG-Strix"),
+]
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): (url, categoría).
+    """
+    origin = sites.base_url("asus")
+    return [(origin + path, name) for name, path in CATEGORIES]
+
+
 def main():
 
-    categories = [
-        {
-            "name": "ROG Zephyrus",
-            "url": "https://www.asus.com/pe/laptops/for-gaming/rog-republic-of-gamers/filter?SubSeries=ROG-Zephyrus"
-        },
-        {
-            "name": "ROG Flow",
-            "url": "https://www.asus.com/pe/laptops/for-gaming/rog-republic-of-gamers/filter?SubSeries=ROG-Flow"
-        },
-        {
-            "name": "ROG Strix",
-            "url": "https://www.asus.com/pe/laptops/for-gaming/rog-republic-of-gamers/filter?SubSeries=ROG-Strix"
-        }
-    ]
+    categories = [{"name": name, "url": url} for url, name in listing_units()]
     
-    all_products = []
+    run = Run("asus")
     driver = None
+    n_workers = fanout.workers("asus")
 
-    try:
-        print("--- Iniciando Scraping ASUS ROG (Por Categorías) ---")
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
         driver = setup_driver()
 
-        for cat in categories:
-            print(f"\nProcesando Categoría: {cat['name']}")
-            print(f"URL: {cat['url']}")
+    try:
+        print("--- Iniciando Scraping ASUS ROG (Por Categorías) ---")
+        if n_workers > 1:
+            print(f"Repartiendo {len(categories)} categorías entre {n_workers} navegadores...")
+            results = fanout.run("asus", [(cat['url'], cat['name']) for cat in categories], scrape_page, setup_driver, n_workers)
+            for current_products in results:
+                if current_products is None:
+                    run.fail("unidad fallida en el reparto")
+                else:
+                    run.add(current_products)
+        else:
+            driver = setup_driver()
+            for cat in categories:
+                print(f"\nProcesando Categoría: {cat['name']}")
+                print(f"URL: {cat['url']}")
             
-            try:
-                driver.get(cat['url'])
-                
-
-
                 try:
-                    WebDriverWait(driver, 25).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='ProductCardNormalGrid__productCardContainer']"))
-                    )
-                except TimeoutException:
-                    print(f"   -> Alerta: No se detectaron productos en {cat['name']} (Timeout).")
-                
-
-                scroll_asus(driver)
-                
-
-                current_products = extract_category_data(driver.page_source, cat['name'])
-                print(f"   -> Encontrados: {len(current_products)} productos.")
+                    current_products = retry.call("asus", lambda: scrape_page(driver, cat['url'], cat['name']), recover=restart_driver)
+                    print(f"   -> Encontrados: {len(current_products)} productos.")
                 
-                all_products.extend(current_products)
+                    run.add(current_products)
                 
 
-                time.sleep(random.uniform(3, 6))
+                    time.sleep(random.uniform(3, 6))
 
-            except Exception as e:
-                print(f"   -> Error en categoría {cat['name']}: {e}")
+                except retry.EmptyPage:
+                    print("   -> Categoría sin productos.")
+                except (retry.PageBlocked, retry.CircuitOpen) as e:
+                    print(f"   -> Tienda bloqueada ({e}). Se detiene el scraping.")
+                    run.fail(e)
+                    break
+                except Exception as e:
+                    print(f"   -> Error en categoría {cat['name']}: {e}")
+                    run.fail(e)
 
 
         output_file = 'asus_rog_laptops.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN: Se extrajeron {len(all_products)} productos en total.")
+        print(f"\nRESUMEN: Se extrajeron {len(run.products)} productos en total.")
         print(f"Archivo guardado: {output_file}")
 
     except Exception as e:
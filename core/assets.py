@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # sin Pillow se descargan los originales pero no se generan miniaturas
+    Image = None
+
+from core import metrics
+from core.enrich import Fetcher
+from core.images import NO_IMAGE, is_placeholder
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_DOMAIN = 8
+DEFAULT_TTL_HOURS = 24
+MAX_BYTES = 15 * 1024 * 1024
+THUMB_SIZES = (160, 400)
+THUMB_QUALITY = 82
+BATCH_SIZE = 200
+# Formatos que Pillow no abre: se guardan sin miniaturas y se marcan para no reintentarlos
+# (lo mismo pasa con cualquier archivo cuya miniatura falla).
+NO_THUMB_EXTS = ("svg", "avif")
+NO_THUMBS = -1
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/avif": "avif",
+    "image/svg+xml": "svg",
+}
+
+# urls: una fila por URL de imagen (validadores HTTP y a qué contenido apunta).
+# blobs: una fila por contenido distinto (sha256); varias URLs / tiendas comparten el mismo blob.
+# blobs.thumbs: miniaturas generadas, 0 = pendientes, NO_THUMBS = no admite miniaturas (formato o archivo roto).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url           TEXT PRIMARY KEY,
+    sha256        TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    status        INTEGER,
+    checked_at    REAL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256     TEXT PRIMARY KEY,
+    ext        TEXT,
+    bytes      INTEGER,
+    width      INTEGER,
+    height     INTEGER,
+    thumbs     INTEGER NOT NULL DEFAULT 0,
+    created_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_sha ON urls (sha256);
+"""
+
+URL_UPSERT_SQL = """
+INSERT INTO urls (url, sha256, etag, last_modified, status, checked_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    sha256 = excluded.sha256,
+    etag = excluded.etag,
+    last_modified = excluded.last_modified,
+    status = excluded.status,
+    checked_at = excluded.checked_at
+"""
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def normalize_url(url):
+    url = (url or "").strip()
+    return "https:" + url if url.startswith("//") else url
+
+
+def object_path(sha, ext):
+    return os.path.join("objects", sha[:2], f"{sha}.{ext}")
+
+
+def thumb_path(sha, size):
+    return os.path.join("thumbs", sha[:2], f"{sha}_{size}.jpg")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def make_thumbnails(root, sha, ext, sizes=THUMB_SIZES):
+    """
+    Corre en el pool de procesos: abre el original y escribe una miniatura JPEG por tamaño
+    (lado mayor = size, sin agrandar). Devuelve (ancho, alto, miniaturas generadas).
+    """
+    if ext in NO_THUMB_EXTS:
+        return None, None, NO_THUMBS
+    if Image is None:
+        return None, None, 0
+    with Image.open(os.path.join(root, object_path(sha, ext))) as img:
+        width, height = img.size
+        img = img.convert("RGB")
+        made = 0
+        for size in sizes:
+            target = os.path.join(root, thumb_path(sha, size))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            thumb = img.copy()
+            thumb.thumbnail((size, size))
+            thumb.save(target + ".tmp", "JPEG", quality=THUMB_QUALITY, optimize=True)
+            os.replace(target + ".tmp", target)
+            made += 1
+    return width, height, made
+
+
+class AssetStore:
+    """
+    Espejo local de imágenes: originales en objects/ por sha256, miniaturas en thumbs/
+    y un índice SQLite (assets.db) con URLs, validadores y blobs.
+    """
+
+    def __init__(self, root="imagenes"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, "assets.db"))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _select_in(self, table, column, keys):
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), BATCH_SIZE):
+            chunk = keys[i:i + BATCH_SIZE]
+            marks = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT * FROM {table} WHERE {column} IN ({marks})", chunk):
+                found[row[column]] = row
+        return found
+
+    def urls(self, urls):
+        return self._select_in("urls", "url", urls)
+
+    def blobs(self, shas):
+        return self._select_in("blobs", "sha256", shas)
+
+    def has_blob(self, sha):
+        return self.conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (sha,)).fetchone() is not None
+
+    def write_object(self, sha, ext, data):
+        _write_atomic(os.path.join(self.root, object_path(sha, ext)), data)
+
+    def add_blob(self, sha, ext, size):
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO blobs (sha256, ext, bytes, created_at) VALUES (?, ?, ?, ?)",
+                              (sha, ext, size, time.time()))
+
+    def set_thumbs(self, sha, width, height, made):
+        with self.conn:
+            self.conn.execute("UPDATE blobs SET width = ?, height = ?, thumbs = ? WHERE sha256 = ?",
+                              (width, height, made, sha))
+
+    def put_urls(self, rows):
+        with self.conn:
+            self.conn.executemany(URL_UPSERT_SQL, rows)
+
+    def stats(self):
+        urls = self.conn.execute("SELECT COUNT(*), COUNT(DISTINCT sha256) FROM urls WHERE status = 200").fetchone()
+        blobs = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0), SUM(thumbs > 0) FROM blobs").fetchone()
+        return {"urls": urls[0], "distinct_contents": urls[1], "blobs": blobs[0],
+                "mb": round(blobs[1] / 1e6, 1), "with_thumbs": blobs[2] or 0}
+
+
+async def _mirror_async(store, products, assets, limit, per_domain, ttl, procs):
+    started = time.perf_counter()
+    now = time.time()
+    stats = {"products": len(products), "urls": 0, "fresh": 0, "downloaded": 0, "not_modified": 0,
+             "new_blobs": 0, "duplicate_blobs": 0, "thumbnails": 0, "failed": 0}
+
+    # Dedup por URL: varios productos (o tiendas) con la misma imagen la piden una sola vez.
+    groups = {}
+    for item in products:
+        url = normalize_url(item.get("image_url"))
+        if url and url != NO_IMAGE and url.startswith("http") and not is_placeholder(url):
+            groups.setdefault(url, []).append(item)
+    stats["urls"] = len(groups)
+
+    known = assets.urls(groups)
+    resolved = {}
+    pending = []
+    for url in groups:
+        row = known.get(url)
+        if row is not None and now - (row["checked_at"] or 0) < ttl * 3600:
+            # Dentro del TTL no se pide nada, tampoco las que fallaron (404, no eran imagen...).
+            if row["status"] == 200:
+                resolved[url] = row["sha256"]
+            stats["fresh"] += 1
+        else:
+            pending.append((url, row))
+
+    rows = []
+    written = set()
+    thumb_jobs = []
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=procs) if Image is not None and procs > 0 else None
+
+    def queue_thumbs(sha, ext):
+        if ext in NO_THUMB_EXTS:
+            # No hace falta pasar por el pool: se marca y no vuelve a la cola.
+            assets.set_thumbs(sha, None, None, NO_THUMBS)
+        elif pool is not None:
+            thumb_jobs.append((sha, loop.run_in_executor(pool, make_thumbnails, assets.root, sha, ext)))
+
+    async def fetch(fetcher, url, row):
+        headers = {}
+        if row is not None and row["status"] == 200:
+            if row["etag"]:
+                headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                headers["If-Modified-Since"] = row["last_modified"]
+        try:
+            status, response_headers, body = await fetcher.get(url, headers)
+        except Exception as e:
+            stats["failed"] += 1
+            metrics.count("image_errors", store)
+            print(f"   -> Imagen no disponible {url}: {e}")
+            return
+
+        if status == 304 and row is not None:
+            stats["not_modified"] += 1
+            metrics.count("images_not_modified", store)
+            resolved[url] = row["sha256"]
+            rows.append((url, row["sha256"], row["etag"], row["last_modified"], 200, time.time()))
+            return
+
+        content_type = (response_headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if status != 200 or not content_type.startswith("image/") or not body or len(body) > MAX_BYTES:
+            stats["failed"] += 1
+            metrics.count("image_errors", store)
+            rows.append((url, None, None, None, status, time.time()))
+            return
+
+        stats["downloaded"] += 1
+        metrics.count("images_downloaded", store)
+        # El hash de 15 MB en el loop frena las demás descargas: se calcula en un hilo.
+        sha = await asyncio.to_thread(lambda: hashlib.sha256(body).hexdigest())
+        ext = EXTENSIONS.get(content_type, content_type.split("/")[-1])
+        # SQLite solo se toca desde el loop; el archivo se escribe en un hilo. `written` evita
+        # que dos URLs con el mismo contenido que terminan a la vez lo guarden dos veces.
+        if sha in written or assets.has_blob(sha):
+            stats["duplicate_blobs"] += 1
+        else:
+            written.add(sha)
+            await asyncio.to_thread(assets.write_object, sha, ext, body)
+            assets.add_blob(sha, ext, len(body))
+            stats["new_blobs"] += 1
+            queue_thumbs(sha, ext)
+        resolved[url] = sha
+        rows.append((url, sha, response_headers.get("ETag"), response_headers.get("Last-Modified"), 200, time.time()))
+
+    try:
+        if pending:
+            async with Fetcher(limit, per_domain=per_domain, binary=True) as fetcher:
+                tasks = [asyncio.create_task(fetch(fetcher, url, row)) for url, row in pending]
+                for i in range(0, len(tasks), BATCH_SIZE):
+                    await asyncio.gather(*tasks[i:i + BATCH_SIZE])
+                    if rows:
+                        assets.put_urls(rows)
+                        rows.clear()
+
+        # Blobs que quedaron sin miniaturas (p. ej. bajados cuando Pillow no estaba instalado).
+        # Los marcados con NO_THUMBS no se vuelven a encolar.
+        if pool is not None:
+            queued = {sha for sha, _ in thumb_jobs}
+            for sha, blob in assets.blobs(set(resolved.values()) - queued).items():
+                if blob["thumbs"] == 0:
+                    queue_thumbs(sha, blob["ext"])
+
+        for sha, job in thumb_jobs:
+            try:
+                width, height, made = await job
+            except Exception as e:
+                # Pillow no lo abre (heic, ico, cuerpo truncado o corrupto): se marca igual que
+                # svg/avif para no mandarlo al pool en cada corrida.
+                print(f"   -> Miniatura fallida {sha[:12]}: {e}")
+                assets.set_thumbs(sha, None, None, NO_THUMBS)
+                continue
+            assets.set_thumbs(sha, width, height, made)
+            stats["thumbnails"] += max(made, 0)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    blobs = assets.blobs(set(resolved.values()))
+    for url, items in groups.items():
+        blob = blobs.get(resolved.get(url))
+        if blob is None:
+            continue
+        for item in items:
+            item["image_sha256"] = blob["sha256"]
+            item["image_file"] = object_path(blob["sha256"], blob["ext"])
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def mirror_images(store, products, root=None, limit=None, per_domain=None, ttl=None, procs=None):
+    """
+    Descarga las imágenes de los productos al espejo local y agrega image_sha256 e image_file
+    (relativo al espejo). Una URL ya vista dentro del TTL no se pide; si pasó el TTL se pide con
+    If-None-Match / If-Modified-Since. El contenido se guarda una sola vez por sha256 aunque
+    venga de varias URLs o tiendas, y las miniaturas se generan en un pool de procesos.
+    """
+    root = root or os.environ.get("SCRAPER_IMAGES_DIR") or "imagenes"
+    limit = limit or _env_int("SCRAPER_IMAGES_CONCURRENCY", DEFAULT_CONCURRENCY)
+    per_domain = per_domain or _env_int("SCRAPER_IMAGES_PER_DOMAIN", DEFAULT_PER_DOMAIN)
+    ttl = ttl if ttl is not None else float(os.environ.get("SCRAPER_IMAGES_TTL_HOURS") or DEFAULT_TTL_HOURS)
+    procs = procs if procs is not None else _env_int("SCRAPER_IMAGES_PROCS", os.cpu_count() or 1)
+
+    with AssetStore(root) as assets:
+        stats = asyncio.run(_mirror_async(store, products, assets, limit, per_domain, ttl, procs))
+    if Image is None:
+        print("   -> Pillow no está instalado: se guardan los originales sin miniaturas.")
+    print(f"Imágenes ({store}): {stats['urls']} URLs, {stats['fresh']} al día, {stats['downloaded']} descargadas, "
+          f"{stats['not_modified']} sin cambios (304), {stats['new_blobs']} nuevas, "
+          f"{stats['duplicate_blobs']} repetidas por contenido, {stats['thumbnails']} miniaturas, "
+          f"{stats['failed']} fallidas en {stats['seconds']}s.")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Espejo local de las imágenes de producto.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Descarga las imágenes de *_laptops.json (se reescriben en el lugar).")
+    run.add_argument("store")
+    run.add_argument("json_files", nargs="+")
+    run.add_argument("--dir", default=None, help="Carpeta del espejo (default SCRAPER_IMAGES_DIR o imagenes).")
+    run.add_argument("--concurrency", type=int, default=None)
+    run.add_argument("--ttl-hours", type=float, default=None)
+    run.add_argument("--procs", type=int, default=None, help="Procesos para miniaturas (0 = ninguna).")
+
+    stats = sub.add_parser("stats", help="Resumen del espejo.")
+    stats.add_argument("--dir", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        with AssetStore(args.dir or os.environ.get("SCRAPER_IMAGES_DIR") or "imagenes") as assets:
+            print(json.dumps(assets.stats(), indent=4))
+        return
+
+    for path in args.json_files:
+        with open(path, encoding='utf-8') as f:
+            products = json.load(f)
+        mirror_images(args.store, products, args.dir, args.concurrency, ttl=args.ttl_hours, procs=args.procs)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(products, f, indent=4, ensure_ascii=False)
+        print(f"{path}: {len(products)} productos.")
+
+
+if __name__ == "__main__":
+    main()
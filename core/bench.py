@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import platform
+import queue
+import statistics
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from core import plugins
+from core.mock_server import FIXTURES_DIR, MockConfig, start_server
+
+READY_TIMEOUT = 20
+SAMPLE_INTERVAL = 0.5
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+
+def page_units(stores, mock_url, fixtures=FIXTURES_DIR, repeat=1):
+    """
+    Lista de (tienda, url) a partir de los manifests grabados.
+    """
+    units = []
+    for store in stores:
+        with open(os.path.join(fixtures, store, "manifest.json"), encoding='utf-8') as f:
+            manifest = json.load(f)
+        for route in manifest["pages"]:
+            units.append((store, f"{mock_url}/{store}{route}"))
+    return units * repeat
+
+
+class ProcessSampler:
+    """
+    Mide RSS pico y CPU del árbol de procesos de cada driver (chromedriver + Chrome).
+    Requiere psutil (requirements.txt).
+    """
+
+    def __init__(self):
+        if psutil is None:
+            raise RuntimeError("core.bench requiere psutil para medir RSS y CPU (pip install -r requirements.txt).")
+        self.drivers = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def watch(self, worker_id, driver):
+        try:
+            process = driver.process if hasattr(driver, "process") else driver.service.process
+            root = psutil.Process(process.pid)
+        except Exception:
+            return
+        self.drivers[worker_id] = {"root": root, "peak_rss": 0, "cpu": {}}
+
+    def _tree(self, root):
+        try:
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def sample(self):
+        for info in self.drivers.values():
+            rss = 0
+            for proc in self._tree(info["root"]):
+                try:
+                    rss += proc.memory_info().rss
+                    times = proc.cpu_times()
+                    info["cpu"][proc.pid] = times.user + times.system
+                except psutil.Error:
+                    continue
+            info["peak_rss"] = max(info["peak_rss"], rss)
+
+    def _run(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+            self.sample()
+
+    def report(self):
+        result = {}
+        for worker_id, info in self.drivers.items():
+            result[worker_id] = {
+                "peak_rss_mb": round(info["peak_rss"] / 1048576, 1),
+                "cpu_s": round(sum(info["cpu"].values()), 2),
+            }
+        return result
+
+
+def _worker(worker_id, driver, units, results):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    while True:
+        try:
+            store, url = units.get_nowait()
+        except queue.Empty:
+            return
+
+        plugin = plugins.get(store)
+        record = {"worker": worker_id, "store": store, "url": url, "error": None}
+        start = time.perf_counter()
+        try:
+            driver.get(url)
+            try:
+                WebDriverWait(driver, READY_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, plugin.ready))
+                )
+            except Exception:
+                record["error"] = "timeout"
+            loaded = time.perf_counter()
+
+            plugin.scroll(driver)
+            scrolled = time.perf_counter()
+
+            products = plugin.extract(driver.page_source)
+            done = time.perf_counter()
+
+            record.update({
+                "load_s": loaded - start,
+                "scroll_s": scrolled - loaded,
+                "parse_s": done - scrolled,
+                "products": len(products),
+            })
+        except Exception as e:
+            record["error"] = type(e).__name__
+        record["latency_s"] = time.perf_counter() - start
+        results.append(record)
+
+
+def _run_store(store, units, workers):
+    """
+    Procesa las unidades de una tienda con `workers` drivers de su propio setup_driver.
+    """
+    setup = plugins.get(store).setup_driver
+    startup = time.perf_counter()
+    drivers = [setup() for _ in range(workers)]
+    startup = time.perf_counter() - startup
+
+    sampler = ProcessSampler()
+    for worker_id, driver in enumerate(drivers):
+        sampler.watch(f"{store}/{worker_id}", driver)
+    sampler.start()
+
+    work = queue.Queue()
+    for unit in units:
+        work.put(unit)
+
+    results = []
+    threads = [threading.Thread(target=_worker, args=(i, d, work, results)) for i, d in enumerate(drivers)]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+
+    sampler.stop()
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    return results, startup, wall, sampler.report()
+
+
+def run_level(units, workers):
+    """
+    Procesa todas las unidades con `workers` drivers en paralelo. Cada tienda se corre con
+    los drivers de su setup_driver (perfil, opciones y backend propios), una tienda a la vez.
+    """
+    by_store = {}
+    for store, url in units:
+        by_store.setdefault(store, []).append((store, url))
+
+    results, startup, wall, per_driver = [], 0.0, 0.0, {}
+    for store, store_units in by_store.items():
+        store_results, store_startup, store_wall, store_drivers = _run_store(store, store_units, workers)
+        results.extend(store_results)
+        startup += store_startup
+        wall += store_wall
+        per_driver.update(store_drivers)
+
+    latencies = [r["latency_s"] for r in results]
+    ok = [r for r in results if r["error"] is None]
+    return {
+        "workers": workers,
+        "pages": len(results),
+        "errors": len(results) - len(ok),
+        "products": sum(r.get("products", 0) for r in results),
+        "driver_startup_s": round(startup, 2),
+        "wall_s": round(wall, 2),
+        "pages_per_min": round(len(results) / wall * 60, 2) if wall else None,
+        "latency_p50_s": _percentile(latencies, 0.50),
+        "latency_p95_s": _percentile(latencies, 0.95),
+        "phase_mean_s": {
+            phase: round(statistics.fmean(r[phase] for r in ok), 3) if ok else None
+            for phase in ("load_s", "scroll_s", "parse_s")
+        },
+        "per_driver": per_driver,
+        "peak_rss_mb_max": max((d["peak_rss_mb"] for d in per_driver.values()), default=None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de throughput (páginas/min) vs cantidad de drivers.")
+    parser.add_argument("--stores", nargs="+", default=["falabella", "oechsle", "realplaza"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1, help="Repite las páginas grabadas N veces.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--lazy-images", action="store_true")
+    parser.add_argument("--backend", choices=("selenium", "cdp"), default="selenium",
+                        help="cdp: Chrome por websocket directo (core.cdp) en vez de chromedriver.")
+    parser.add_argument("--out", default="bench_report.json")
+    args = parser.parse_args()
+    if psutil is None:
+        parser.error("core.bench requiere psutil para medir RSS y CPU (pip install -r requirements.txt).")
+
+    mock_url = f"http://127.0.0.1:{args.port}"
+    os.environ["SCRAPER_MOCK_URL"] = mock_url
+    os.environ["SCRAPER_BACKEND"] = args.backend
+    server = start_server(MockConfig(
+        fixtures=args.fixtures, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, lazy_images=args.lazy_images,
+    ), port=args.port)
+
+    units = page_units(args.stores, mock_url, args.fixtures, args.repeat)
+    print(f"--- Benchmark: {len(units)} páginas de {', '.join(args.stores)} ---")
+
+    levels = []
+    try:
+        for workers in args.workers:
+            print(f"\nDrivers concurrentes: {workers}")
+            level = run_level(units, workers)
+            print(f"   -> {level['pages_per_min']} páginas/min, p50 {level['latency_p50_s']}s, "
+                  f"p95 {level['latency_p95_s']}s, RSS pico {level['peak_rss_mb_max']} MB, errores {level['errors']}")
+            levels.append(level)
+    finally:
+        server.shutdown()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "stores": args.stores, "pages": len(units), "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms, "lazy_images": args.lazy_images, "backend": args.backend,
+        },
+        "levels": levels,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"\nReporte guardado: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
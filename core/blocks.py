@@ -0,0 +1,120 @@
+import re
+
+from core import retry
+
+# Veredictos posibles de detect().
+OK = "ok"
+CAPTCHA = "captcha"
+BLOCKED = "blocked"
+NOT_FOUND = "not_found"
+UNAVAILABLE = "unavailable"
+
+# Las páginas de bloqueo son chicas y traen la señal en el <head> o al inicio del <body>:
+# basta con revisar este prefijo del HTML, sin parsear la página completa.
+HEAD_CHARS = 16384
+
+TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+# Patrones sobre el prefijo del HTML, comunes a todas las tiendas. El orden importa: gana el primero.
+COMMON_PATTERNS = (
+    (CAPTCHA, re.compile(r'id="px-captcha"|geo\.captcha-delivery\.com', re.IGNORECASE)),
+    (BLOCKED, re.compile(r'window\._cf_chl_opt|Request unsuccessful\. Incapsula', re.IGNORECASE)),
+)
+
+# Patrones sobre el <title>.
+TITLE_PATTERNS = (
+    (CAPTCHA, re.compile(r'robot check|captcha|are you a human|verificaci[oó]n de seguridad', re.IGNORECASE)),
+    (BLOCKED, re.compile(r'access denied|acceso denegado|just a moment|attention required', re.IGNORECASE)),
+    (NOT_FOUND, re.compile(r'^404\b|error 404|404 not found|page not found|p[aá]gina no encontrada', re.IGNORECASE)),
+    (UNAVAILABLE, re.compile(r'^50[234]\b|service unavailable|bad gateway', re.IGNORECASE)),
+)
+
+# Patrones propios de cada tienda, se revisan antes que los comunes.
+STORE_PATTERNS = {
+    "amazon": (
+        (CAPTCHA, re.compile(r'Enter the characters you see below|/errors/validateCaptcha'
+                             r'|api-services-support@amazon\.com', re.IGNORECASE)),
+    ),
+    "falabella": (
+        (BLOCKED, re.compile(r'perfdrive\.com|shieldsquare', re.IGNORECASE)),
+    ),
+}
+
+BODY_UNAVAILABLE_RE = re.compile(r'<body[^>]*>\s*Service Unavailable\s*</body>', re.IGNORECASE)
+
+
+class Verdict:
+    """
+    Resultado de la detección: kind es OK, CAPTCHA, BLOCKED, NOT_FOUND o UNAVAILABLE.
+    """
+
+    __slots__ = ("kind", "reason")
+
+    def __init__(self, kind=OK, reason=""):
+        self.kind = kind
+        self.reason = reason
+
+    @property
+    def ok(self):
+        return self.kind == OK
+
+    @property
+    def blocked(self):
+        return self.kind in (CAPTCHA, BLOCKED)
+
+    def __repr__(self):
+        return f"Verdict({self.kind!r}, {self.reason!r})"
+
+
+def detect(store, html):
+    """
+    Revisa solo el inicio del HTML (str o bytes) con patrones precompilados.
+    """
+    if isinstance(html, bytes):
+        html = html[:HEAD_CHARS].decode('utf-8', errors='ignore')
+    else:
+        html = html[:HEAD_CHARS]
+
+    for kind, pattern in STORE_PATTERNS.get(store, ()) + COMMON_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return Verdict(kind, match.group(0))
+
+    title = TITLE_RE.search(html)
+    if title:
+        title = title.group(1).strip()
+        for kind, pattern in TITLE_PATTERNS:
+            if pattern.search(title):
+                return Verdict(kind, title)
+
+    if BODY_UNAVAILABLE_RE.search(html):
+        return Verdict(UNAVAILABLE, "Service Unavailable")
+
+    return Verdict()
+
+
+def page_head(driver, chars=HEAD_CHARS):
+    """
+    Prefijo del HTML actual del navegador, sin transferir la página completa por WebDriver.
+    """
+    return driver.execute_script("return document.documentElement.outerHTML.slice(0, arguments[0]);", chars) or ""
+
+
+def raise_for(verdict):
+    """
+    Traduce el veredicto a la excepción que entiende core.retry.
+    """
+    if verdict.blocked:
+        raise retry.PageBlocked(f"{verdict.kind}: {verdict.reason}")
+    if verdict.kind == NOT_FOUND:
+        raise retry.PageNotFound(verdict.reason)
+    if verdict.kind == UNAVAILABLE:
+        raise retry.ScrapeError(f"sitio no disponible: {verdict.reason}")
+    return verdict
+
+
+def check(store, driver):
+    """
+    Detecta bloqueos en la página cargada y lanza PageBlocked / PageNotFound / ScrapeError.
+    """
+    return raise_for(detect(store, page_head(driver)))
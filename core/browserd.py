@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import time
+import urllib.request
+
+from core import cdp, profiles, sites
+
+DEFAULT_PORT = 9222
+DEFAULT_PROFILE = os.path.join(os.path.expanduser("~"), ".cache", "scraper-chrome")
+STATE_FILE = "browserd.json"
+
+HEALTH_INTERVAL = 10
+HEALTH_TIMEOUT = 3
+# Reinicios permitidos dentro de RESTART_WINDOW antes de esperar más entre intentos.
+MAX_RESTARTS = 5
+RESTART_WINDOW = 300
+
+
+def address():
+    """
+    host:port del navegador compartido (SCRAPER_BROWSERD). Vacío si no se usa.
+    """
+    value = os.environ.get("SCRAPER_BROWSERD", "")
+    if not value:
+        return None
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port or DEFAULT_PORT)
+
+
+def version(host="127.0.0.1", port=DEFAULT_PORT, timeout=HEALTH_TIMEOUT):
+    with urllib.request.urlopen(f"http://{host}:{port}/json/version", timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def healthy(host="127.0.0.1", port=DEFAULT_PORT):
+    try:
+        version(host, port)
+        return True
+    except Exception:
+        return False
+
+
+def attach(host=None, port=None):
+    """
+    Abre una pestaña en el navegador compartido y devuelve un CDPDriver; quit() solo cierra la pestaña.
+    """
+    if host is None:
+        host, port = address() or ("127.0.0.1", DEFAULT_PORT)
+    if not healthy(host, port):
+        raise ConnectionError(f"browserd no responde en {host}:{port} (chrome not reachable)")
+    return cdp.attach(host, port, new_tab=True)
+
+
+class BrowserDaemon:
+    """
+    Mantiene un Chrome con depuración remota y perfil persistente (caché HTTP de los bundles
+    de VTEX / Next.js / Vue entre corridas). Revisa /json/version cada HEALTH_INTERVAL
+    segundos y lo relanza si el proceso murió o dejó de responder.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, profile=DEFAULT_PROFILE, extra_args=()):
+        self.port = port
+        self.profile = profile
+        self.extra_args = list(extra_args)
+        self.process = None
+        self.restarts = []
+        self.running = True
+
+    @property
+    def state_path(self):
+        return os.path.join(self.profile, STATE_FILE)
+
+    def start(self):
+        # Un cierre abrupto deja el perfil bloqueado para el siguiente Chrome.
+        profiles.prune(self.profile, profiles.cache_mb() * 1024 * 1024)
+        profiles.reset(self.profile)
+
+        self.process = subprocess.Popen(
+            [cdp.find_chrome(), f"--remote-debugging-port={self.port}", "--remote-debugging-address=127.0.0.1",
+             f"--user-data-dir={self.profile}", *profiles.cache_arguments(), *cdp.DEFAULT_ARGS, *sites.chrome_arguments(), *self.extra_args,
+             "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise ConnectionError(f"Chrome terminó al iniciar (código {self.process.returncode})")
+            if healthy(port=self.port):
+                break
+            time.sleep(0.2)
+        else:
+            raise ConnectionError("Chrome no abrió el puerto de depuración a tiempo")
+
+        with open(self.state_path, 'w', encoding='utf-8') as f:
+            json.dump({"pid": os.getpid(), "chrome_pid": self.process.pid, "port": self.port,
+                       "started_at": time.time()}, f, indent=4)
+        print(f"browserd: Chrome {self.process.pid} escuchando en 127.0.0.1:{self.port} (perfil {self.profile})")
+
+    def stop_chrome(self):
+        if self.process is None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def restart(self, reason):
+        now = time.time()
+        self.restarts = [t for t in self.restarts if now - t < RESTART_WINDOW]
+        if len(self.restarts) >= MAX_RESTARTS:
+            print(f"browserd: {len(self.restarts)} reinicios en {RESTART_WINDOW}s, se espera antes de reintentar.")
+            time.sleep(RESTART_WINDOW / MAX_RESTARTS)
+        self.restarts.append(now)
+        print(f"browserd: reiniciando Chrome ({reason}).")
+        self.stop_chrome()
+        self.start()
+
+    def check(self):
+        if self.process is None or self.process.poll() is not None:
+            self.restart("el proceso terminó")
+        elif not healthy(port=self.port):
+            self.restart("no responde /json/version")
+
+    def serve_forever(self):
+        def shutdown(signum, frame):
+            self.running = False
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.start()
+        try:
+            while self.running:
+                time.sleep(HEALTH_INTERVAL)
+                if self.running:
+                    try:
+                        self.check()
+                    except Exception as e:
+                        print(f"browserd: error al reiniciar: {e}")
+        finally:
+            self.stop_chrome()
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            print("browserd: detenido.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Navegador compartido (Chrome con perfil persistente).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--profile", default=DEFAULT_PROFILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="Lanza Chrome y lo mantiene vivo.")
+    sub.add_parser("status", help="Versión y pestañas abiertas.")
+    sub.add_parser("stop", help="Detiene el daemon.")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        BrowserDaemon(args.port, args.profile).serve_forever()
+    elif args.command == "status":
+        try:
+            info = version(port=args.port)
+        except Exception as e:
+            print(f"browserd no responde en el puerto {args.port}: {e}")
+            raise SystemExit(1)
+        with urllib.request.urlopen(f"http://127.0.0.1:{args.port}/json/list", timeout=HEALTH_TIMEOUT) as response:
+            tabs = [t for t in json.loads(response.read().decode('utf-8')) if t.get("type") == "page"]
+        print(json.dumps({"browser": info.get("Browser"), "tabs": len(tabs)}, indent=4))
+    else:
+        state_path = os.path.join(args.profile, STATE_FILE)
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        os.kill(state["pid"], signal.SIGTERM)
+        print(f"Señal enviada a browserd ({state['pid']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,447 @@
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+
+try:
+    import websocket
+except ImportError:  # sin websocket-client el backend CDP no está disponible; Selenium sigue igual
+    websocket = None
+from selenium.common.exceptions import JavascriptException, NoSuchElementException
+
+# Mismos ajustes que los setup_driver de Selenium.
+DEFAULT_ARGS = (
+    "--headless=new",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--window-size=1920,1080",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--remote-allow-origins=*",
+    "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/115.0.0.0 Safari/537.36",
+)
+
+CHROME_CANDIDATES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+# Equivalente al ocultamiento de navigator.webdriver de los scrapers.
+STEALTH_JS = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+
+# Grupo de los objetos remotos de find_element(s): se liberan juntos al navegar o con release_objects(),
+# así los handles de elementos no se acumulan en V8 mientras se queda en la misma página.
+OBJECT_GROUP = "scraper-elements"
+
+# Búsqueda de elementos por estrategia de Selenium (By.*). `root` es document o el elemento padre.
+FIND_JS = {
+    "css selector": "Array.from(root.querySelectorAll(v))",
+    "class name": "Array.from(root.getElementsByClassName(v))",
+    "id": "Array.from(root.querySelectorAll('#' + CSS.escape(v)))",
+    "name": "Array.from(root.querySelectorAll('[name=\"' + v + '\"]'))",
+    "tag name": "Array.from(root.getElementsByTagName(v))",
+    "xpath": "(function () { var r = document.evaluate(v, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);"
+             " var a = []; for (var i = 0; i < r.snapshotLength; i++) { a.push(r.snapshotItem(i)); } return a; })()",
+}
+
+
+class CDPError(Exception):
+    pass
+
+
+class CDPTimeout(TimeoutError):
+    pass
+
+
+class CDPConnection:
+    """
+    Un websocket persistente contra un target de Chrome. Un hilo lee los mensajes:
+    las respuestas despiertan a quien llamó send() y los eventos van a los listeners.
+    Los listeners corren en ese hilo, así que no deben llamar a send().
+    """
+
+    def __init__(self, ws_url, timeout=30):
+        if websocket is None:
+            raise RuntimeError("El backend CDP requiere websocket-client (pip install websocket-client).")
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True, enable_multithread=True)
+        self.ws.settimeout(None)
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.listeners = {}
+        self.lock = threading.Lock()
+        self.closed = False
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        while True:
+            try:
+                message = json.loads(self.ws.recv())
+            except Exception:
+                break
+            if "id" in message:
+                with self.lock:
+                    slot = self.pending.pop(message["id"], None)
+                if slot is not None:
+                    slot[1] = message
+                    slot[0].set()
+                continue
+            method = message.get("method")
+            with self.lock:
+                callbacks = list(self.listeners.get(method, ()))
+            for callback in callbacks:
+                try:
+                    callback(message.get("params", {}))
+                except Exception as e:
+                    print(f"   [cdp] Error en listener de {method}: {e}")
+
+        self.closed = True
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for slot in pending.values():
+            slot[0].set()
+
+    def send(self, method, params=None, timeout=None):
+        if self.closed:
+            raise ConnectionError("conexión CDP cerrada (chrome not reachable)")
+        message_id = next(self.ids)
+        slot = [threading.Event(), None]
+        with self.lock:
+            self.pending[message_id] = slot
+        self.ws.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+
+        if not slot[0].wait(timeout or self.timeout):
+            with self.lock:
+                self.pending.pop(message_id, None)
+            raise CDPTimeout(f"{method} sin respuesta")
+        response = slot[1]
+        if response is None:
+            raise ConnectionError("conexión CDP cerrada (chrome not reachable)")
+        if "error" in response:
+            raise CDPError(f"{method}: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    def on(self, method, callback):
+        with self.lock:
+            self.listeners.setdefault(method, []).append(callback)
+
+    def off(self, method, callback):
+        with self.lock:
+            if callback in self.listeners.get(method, []):
+                self.listeners[method].remove(callback)
+
+    def close(self):
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+class CDPElement:
+    """
+    Referencia a un nodo del DOM (objectId de Runtime) con la parte de la API de
+    WebElement que usan los scrapers.
+    """
+
+    def __init__(self, driver, object_id):
+        self.driver = driver
+        self.object_id = object_id
+
+    def _call(self, function, *args):
+        return self.driver._call_on(self.object_id, function, args)
+
+    @property
+    def text(self):
+        return self._call("function () { return this.innerText; }") or ""
+
+    def get_attribute(self, name):
+        value = self._call(
+            "function (n) { var v = this[n];"
+            " if (v === undefined || v === null || typeof v === 'object') { v = this.getAttribute(n); }"
+            " return v; }", name,
+        )
+        if isinstance(value, bool):
+            return "true" if value else None
+        return None if value is None else str(value)
+
+    def click(self):
+        self._call("function () { this.scrollIntoView({block: 'center'}); this.click(); }")
+
+    def find_elements(self, by, value):
+        return self.driver._find(by, value, self.object_id)
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+
+class CDPDriver:
+    """
+    Navegador controlado por CDP directo (un websocket, sin el salto HTTP a chromedriver).
+    Implementa lo que usan los scrapers de un WebDriver (get, execute_script, page_source,
+    title, find_element(s), refresh, quit), así scrape_page, WebDriverWait y los scrolls
+    funcionan igual, y agrega eventos de red, bloqueo de recursos y snapshots del DOM.
+    """
+
+    def __init__(self, connection, target_id=None, host=None, port=None, process=None,
+                 user_data_dir=None, owns_dir=False):
+        self.conn = connection
+        self.target_id = target_id
+        self.host = host
+        self.port = port
+        self.process = process
+        self.user_data_dir = user_data_dir
+        self.owns_dir = owns_dir
+        self.page_load_timeout = 60
+        self.page_load_strategy = "normal"
+        self.network_enabled = False
+
+        self.conn.send("Page.enable")
+        self.conn.send("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
+
+    # -- navegación -------------------------------------------------------
+
+    def _navigate(self, command, params=None):
+        """
+        Igual que pageLoadStrategy de WebDriver: "normal" espera el load, "eager" el DOMContentLoaded
+        y "none" vuelve apenas se inicia la navegación.
+        """
+        event = {"normal": "Page.loadEventFired", "eager": "Page.domContentEventFired"}.get(self.page_load_strategy)
+        loaded = threading.Event()
+        listener = lambda params: loaded.set()
+        if event:
+            self.conn.on(event, listener)
+        try:
+            result = self.conn.send(command, params)
+            if result.get("errorText"):
+                raise CDPError(f"{command}: {result['errorText']}")
+            if event and not loaded.wait(self.page_load_timeout):
+                raise CDPTimeout(f"la página no terminó de cargar en {self.page_load_timeout}s")
+        finally:
+            if event:
+                self.conn.off(event, listener)
+
+    def get(self, url):
+        self.release_objects()
+        self._navigate("Page.navigate", {"url": url})
+
+    def refresh(self):
+        self.release_objects()
+        self._navigate("Page.reload")
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    # -- scripts ----------------------------------------------------------
+
+    def _evaluate(self, expression, by_value=True, group=None):
+        params = {"expression": expression, "returnByValue": by_value, "awaitPromise": True}
+        if group:
+            params["objectGroup"] = group
+        result = self.conn.send("Runtime.evaluate", params)
+        if "exceptionDetails" in result:
+            raise JavascriptException(_exception_text(result["exceptionDetails"]))
+        return result["result"].get("value") if by_value else result["result"]
+
+    def _call_on(self, object_id, function, args=(), by_value=True, group=None):
+        arguments = [{"objectId": a.object_id} if isinstance(a, CDPElement) else {"value": a} for a in args]
+        params = {
+            "objectId": object_id, "functionDeclaration": function, "arguments": arguments,
+            "returnByValue": by_value, "awaitPromise": True,
+        }
+        if group:
+            params["objectGroup"] = group
+        result = self.conn.send("Runtime.callFunctionOn", params)
+        if "exceptionDetails" in result:
+            raise JavascriptException(_exception_text(result["exceptionDetails"]))
+        return result["result"].get("value") if by_value else result["result"]
+
+    def execute_script(self, script, *args):
+        function = "function () {\n" + script + "\n}"
+        elements = [a for a in args if isinstance(a, CDPElement)]
+        if elements:
+            return self._call_on(elements[0].object_id, function, args)
+        return self._evaluate(f"({function}).apply(window, {json.dumps(list(args))})")
+
+    @property
+    def page_source(self):
+        return self._evaluate("document.documentElement.outerHTML")
+
+    @property
+    def title(self):
+        return self._evaluate("document.title")
+
+    @property
+    def current_url(self):
+        return self._evaluate("location.href")
+
+    # -- elementos --------------------------------------------------------
+
+    def _find(self, by, value, root_id=None):
+        if by not in FIND_JS:
+            raise CDPError(f"Estrategia no soportada: {by}")
+        function = "function (v) { var root = this; return " + FIND_JS[by] + "; }"
+        # document y el array son temporales; los elementos quedan en OBJECT_GROUP.
+        temporary = []
+        if root_id is None:
+            root_id = self._evaluate("document", by_value=False, group=OBJECT_GROUP)["objectId"]
+            temporary.append(root_id)
+        try:
+            array = self._call_on(root_id, function, (value,), by_value=False, group=OBJECT_GROUP)
+            temporary.append(array["objectId"])
+            properties = self.conn.send("Runtime.getProperties", {"objectId": array["objectId"], "ownProperties": True})
+        finally:
+            for object_id in temporary:
+                self.conn.send("Runtime.releaseObject", {"objectId": object_id})
+        elements = sorted(
+            (int(p["name"]), p["value"]["objectId"]) for p in properties["result"]
+            if p["name"].isdigit() and "objectId" in p.get("value", {})
+        )
+        return [CDPElement(self, object_id) for _, object_id in elements]
+
+    def release_objects(self):
+        """
+        Libera los handles de todos los elementos devueltos por find_element(s) hasta ahora.
+        """
+        self.conn.send("Runtime.releaseObjectGroup", {"objectGroup": OBJECT_GROUP})
+
+    def find_elements(self, by, value):
+        return self._find(by, value)
+
+    def find_element(self, by, value):
+        elements = self._find(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+    # -- red y DOM --------------------------------------------------------
+
+    def enable_network(self):
+        if not self.network_enabled:
+            self.conn.send("Network.enable")
+            self.network_enabled = True
+
+    def on(self, method, callback):
+        """
+        Suscribe a eventos CDP (ej. "Network.responseReceived"). El callback no debe llamar al driver.
+        """
+        if method.startswith("Network."):
+            self.enable_network()
+        self.conn.on(method, callback)
+
+    def response_body(self, request_id):
+        result = self.conn.send("Network.getResponseBody", {"requestId": request_id})
+        return result.get("body", "")
+
+    def block_urls(self, patterns):
+        """
+        Bloquea recursos por patrón (ej. ["*.png", "*.woff2", "*googletagmanager*"]).
+        """
+        self.enable_network()
+        self.conn.send("Network.setBlockedURLs", {"urls": list(patterns)})
+
+    def snapshot(self, computed_styles=()):
+        return self.conn.send("DOMSnapshot.captureSnapshot", {"computedStyles": list(computed_styles)})
+
+    # -- cierre -----------------------------------------------------------
+
+    def quit(self):
+        self.conn.close()
+        if self.process is None and self.host and self.target_id:
+            # Pestaña de un Chrome ajeno (ej. core.browserd): solo se cierra la pestaña.
+            try:
+                urllib.request.urlopen(f"http://{self.host}:{self.port}/json/close/{self.target_id}", timeout=5).read()
+            except Exception:
+                pass
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.owns_dir and self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+def _exception_text(details):
+    exception = details.get("exception", {})
+    return exception.get("description") or details.get("text", "error de JavaScript")
+
+
+def find_chrome():
+    path = os.environ.get("CHROME_BIN")
+    if path:
+        return path
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise FileNotFoundError("No se encontró Chrome/Chromium (definir CHROME_BIN).")
+
+
+def _json(url, method="GET", timeout=10):
+    request = urllib.request.Request(url, method=method)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def attach(host="127.0.0.1", port=9222, new_tab=True, **kwargs):
+    """
+    Se conecta a un Chrome con --remote-debugging-port ya corriendo: abre una pestaña nueva
+    (o toma la primera existente) y devuelve un CDPDriver sobre ella.
+    """
+    base = f"http://{host}:{port}"
+    if new_tab:
+        target = _json(f"{base}/json/new?about:blank", method="PUT")
+    else:
+        target = next(t for t in _json(f"{base}/json/list") if t.get("type") == "page")
+    connection = CDPConnection(target["webSocketDebuggerUrl"])
+    return CDPDriver(connection, target_id=target["id"], host=host, port=port, **kwargs)
+
+
+def launch(extra_args=(), user_data_dir=None, timeout=30):
+    """
+    Lanza un Chrome propio con depuración remota y devuelve un CDPDriver.
+    Sin user_data_dir se usa un perfil temporal que se borra en quit().
+    """
+    owns_dir = user_data_dir is None
+    user_data_dir = user_data_dir or tempfile.mkdtemp(prefix="cdp-profile-")
+    port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+    if os.path.exists(port_file):
+        os.remove(port_file)
+
+    process = subprocess.Popen(
+        [find_chrome(), "--remote-debugging-port=0", f"--user-data-dir={user_data_dir}",
+         *DEFAULT_ARGS, *extra_args, "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + timeout
+    port = None
+    while time.time() < deadline and process.poll() is None:
+        try:
+            with open(port_file, encoding='utf-8') as f:
+                port = int(f.readline().strip())
+            break
+        except (OSError, ValueError):
+            time.sleep(0.1)
+    if port is None:
+        process.kill()
+        raise ConnectionError("Chrome no abrió el puerto de depuración (chrome not reachable)")
+
+    driver = attach("127.0.0.1", port, new_tab=False, process=process,
+                    user_data_dir=user_data_dir, owns_dir=owns_dir)
+    return driver
+
+
+def backend():
+    """
+    Backend de navegador para orquestadores: SCRAPER_BACKEND=cdp o selenium (por defecto).
+    """
+    return os.environ.get("SCRAPER_BACKEND", "selenium").lower()
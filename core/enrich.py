@@ -0,0 +1,506 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+try:
+    import aiohttp
+except ImportError:  # sin aiohttp se usa requests en hilos, con los mismos límites
+    aiohttp = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+from core import metrics
+from core.normalize import canonical_url, image_key
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_DOMAIN = 4
+DEFAULT_TTL_HOURS = 72
+TIMEOUT = 20
+MAX_ATTEMPTS = 3
+RETRY_STATUS = {429, 500, 502, 503, 504}
+GONE_STATUS = {404, 410}
+BATCH_SIZE = 200
+
+# Conexiones simultáneas por dominio (DEFAULT_PER_DOMAIN si no figura). Amazon y Falabella
+# responden con CAPTCHA / 429 apenas se les abren varias conexiones.
+DOMAIN_LIMITS = {
+    "www.amazon.com": 1,
+    "www.falabella.com.pe": 2,
+}
+
+# Contenedores de la ficha técnica por tienda (tablas th/td o listas dt/dd).
+SPEC_SELECTORS = {
+    "amazon": "#productDetails_techSpec_section_1, #productDetails_detailBullets_sections1",
+    "hp": "#product-attribute-specs-table",
+    "infotec": "dl.data-sheet",
+    "magitech": "#product-attribute-specs-table",
+    "oechsle": "#caracteristicas table",
+    "supertec": "table.woocommerce-product-attributes",
+}
+DEFAULT_SPEC_SELECTOR = "table, dl"
+MAX_SPECS = 80
+MAX_SPEC_LEN = 200
+MAX_DESCRIPTION_LEN = 1000
+
+DETAIL_FIELDS = ("sku", "brand", "stock", "seller", "description")
+
+# Campos del listado que, si cambian, fuerzan a pedir de nuevo la ficha. No incluye nada que
+# agregue esta etapa (stock, por ejemplo), así un JSON ya enriquecido no se ve como cambiado.
+LISTING_FIELDS = ("name", "price", "image_url")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS details (
+    url           TEXT PRIMARY KEY,
+    store         TEXT,
+    listing_fp    TEXT,
+    etag          TEXT,
+    last_modified TEXT,
+    status        INTEGER,
+    fetched_at    REAL,
+    data          TEXT
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO details (url, store, listing_fp, etag, last_modified, status, fetched_at, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    store = excluded.store,
+    listing_fp = excluded.listing_fp,
+    etag = excluded.etag,
+    last_modified = excluded.last_modified,
+    status = excluded.status,
+    fetched_at = excluded.fetched_at,
+    data = excluded.data
+"""
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def concurrency():
+    return _env_int("SCRAPER_ENRICH_CONCURRENCY", DEFAULT_CONCURRENCY)
+
+
+def domain_limit(host):
+    """
+    SCRAPER_ENRICH_PER_DOMAIN cambia el default; DOMAIN_LIMITS solo puede bajarlo.
+    """
+    default = _env_int("SCRAPER_ENRICH_PER_DOMAIN", DEFAULT_PER_DOMAIN)
+    return max(1, min(DOMAIN_LIMITS.get(host, default), default))
+
+
+def listing_fingerprint(item):
+    values = [image_key(item.get(field)) if field == "image_url" else item.get(field) for field in LISTING_FIELDS]
+    raw = json.dumps(values, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def ttl_hours():
+    return float(os.environ.get("SCRAPER_ENRICH_TTL_HOURS") or DEFAULT_TTL_HOURS)
+
+
+class DetailCache:
+    """
+    Caché en disco (SQLite) de páginas de detalle, por URL canónica. Guarda el resultado
+    ya parseado junto con ETag / Last-Modified para pedir la página de forma condicional.
+    """
+
+    def __init__(self, path="detalles.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get_many(self, urls):
+        found = {}
+        urls = list(urls)
+        for i in range(0, len(urls), BATCH_SIZE):
+            chunk = urls[i:i + BATCH_SIZE]
+            marks = ",".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT * FROM details WHERE url IN ({marks})", chunk):
+                found[row["url"]] = row
+        return found
+
+    def put_many(self, rows):
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, rows)
+
+    def stats(self, store=None):
+        sql = "SELECT store, status, COUNT(*) AS n, MAX(fetched_at) AS last FROM details"
+        params = ()
+        if store:
+            sql += " WHERE store = ?"
+            params = (store,)
+        return [dict(row) for row in self.conn.execute(sql + " GROUP BY store, status", params)]
+
+
+# --- Parseo de la página de detalle ---------------------------------------------------
+
+def _ld_products(data):
+    if isinstance(data, list):
+        for entry in data:
+            yield from _ld_products(entry)
+    elif isinstance(data, dict):
+        kind = data.get("@type")
+        if kind == "Product" or (isinstance(kind, list) and "Product" in kind):
+            yield data
+        for key in ("@graph", "mainEntity", "itemListElement"):
+            if key in data:
+                yield from _ld_products(data[key])
+
+
+def _name_of(value):
+    if isinstance(value, dict):
+        return value.get("name")
+    if isinstance(value, list):
+        return _name_of(value[0]) if value else None
+    return value
+
+
+def _offer(offers):
+    if isinstance(offers, list):
+        return offers[0] if offers else {}
+    if isinstance(offers, dict) and offers.get("@type") == "AggregateOffer" and offers.get("offers"):
+        return _offer(offers["offers"])
+    return offers if isinstance(offers, dict) else {}
+
+
+def _from_json_ld(soup, detail, specs):
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or script.get_text() or "null")
+        except ValueError:
+            continue
+        for product in _ld_products(data):
+            offer = _offer(product.get("offers"))
+            availability = offer.get("availability")
+            found = {
+                "sku": product.get("sku") or product.get("mpn"),
+                "brand": _name_of(product.get("brand")),
+                "description": product.get("description"),
+                # "https://schema.org/InStock" -> "InStock"
+                "stock": str(availability).rstrip("/").rsplit("/", 1)[-1] if availability else None,
+                "seller": _name_of(offer.get("seller")),
+            }
+            for field, value in found.items():
+                if value not in (None, "") and field not in detail:
+                    detail[field] = value
+            for prop in product.get("additionalProperty") or []:
+                if isinstance(prop, dict) and prop.get("name") and prop.get("value") is not None:
+                    specs.setdefault(str(prop["name"]), str(prop["value"]))
+
+
+def _clean(text):
+    return " ".join(text.split())[:MAX_SPEC_LEN]
+
+
+def _from_spec_tables(soup, selector, specs):
+    for container in soup.select(selector):
+        if container.name == "dl":
+            pairs = zip(container.find_all("dt"), container.find_all("dd"))
+        else:
+            pairs = []
+            for row in container.find_all("tr"):
+                cells = row.find_all(["th", "td"])
+                if len(cells) == 2:
+                    pairs.append((cells[0], cells[1]))
+        for key_tag, value_tag in pairs:
+            key, value = _clean(key_tag.get_text(" ")), _clean(value_tag.get_text(" "))
+            if key and value:
+                specs.setdefault(key.rstrip(":"), value)
+            if len(specs) >= MAX_SPECS:
+                return
+
+
+def parse_detail(store, html):
+    """
+    Extrae de la página de producto lo que el listado no trae: JSON-LD (sku, marca, stock,
+    vendedor, descripción, additionalProperty) y la ficha técnica según SPEC_SELECTORS.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    detail, specs = {}, {}
+    _from_json_ld(soup, detail, specs)
+    _from_spec_tables(soup, SPEC_SELECTORS.get(store, DEFAULT_SPEC_SELECTOR), specs)
+
+    detail = {k: str(v) for k, v in detail.items()}
+    if "description" in detail:
+        detail["description"] = " ".join(detail["description"].split())[:MAX_DESCRIPTION_LEN]
+    if specs:
+        detail["specs"] = specs
+    return detail
+
+
+# --- Descarga ----------------------------------------------------------------------------
+
+class Fetcher:
+    """
+    GET con límite global y por dominio. Usa aiohttp si está instalado; si no, una sesión
+    de requests (pool de conexiones) en hilos. Devuelve (status, headers, cuerpo): el cuerpo
+    es texto, o bytes con binary=True, y solo se lee en un 200.
+    per_domain fija el límite por dominio; si no se pasa se usa domain_limit().
+    """
+
+    def __init__(self, limit, per_domain=None, binary=False):
+        self.limit = limit
+        self.per_domain = per_domain
+        self.binary = binary
+        self.global_sem = asyncio.Semaphore(limit)
+        self.domain_sems = {}
+        self.session = None
+
+    async def __aenter__(self):
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=TIMEOUT),
+                headers={"User-Agent": USER_AGENT},
+            )
+        elif requests is not None:
+            self.session = requests.Session()
+            self.session.headers["User-Agent"] = USER_AGENT
+            adapter = HTTPAdapter(pool_connections=self.limit, pool_maxsize=self.limit)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        else:
+            raise RuntimeError("Se necesita aiohttp o requests instalados.")
+        return self
+
+    async def __aexit__(self, *exc):
+        if aiohttp is not None:
+            await self.session.close()
+        else:
+            self.session.close()
+
+    def _domain_sem(self, url):
+        host = urlsplit(url).netloc.lower()
+        sem = self.domain_sems.get(host)
+        if sem is None:
+            sem = self.domain_sems[host] = asyncio.Semaphore(self.per_domain or domain_limit(host))
+        return sem
+
+    async def _get_once(self, url, headers):
+        if aiohttp is not None:
+            async with self.session.get(url, headers=headers) as response:
+                body = b"" if self.binary else ""
+                if response.status == 200:
+                    body = await response.read() if self.binary else await response.text(errors="replace")
+                return response.status, response.headers, body
+        response = await asyncio.to_thread(self.session.get, url, headers=headers, timeout=TIMEOUT)
+        body = b"" if self.binary else ""
+        if response.status_code == 200:
+            body = response.content if self.binary else response.text
+        return response.status_code, response.headers, body
+
+    async def get(self, url, headers):
+        # Primero el cupo del dominio y después el global: un dominio saturado no retiene cupos
+        # globales mientras espera. Ambos se sueltan durante la espera entre reintentos.
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            async with self._domain_sem(url), self.global_sem:
+                try:
+                    status, response_headers, body = await self._get_once(url, headers)
+                except (asyncio.TimeoutError, OSError) + _client_errors() as e:
+                    if attempt == MAX_ATTEMPTS:
+                        raise
+                    delay = 2 ** attempt
+                    print(f"   -> GET {url}: {e.__class__.__name__}, reintento en {delay}s")
+                else:
+                    if status not in RETRY_STATUS or attempt == MAX_ATTEMPTS:
+                        return status, response_headers, body
+                    retry_after = response_headers.get("Retry-After", "")
+                    delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            await asyncio.sleep(min(delay, 60) + random.uniform(0, 0.5))
+
+
+def _client_errors():
+    if aiohttp is not None:
+        return (aiohttp.ClientError,)
+    if requests is not None:
+        return (requests.RequestException,)
+    return ()
+
+
+# --- Etapa de enriquecimiento ----------------------------------------------------------
+
+def _merge(item, detail):
+    for field in DETAIL_FIELDS:
+        if field in detail:
+            item.setdefault(field, detail[field])
+    if detail.get("specs"):
+        item.setdefault("detail_specs", detail["specs"])
+
+
+async def _enrich_async(store, products, cache, limit, ttl):
+    started = time.perf_counter()
+    now = time.time()
+    stats = {"products": len(products), "urls": 0, "cached": 0, "fetched": 0,
+             "not_modified": 0, "gone": 0, "failed": 0}
+
+    # Una entrada por URL canónica: varios productos con la misma ficha se piden una sola vez.
+    groups = {}
+    for item in products:
+        key = canonical_url(item.get("url"))
+        if key:
+            groups.setdefault(key, []).append(item)
+    stats["urls"] = len(groups)
+
+    cached = cache.get_many(groups)
+    results = {}
+    pending = []
+    for key, items in groups.items():
+        listing_fp = listing_fingerprint(items[0])
+        row = cached.get(key)
+        fresh = row is not None and now - (row["fetched_at"] or 0) < ttl * 3600
+        if fresh and row["listing_fp"] == listing_fp:
+            results[key] = json.loads(row["data"] or "{}")
+            stats["cached"] += 1
+            metrics.count("detail_cache_hits", store)
+        else:
+            pending.append((key, items[0]["url"], listing_fp, row))
+
+    rows = []
+
+    async def fetch(fetcher, key, url, listing_fp, row):
+        headers = {}
+        if row is not None and row["status"] == 200:
+            if row["etag"]:
+                headers["If-None-Match"] = row["etag"]
+            if row["last_modified"]:
+                headers["If-Modified-Since"] = row["last_modified"]
+        try:
+            status, response_headers, text = await fetcher.get(url, headers)
+        except Exception as e:
+            stats["failed"] += 1
+            metrics.count("detail_errors", store)
+            print(f"   -> Detalle no disponible {url}: {e}")
+            if row is not None:
+                results[key] = json.loads(row["data"] or "{}")
+            return
+
+        if status == 304 and row is not None:
+            stats["not_modified"] += 1
+            metrics.count("detail_not_modified", store)
+            data = row["data"] or "{}"
+            results[key] = json.loads(data)
+            rows.append((key, store, listing_fp, row["etag"], row["last_modified"], 200, time.time(), data))
+            return
+        if status == 200:
+            # El parseo es CPU: se hace en un hilo para no frenar las descargas en curso.
+            detail = await asyncio.to_thread(parse_detail, store, text)
+            stats["fetched"] += 1
+            metrics.count("detail_fetches", store)
+            results[key] = detail
+            rows.append((key, store, listing_fp, response_headers.get("ETag"),
+                         response_headers.get("Last-Modified"), 200, time.time(),
+                         json.dumps(detail, ensure_ascii=False)))
+            return
+        if status in GONE_STATUS:
+            stats["gone"] += 1
+            rows.append((key, store, listing_fp, None, None, status, time.time(), "{}"))
+            results[key] = {}
+            return
+        stats["failed"] += 1
+        metrics.count("detail_errors", store)
+        print(f"   -> Detalle {url}: HTTP {status}")
+        if row is not None:
+            results[key] = json.loads(row["data"] or "{}")
+
+    if pending:
+        async with Fetcher(limit) as fetcher:
+            tasks = [asyncio.create_task(fetch(fetcher, *entry)) for entry in pending]
+            for i in range(0, len(tasks), BATCH_SIZE):
+                await asyncio.gather(*tasks[i:i + BATCH_SIZE])
+                # Se guarda por tandas: si la corrida se corta, lo ya bajado no se pierde.
+                if rows:
+                    cache.put_many(rows)
+                    rows.clear()
+
+    for key, items in groups.items():
+        detail = results.get(key)
+        if detail:
+            for item in items:
+                _merge(item, detail)
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def enrich_products(store, products, cache_path=None, limit=None, ttl=None):
+    """
+    Completa los productos con datos de su página de detalle (sku, marca, stock, vendedor,
+    descripción y ficha técnica en detail_specs), sin pisar campos que ya trae el listado.
+    Solo se vuelven a pedir las URLs nuevas, las que cambiaron en el listado (nombre, precio
+    o imagen) o las que pasaron el TTL, y esas se piden con If-None-Match / If-Modified-Since.
+    """
+    cache_path = cache_path or os.environ.get("SCRAPER_ENRICH_DB") or "detalles.db"
+    with DetailCache(cache_path) as cache:
+        stats = asyncio.run(_enrich_async(store, products, cache, limit or concurrency(),
+                                          ttl if ttl is not None else ttl_hours()))
+    print(f"Detalle ({store}): {stats['urls']} URLs, {stats['cached']} en caché, {stats['fetched']} descargadas, "
+          f"{stats['not_modified']} sin cambios (304), {stats['gone']} inexistentes, {stats['failed']} fallidas "
+          f"en {stats['seconds']}s.")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Completa productos con su página de detalle.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Enriquece *_laptops.json (se reescriben en el lugar).")
+    run.add_argument("store")
+    run.add_argument("json_files", nargs="+")
+    run.add_argument("--db", default=None, help="Caché SQLite (default SCRAPER_ENRICH_DB o detalles.db).")
+    run.add_argument("--concurrency", type=int, default=None)
+    run.add_argument("--ttl-hours", type=float, default=None)
+
+    stats = sub.add_parser("stats", help="Resumen de la caché por tienda y estado HTTP.")
+    stats.add_argument("--db", default=None)
+    stats.add_argument("--store", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        with DetailCache(args.db or os.environ.get("SCRAPER_ENRICH_DB") or "detalles.db") as cache:
+            print(json.dumps(cache.stats(args.store), indent=4))
+        return
+
+    for path in args.json_files:
+        with open(path, encoding='utf-8') as f:
+            products = json.load(f)
+        enrich_products(args.store, products, args.db, args.concurrency, args.ttl_hours)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(products, f, indent=4, ensure_ascii=False)
+        print(f"{path}: {len(products)} productos.")
+
+
+if __name__ == "__main__":
+    main()
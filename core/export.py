@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import time
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from core.normalize import parse_price
+
+# Mismos campos que emiten los extractores; price se guarda como número + moneda.
+FIELDS = ("name", "price", "currency", "image_url", "url", "rating",
+          "stock", "sku", "seller", "brand", "category")
+
+DICTIONARY_FIELDS = ("store", "currency", "seller", "brand", "category")
+
+ROW_GROUP_SIZE = 5000
+
+
+def _schema():
+    dict_type = pa.dictionary(pa.int32(), pa.string())
+    columns = [pa.field("store", dict_type)]
+    for field in FIELDS:
+        if field == "price":
+            columns.append(pa.field(field, pa.float64()))
+        elif field in DICTIONARY_FIELDS:
+            columns.append(pa.field(field, dict_type))
+        else:
+            columns.append(pa.field(field, pa.string()))
+    return pa.schema(columns)
+
+
+class CatalogExporter:
+    """
+    Escribe los productos de una tienda en Parquet particionado por tienda y fecha:
+    <root>/store=<tienda>/date=<YYYY-MM-DD>/part-<HHMMSS>-<id>.parquet
+
+    Los productos se agregan por página con add(); cada ROW_GROUP_SIZE filas se
+    escribe un row group, así la memoria no crece con el tamaño del catálogo.
+    Mientras se escribe el archivo lleva el sufijo .partial; close() lo renombra, así una
+    corrida que se cae no deja un Parquet sin footer entre las particiones.
+    """
+
+    def __init__(self, root, store, timestamp=None, row_group_size=ROW_GROUP_SIZE):
+        if pa is None:
+            raise RuntimeError("La exportación Parquet requiere pyarrow (pip install pyarrow).")
+
+        ts = time.localtime(timestamp if timestamp is not None else time.time())
+        folder = os.path.join(root, f"store={store}", f"date={time.strftime('%Y-%m-%d', ts)}")
+        os.makedirs(folder, exist_ok=True)
+
+        # El sufijo evita que dos corridas de la misma tienda en el mismo segundo se pisen.
+        self.path = os.path.join(folder, f"part-{time.strftime('%H%M%S', ts)}-{uuid.uuid4().hex[:8]}.parquet")
+        self.partial_path = self.path + ".partial"
+        self.store = store
+        self.row_group_size = row_group_size
+        self.schema = _schema()
+        self.writer = pq.ParquetWriter(
+            self.partial_path, self.schema,
+            compression="zstd",
+            use_dictionary=list(DICTIONARY_FIELDS),
+        )
+        self.buffer = []
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, products):
+        for item in products:
+            amount, currency = parse_price(item.get("price"))
+            row = {"store": self.store, "price": amount, "currency": currency}
+            for field in FIELDS:
+                if field not in row:
+                    value = item.get(field)
+                    row[field] = None if value is None else str(value)
+            self.buffer.append(row)
+            if len(self.buffer) >= self.row_group_size:
+                self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        table = pa.Table.from_pylist(self.buffer, schema=self.schema)
+        self.writer.write_table(table, row_group_size=self.row_group_size)
+        self.rows += len(self.buffer)
+        self.buffer = []
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.flush()
+        self.writer.close()
+        self.writer = None
+        os.replace(self.partial_path, self.path)
+
+
+def export_products(root, store, products, timestamp=None):
+    """
+    Exporta una corrida completa y devuelve la ruta del archivo generado.
+    """
+    with CatalogExporter(root, store, timestamp) as exporter:
+        exporter.add(products)
+    return exporter.path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta *_laptops.json a Parquet particionado.")
+    parser.add_argument("store")
+    parser.add_argument("json_files", nargs="+")
+    parser.add_argument("--out", default="export")
+    args = parser.parse_args()
+
+    for path in args.json_files:
+        with open(path, encoding='utf-8') as f:
+            products = json.load(f)
+        out = export_products(args.out, args.store, products, os.path.getmtime(path))
+        print(f"{path}: {len(products)} filas -> {out}")
+
+
+if __name__ == "__main__":
+    main()
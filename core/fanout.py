@@ -0,0 +1,155 @@
+import os
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from core import retry, sites
+
+# Máximo de páginas en vuelo por dominio, sumando todos los pools del proceso.
+DEFAULT_DOMAIN_LIMIT = 3
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def workers(store):
+    """
+    Cantidad de drivers para repartir las páginas de una tienda (SCRAPER_FANOUT, por defecto 1 = en serie),
+    recortada al límite por dominio.
+    """
+    requested = int(os.environ.get("SCRAPER_FANOUT", "1") or 1)
+    return max(1, min(requested, domain_limit()))
+
+
+def domain_limit():
+    return int(os.environ.get("SCRAPER_DOMAIN_LIMIT", DEFAULT_DOMAIN_LIMIT))
+
+
+def _domain_slots(store):
+    host = urlsplit(sites.base_url(store)).netloc
+    with _slots_lock:
+        if host not in _slots:
+            _slots[host] = threading.BoundedSemaphore(domain_limit())
+        return _slots[host]
+
+
+def run(store, units, scrape, setup_driver, n_workers, pause=(1, 3), policy=None, driver=None):
+    """
+    Reparte las unidades entre n_workers drivers y devuelve los resultados en el orden de `units`.
+    Cada unidad es una URL o una tupla de argumentos: se llama scrape(driver, *unidad) con reintentos
+    de core.retry (con `policy` si la tienda usa una propia). Una unidad vacía devuelve [], una fallida None. Si la tienda bloquea, los demás
+    workers dejan de tomar unidades y las pendientes quedan en None.
+    El cupo del dominio se toma en cada intento y se suelta durante la espera entre reintentos.
+    Si se pasa driver (el navegador ya abierto del llamador), lo usa el primer worker en vez de
+    abrir otro, y run se hace cargo de cerrarlo: con n_workers hay n_workers navegadores, no uno más.
+    """
+    work = queue.Queue()
+    for index, unit in enumerate(units):
+        work.put((index, unit if isinstance(unit, tuple) else (unit,)))
+
+    results = [None] * len(units)
+    slots = _domain_slots(store)
+    stop = threading.Event()
+
+    def worker(worker_id, handed=None):
+        driver = handed
+
+        def restart_driver():
+            nonlocal driver
+            print(f"   [worker {worker_id}] Reiniciando navegador...")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = setup_driver()
+
+        try:
+            driver = driver or setup_driver()
+            while not stop.is_set():
+                try:
+                    index, args = work.get_nowait()
+                except queue.Empty:
+                    return
+                print(f"   [worker {worker_id}] {args[0]}")
+
+                def attempt():
+                    with slots:
+                        return scrape(driver, *args)
+
+                try:
+                    results[index] = retry.call(store, attempt, policy=policy, recover=restart_driver)
+                except retry.EmptyPage:
+                    results[index] = []
+                except (retry.PageBlocked, retry.CircuitOpen) as e:
+                    print(f"   [worker {worker_id}] Tienda bloqueada ({e}). Se detiene el reparto.")
+                    stop.set()
+                except Exception as e:
+                    print(f"   [worker {worker_id}] Error en {args[0]}: {e}")
+                time.sleep(random.uniform(*pause))
+        except Exception as e:
+            print(f"   [worker {worker_id}] No se pudo iniciar el navegador: {e}")
+        finally:
+            if driver:
+                driver.quit()
+
+    threads = [threading.Thread(target=worker, args=(i, driver if i == 0 else None))
+               for i in range(min(n_workers, len(units)))]
+    if not threads and driver is not None:
+        driver.quit()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def run_pages(store, pager, scrape, setup_driver, n_workers, catalog, policy=None, driver=None):
+    """
+    Reparte las páginas que faltan de un Paginator (con total ya detectado) y agrega los productos
+    de cada una a catalog (core.output.Run) en orden de página, cortando en la primera vacía o repetida.
+    El total se vuelve a leer en la última página de cada tanda: si la tienda solo muestra una ventana
+    de números (1 2 3 4 ...) o sigue habiendo "siguiente", se reparte otra tanda con las páginas nuevas.
+    driver, si se pasa, es el navegador del llamador: lo toma el primer worker de la primera tanda
+    y run_pages lo cierra.
+    """
+    try:
+        while True:
+            pages = pager.remaining()
+            if not pages:
+                return
+            print(f"   -> Repartiendo {len(pages)} páginas entre {min(n_workers, len(pages))} navegadores...")
+
+            last_url = pages[-1][1]
+            probe = {}
+
+            def scrape_and_probe(worker_driver, url, *args):
+                products = scrape(worker_driver, url, *args)
+                if url == last_url:
+                    probe["last_page"], probe["has_next"] = pager.probe(worker_driver)
+                return products
+
+            handed, driver = driver, None
+            results = run(store, [url for _, url in pages], scrape_and_probe, setup_driver, n_workers,
+                          policy=policy, driver=handed)
+            for (page, _), result in zip(pages, results):
+                if result is None:
+                    catalog.fail(f"página {page} fallida en el reparto")
+                    continue
+                pager.page = page
+                if not pager.accept(result):
+                    return
+                catalog.add(result)
+
+            announced = probe.get("last_page") or 0
+            if announced > pager.page:
+                pager.last_page = announced
+            elif probe.get("has_next"):
+                pager.last_page = pager.page + n_workers
+            else:
+                return
+            print(f"   -> La paginación sigue después de la página {pager.page}.")
+    finally:
+        if driver is not None:
+            driver.quit()
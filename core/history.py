@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+from core.normalize import parse_price, product_key
+
+DAY = 86400
+
+# Cada serie (tienda, producto) se guarda como tramos run-length: un tramo cubre
+# [start_ts, end_ts] con el mismo precio. La tabla `points` es WITHOUT ROWID con
+# clave (series_id, start_ts), así los tramos de un producto quedan contiguos en
+# disco y una consulta por producto es un único recorrido del índice.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id         INTEGER PRIMARY KEY,
+    store      TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    currency   TEXT,
+    last_start REAL,
+    last_price REAL,
+    UNIQUE (store, product_id)
+);
+CREATE TABLE IF NOT EXISTS points (
+    series_id INTEGER NOT NULL,
+    start_ts  REAL NOT NULL,
+    end_ts    REAL NOT NULL,
+    price     REAL NOT NULL,
+    samples   INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (series_id, start_ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_points_end ON points (end_ts);
+"""
+
+DROPS_SQL = """
+SELECT s.store, s.product_id, s.currency, s.last_price AS price,
+       COALESCE(
+           (SELECT p.price FROM points p
+             WHERE p.series_id = s.id AND p.start_ts <= :since
+             ORDER BY p.start_ts DESC LIMIT 1),
+           (SELECT p.price FROM points p
+             WHERE p.series_id = s.id AND p.start_ts > :since
+             ORDER BY p.start_ts LIMIT 1)
+       ) AS base_price
+FROM series s
+WHERE s.last_start IS NOT NULL {store_filter}
+"""
+
+
+class PriceHistory:
+    """
+    Historial de precios por producto en SQLite, compactado por tramos sin cambio.
+    """
+
+    def __init__(self, path="historial.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _series_ids(self, store, keys):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO series (store, product_id) VALUES (?, ?)",
+            [(store, key) for key in keys],
+        )
+        ids = {}
+        for row in self.conn.execute(
+            "SELECT id, product_id, last_start, last_price FROM series WHERE store = ?", (store,)
+        ):
+            ids[row["product_id"]] = (row["id"], row["last_start"], row["last_price"])
+        return ids
+
+    def append_run(self, store, products, timestamp=None):
+        """
+        Agrega los precios de una corrida. Si el precio no cambió respecto al último
+        tramo, sólo se extiende su end_ts; si cambió, se abre un tramo nuevo.
+        """
+        ts = timestamp if timestamp is not None else time.time()
+
+        prices = {}
+        for item in products:
+            amount, currency = parse_price(item.get("price"))
+            if amount is not None:
+                prices[product_key(item)] = (amount, currency)
+
+        extend, insert, heads = [], [], []
+        with self.conn:
+            ids = self._series_ids(store, prices.keys())
+            for key, (amount, currency) in prices.items():
+                sid, last_start, last_price = ids[key]
+                if last_start is not None and ts <= last_start:
+                    continue
+                if last_price is not None and last_price == amount:
+                    extend.append((ts, sid, last_start))
+                else:
+                    insert.append((sid, ts, ts, amount))
+                    heads.append((ts, amount, currency, sid))
+
+            self.conn.executemany(
+                "UPDATE points SET end_ts = ?, samples = samples + 1 WHERE series_id = ? AND start_ts = ?",
+                extend,
+            )
+            self.conn.executemany(
+                "INSERT INTO points (series_id, start_ts, end_ts, price) VALUES (?, ?, ?, ?)", insert
+            )
+            self.conn.executemany(
+                "UPDATE series SET last_start = ?, last_price = ?, currency = ? WHERE id = ?", heads
+            )
+
+        return {"extended": len(extend), "new_points": len(insert)}
+
+    def history(self, store, product_id, start=None, end=None):
+        """
+        Tramos de precio de un producto, opcionalmente limitados a [start, end].
+        """
+        sql = """
+            SELECT p.start_ts, p.end_ts, p.price, p.samples, s.currency
+            FROM series s JOIN points p ON p.series_id = s.id
+            WHERE s.store = ? AND s.product_id = ?
+        """
+        params = [store, product_id]
+        if start is not None:
+            sql += " AND p.end_ts >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND p.start_ts <= ?"
+            params.append(end)
+        sql += " ORDER BY p.start_ts"
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def price_drops(self, since, threshold=0.10, store=None):
+        """
+        Productos cuyo precio actual es al menos `threshold` menor que el vigente en `since`.
+        """
+        params = {"since": since}
+        store_filter = ""
+        if store:
+            store_filter = "AND s.store = :store"
+            params["store"] = store
+
+        drops = []
+        for row in self.conn.execute(DROPS_SQL.format(store_filter=store_filter), params):
+            base = row["base_price"]
+            if not base or row["price"] is None:
+                continue
+            change = (base - row["price"]) / base
+            if change >= threshold:
+                drops.append({
+                    "store": row["store"],
+                    "product_id": row["product_id"],
+                    "currency": row["currency"],
+                    "before": base,
+                    "now": row["price"],
+                    "drop": round(change, 4),
+                })
+        drops.sort(key=lambda d: d["drop"], reverse=True)
+        return drops
+
+    def downsample(self, older_than, bucket=DAY):
+        """
+        Reduce la resolución de los tramos anteriores a `older_than`: deja a lo sumo un
+        tramo por `bucket` (el último precio del periodo) y vuelve a fusionar los tramos
+        consecutivos con el mismo precio.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT p.series_id, p.start_ts, p.end_ts, p.price, p.samples
+            FROM points p JOIN series s ON s.id = p.series_id
+            WHERE p.end_ts < ? AND p.start_ts <> s.last_start
+            ORDER BY p.series_id, p.start_ts
+            """,
+            (older_than,),
+        ).fetchall()
+
+        by_series = {}
+        for row in rows:
+            by_series.setdefault(row["series_id"], []).append(row)
+
+        deleted, inserted = [], []
+        for sid, points in by_series.items():
+            compacted = []
+            for row in points:
+                slot = int(row["start_ts"] // bucket)
+                if compacted and (compacted[-1]["slot"] == slot or compacted[-1]["price"] == row["price"]):
+                    last = compacted[-1]
+                    last["end_ts"] = row["end_ts"]
+                    last["price"] = row["price"]
+                    last["samples"] += row["samples"]
+                    last["slot"] = slot
+                else:
+                    compacted.append({
+                        "start_ts": row["start_ts"], "end_ts": row["end_ts"],
+                        "price": row["price"], "samples": row["samples"], "slot": slot,
+                    })
+            if len(compacted) == len(points):
+                continue
+            deleted.extend((sid, row["start_ts"]) for row in points)
+            inserted.extend((sid, c["start_ts"], c["end_ts"], c["price"], c["samples"]) for c in compacted)
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM points WHERE series_id = ? AND start_ts = ?", deleted)
+            self.conn.executemany(
+                "INSERT INTO points (series_id, start_ts, end_ts, price, samples) VALUES (?, ?, ?, ?, ?)",
+                inserted,
+            )
+        return {"before": len(deleted), "after": len(inserted)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historial de precios por producto.")
+    parser.add_argument("--db", default="historial.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Agrega uno o más *_laptops.json de una tienda.")
+    ingest.add_argument("store")
+    ingest.add_argument("json_files", nargs="+")
+
+    show = sub.add_parser("history", help="Historial de un producto.")
+    show.add_argument("store")
+    show.add_argument("product_id")
+
+    drops = sub.add_parser("drops", help="Productos que bajaron de precio.")
+    drops.add_argument("--days", type=float, default=7)
+    drops.add_argument("--threshold", type=float, default=0.10)
+    drops.add_argument("--store")
+
+    compact = sub.add_parser("compact", help="Reduce la resolución de datos antiguos.")
+    compact.add_argument("--older-than-days", type=float, default=30)
+    compact.add_argument("--bucket-hours", type=float, default=24)
+
+    args = parser.parse_args()
+
+    with PriceHistory(args.db) as db:
+        if args.command == "ingest":
+            # Los archivos se agregan en orden cronológico usando su fecha de modificación.
+            for path in sorted(args.json_files, key=os.path.getmtime):
+                with open(path, encoding='utf-8') as f:
+                    products = json.load(f)
+                summary = db.append_run(args.store, products, os.path.getmtime(path))
+                print(f"{path}: {summary['new_points']} tramos nuevos, {summary['extended']} extendidos.")
+        elif args.command == "history":
+            print(json.dumps(db.history(args.store, args.product_id), indent=4))
+        elif args.command == "drops":
+            since = time.time() - args.days * DAY
+            print(json.dumps(db.price_drops(since, args.threshold, args.store), indent=4, ensure_ascii=False))
+        else:
+            cutoff = time.time() - args.older_than_days * DAY
+            summary = db.downsample(cutoff, args.bucket_hours * 3600)
+            print(f"Compactación: {summary['before']} tramos -> {summary['after']}.")
+
+
+if __name__ == "__main__":
+    main()
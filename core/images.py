@@ -0,0 +1,137 @@
+import os
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from core.normalize import VTEX_SIZE_RE
+
+NO_IMAGE = "No imagen"
+
+# Atributos donde las librerías de lazy loading dejan la URL real, en orden de preferencia.
+LAZY_ATTRS = ("data-src", "data-original", "data-lazy", "data-lazy-src", "data-url")
+SRCSET_ATTRS = ("data-srcset", "srcset", "data-lazy-srcset")
+
+PLACEHOLDER_RE = re.compile(
+    r"placeholder|lazy|blank\.gif|spacer|transparent|1x1|(^|[-_.])load(ing|er)?\.(gif|png|svg)", re.IGNORECASE
+)
+
+# Resolución por tienda: "large" (la mayor del srcset), "small" (la menor) o un ancho en px
+# (la más cercana; en VTEX además se reescribe el tamaño en la URL).
+RESOLUTIONS = {
+    "hp": "large",
+    "infotec": "large",
+    "lenovo": "large",
+    "oechsle": 500,
+}
+
+# Un src solo se acepta como imagen real si contiene esta marca (si no, se busca en los atributos lazy).
+REAL_SRC_HINTS = {
+    "oechsle": "arquivos/ids",
+}
+
+# Tiendas cuyo scroll solo sirve para disparar el lazy loading de imágenes: si la primera
+# extracción ya resuelve la imagen de todos los productos, el scroll se salta.
+NO_SCROLL_STORES = {"hp", "infotec", "oechsle"}
+
+
+def no_scroll_enabled():
+    return os.environ.get("SCRAPER_NO_SCROLL", "1") != "0"
+
+
+def is_placeholder(url):
+    return not url or url.startswith("data:") or bool(PLACEHOLDER_RE.search(url.rsplit("/", 1)[-1]))
+
+
+def parse_srcset(value):
+    """
+    "a.jpg 320w, b.jpg 640w" -> [(320, "a.jpg"), (640, "b.jpg")]. Los descriptores "2x" cuentan como 1000 * x.
+    """
+    candidates = []
+    for part in (value or "").split(","):
+        bits = part.strip().split()
+        if not bits:
+            continue
+        size = 0
+        if len(bits) > 1:
+            descriptor = bits[1].lower()
+            try:
+                if descriptor.endswith("w"):
+                    size = int(float(descriptor[:-1]))
+                elif descriptor.endswith("x"):
+                    size = int(float(descriptor[:-1]) * 1000)
+            except ValueError:
+                size = 0
+        candidates.append((size, bits[0]))
+    return candidates
+
+
+def _pick(candidates, resolution):
+    candidates = [(size, url) for size, url in candidates if not is_placeholder(url)]
+    if not candidates:
+        return None
+    if resolution == "small":
+        return min(candidates)[1]
+    if isinstance(resolution, int):
+        return min(candidates, key=lambda c: abs(c[0] - resolution))[1]
+    return max(candidates)[1]
+
+
+def _normalize(url, base_url, resolution):
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+    elif base_url and not url.startswith("http"):
+        url = urljoin(base_url, url)
+    if isinstance(resolution, int):
+        url = VTEX_SIZE_RE.sub(rf"\1-{resolution}-{resolution}", url)
+    return url
+
+
+def best_image_url(img_tag, store=None, card=None, base_url=None, default=NO_IMAGE):
+    """
+    Mejor URL de imagen desde el markup, sin depender de que el scroll haya copiado el lazy a src:
+    srcset/data-srcset (según la resolución de la tienda), src si no es un placeholder,
+    data-src/data-original/data-lazy y, si no hay nada, el <img> dentro de un <noscript> del card.
+    """
+    resolution = RESOLUTIONS.get(store, "large")
+    hint = REAL_SRC_HINTS.get(store)
+
+    candidates = []
+    if img_tag is not None:
+        for attr in SRCSET_ATTRS:
+            candidates.extend(parse_srcset(img_tag.get(attr)))
+        picked = _pick(candidates, resolution)
+        if picked:
+            return _normalize(picked, base_url, resolution)
+
+        src = img_tag.get("src")
+        if src and not is_placeholder(src) and (hint is None or hint in src):
+            return _normalize(src, base_url, resolution)
+        for attr in LAZY_ATTRS:
+            value = img_tag.get(attr)
+            if value and not is_placeholder(value):
+                return _normalize(value, base_url, resolution)
+
+    scope = card if card is not None else (img_tag.parent if img_tag is not None else None)
+    noscript = scope.find("noscript") if scope is not None else None
+    if noscript is not None:
+        # Según el parser el contenido del <noscript> llega como tags o como texto.
+        fallback = noscript.find("img") or BeautifulSoup(noscript.get_text(), 'html.parser').find("img")
+        if fallback is not None:
+            return best_image_url(fallback, store, card=fallback, base_url=base_url, default=default)
+
+    # Sin alternativa, un src que no cumple la marca de la tienda es mejor que nada.
+    src = img_tag.get("src") if img_tag is not None else None
+    if src and not is_placeholder(src):
+        return _normalize(src, base_url, resolution)
+    return default
+
+
+def covered(store, products, missing=(None, "", NO_IMAGE)):
+    """
+    True si la tienda admite el modo sin scroll y todos los productos ya tienen imagen.
+    """
+    if store not in NO_SCROLL_STORES or not no_scroll_enabled() or not products:
+        return False
+    return all(p.get("image_url") not in missing for p in products)
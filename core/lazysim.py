@@ -0,0 +1,355 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from core import plugins
+from core.mock_server import PLACEHOLDER_IMG
+
+READY_TIMEOUT = 10
+
+# Escenarios predefinidos (sobre los valores por defecto de SimConfig).
+SCENARIOS = {
+    "observer": {},
+    "observer-lento": {"lazy_delay_ms": 600, "lazy_jitter_ms": 600, "image_latency_ms": 150},
+    "scroll-event": {"lazy": "scroll", "scroll_throttle_ms": 250},
+    "infinito": {"infinite_batches": 3, "batch_delay_ms": 800},
+    "ver-mas": {"ver_mas_batches": 3, "batch_delay_ms": 1500},
+    "hidratacion": {"hydrate_delay_ms": 2000, "infinite_batches": 1, "batch_delay_ms": 500},
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Simulador lazy</title>
+<style>
+body {{ margin: 0; font-family: sans-serif; }}
+header {{ height: 180px; background: #eee; }}
+#grid {{ display: flex; flex-wrap: wrap; list-style: none; padding: 0; margin: 0; }}
+li.product_item {{ width: {width}%; height: {card_height}px; box-sizing: border-box; padding: 8px; }}
+li.product_item img {{ width: 100%; height: {image_height}px; display: block; background: #ddd; }}
+footer {{ height: 600px; background: #333; }}
+</style></head>
+<body>
+<header>Simulador de carga lazy</header>
+<ul id="grid">{first}</ul>
+{templates}
+{button}
+<footer></footer>
+<script>
+(function () {{
+  var cfg = {config};
+  var grid = document.getElementById('grid');
+  var batches = Array.prototype.slice.call(document.querySelectorAll('template.sim-batch'));
+  var observer = null, loadingBatch = false, lastCheck = 0;
+  window.__sim = {{revealed: 0, batches: 0}};
+
+  function reveal(img) {{
+    if (img.hasAttribute('data-revealed')) return;
+    img.setAttribute('data-revealed', '1');
+    window.__sim.revealed += 1;
+    setTimeout(function () {{ img.src = img.getAttribute('data-src'); }}, +img.getAttribute('data-delay'));
+  }}
+
+  function inRange(img) {{
+    var box = img.getBoundingClientRect();
+    return box.bottom >= -cfg.root_margin && box.top <= window.innerHeight + cfg.root_margin;
+  }}
+
+  function watch() {{
+    if (cfg.lazy !== 'observer') return;
+    document.querySelectorAll('img[data-src]:not([data-watched])').forEach(function (img) {{
+      img.setAttribute('data-watched', '1');
+      observer.observe(img);
+    }});
+  }}
+
+  function appendBatch() {{
+    var batch = batches.shift();
+    if (!batch) return;
+    grid.insertAdjacentHTML('beforeend', batch.innerHTML);
+    batch.remove();
+    window.__sim.batches += 1;
+    watch();
+  }}
+
+  // Scroll viejo: throttle sin llamada final, un salto rápido puede dejar imágenes sin revisar.
+  function onScroll() {{
+    var now = Date.now();
+    if (cfg.lazy === 'scroll' && now - lastCheck >= cfg.scroll_throttle_ms) {{
+      lastCheck = now;
+      document.querySelectorAll('img[data-src]:not([data-revealed])').forEach(function (img) {{
+        if (inRange(img)) reveal(img);
+      }});
+    }}
+    var bottom = window.innerHeight + window.scrollY >= document.body.scrollHeight - 300;
+    if (cfg.infinite && bottom && !loadingBatch && batches.length) {{
+      loadingBatch = true;
+      setTimeout(function () {{ appendBatch(); loadingBatch = false; }}, cfg.batch_delay_ms);
+    }}
+  }}
+
+  if (cfg.lazy === 'observer') {{
+    observer = new IntersectionObserver(function (entries) {{
+      entries.forEach(function (entry) {{
+        if (!entry.isIntersecting) return;
+        observer.unobserve(entry.target);
+        reveal(entry.target);
+      }});
+    }}, {{rootMargin: cfg.root_margin + 'px'}});
+  }}
+  window.addEventListener('scroll', onScroll, {{passive: true}});
+
+  var button = document.querySelector('button.pc_more');
+  if (button) {{
+    button.addEventListener('click', function () {{
+      button.disabled = true;
+      setTimeout(function () {{
+        appendBatch();
+        button.disabled = false;
+        if (!batches.length) button.remove();
+      }}, cfg.batch_delay_ms);
+    }});
+  }}
+
+  if (cfg.hydrate_delay_ms) {{
+    setTimeout(function () {{ appendBatch(); onScroll(); }}, cfg.hydrate_delay_ms);
+  }} else {{
+    watch();
+    onScroll();
+  }}
+}})();
+</script>
+</body></html>
+"""
+
+COMPLETENESS_JS = """
+var images = document.querySelectorAll('li.product_item img'), loaded = 0;
+for (var i = 0; i < images.length; i++) {
+    var img = images[i], src = img.currentSrc || img.src || '';
+    if (img.complete && img.naturalWidth > 1 && src.indexOf('data:') !== 0) loaded++;
+}
+return {rendered: document.querySelectorAll('li.product_item').length, images_loaded: loaded,
+        revealed: window.__sim ? window.__sim.revealed : 0};
+"""
+
+
+class SimConfig:
+    """
+    Página de prueba determinística: mismas semillas, mismo HTML y mismas demoras por imagen.
+    - lazy: "observer" (IntersectionObserver), "scroll" (evento scroll con throttle) o "none".
+    - infinite_batches / ver_mas_batches: tandas extra que llegan al acercarse al fondo o con el botón "Ver más".
+    - hydrate_delay_ms: la grilla aparece recién después de esa demora (SPA que hidrata tarde).
+    """
+
+    FIELDS = {
+        "products": 48, "columns": 4, "card_height": 380, "lazy": "observer", "lazy_delay_ms": 150,
+        "lazy_jitter_ms": 100, "root_margin": 0, "scroll_throttle_ms": 100, "image_latency_ms": 0,
+        "infinite_batches": 0, "ver_mas_batches": 0, "batch_delay_ms": 500, "hydrate_delay_ms": 0, "seed": 7,
+    }
+
+    def __init__(self, **values):
+        unknown = set(values) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+        for name, default in self.FIELDS.items():
+            value = values.get(name, default)
+            setattr(self, name, value if isinstance(default, str) else int(value))
+
+    @classmethod
+    def scenario(cls, name, **overrides):
+        return cls(**{**SCENARIOS[name], **overrides})
+
+    @classmethod
+    def from_query(cls, query):
+        return cls(**{k: v[0] for k, v in parse_qs(query).items()})
+
+    def to_query(self):
+        return urlencode({name: getattr(self, name) for name in self.FIELDS})
+
+    @property
+    def batch_count(self):
+        return self.infinite_batches + self.ver_mas_batches + (1 if self.hydrate_delay_ms else 0)
+
+
+def render_page(config):
+    rng = random.Random(config.seed)
+    items = []
+    for i in range(config.products):
+        delay = config.lazy_delay_ms + rng.randint(0, config.lazy_jitter_ms)
+        real = f"/img/{i}.svg?latency={config.image_latency_ms}"
+        if config.lazy == "none":
+            image = f'<img src="{real}" alt="">'
+        else:
+            image = f'<img src="{PLACEHOLDER_IMG}" data-src="{real}" data-delay="{delay}" alt="">'
+        items.append(f'<li class="product_item" data-sim-id="{i}">{image}<span class="name">Producto {i}</span></li>')
+
+    # La primera tanda va en el HTML (salvo hidratación tardía) y el resto en <template>.
+    parts = config.batch_count + (0 if config.hydrate_delay_ms else 1)
+    size = -(-config.products // parts)
+    chunks = [items[i:i + size] for i in range(0, len(items), size)]
+    first = [] if config.hydrate_delay_ms else chunks.pop(0)
+    templates = "".join(f'<template class="sim-batch">{"".join(chunk)}</template>' for chunk in chunks)
+    button = '<button class="pc_more">Ver más</button>' if config.ver_mas_batches else ""
+
+    js_config = {
+        "lazy": config.lazy, "root_margin": config.root_margin, "scroll_throttle_ms": config.scroll_throttle_ms,
+        "infinite": bool(config.infinite_batches), "batch_delay_ms": config.batch_delay_ms,
+        "hydrate_delay_ms": config.hydrate_delay_ms,
+    }
+    return PAGE_TEMPLATE.format(
+        width=round(100 / config.columns, 4), card_height=config.card_height, image_height=config.card_height - 60,
+        first="".join(first), templates=templates, button=button, config=json.dumps(js_config),
+    )
+
+
+def render_image(index):
+    hue = (int(index) * 47) % 360
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="300" height="300">'
+            f'<rect width="300" height="300" fill="hsl({hue},60%,60%)"/></svg>')
+
+
+class _SimHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/page":
+            try:
+                config = SimConfig.from_query(parts.query)
+            except ValueError as e:
+                self._send(400, str(e), "text/plain; charset=utf-8")
+                return
+            self._send(200, render_page(config), "text/html; charset=utf-8")
+        elif parts.path.startswith("/img/"):
+            latency = int(parse_qs(parts.query).get("latency", ["0"])[0])
+            if latency:
+                time.sleep(latency / 1000)
+            index = parts.path.rsplit("/", 1)[1].split(".")[0]
+            self._send(200, render_image(index), "image/svg+xml")
+        else:
+            self._send(404, "", "text/plain")
+
+
+def start_server(host="127.0.0.1", port=8766):
+    server = ThreadingHTTPServer((host, port), _SimHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(driver, store, base_url, scenario, config):
+    """
+    Carga la página del escenario, corre el scroll de la tienda y mide cuánto quedó cargado.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    plugin = plugins.get(store)
+    row = {"store": store, "scenario": scenario, "expected": config.products, "error": None}
+    driver.get(f"{base_url}/page?{config.to_query()}")
+    try:
+        WebDriverWait(driver, READY_TIMEOUT).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "li.product_item"))
+        )
+    except Exception:
+        row["error"] = "timeout"
+
+    start = time.perf_counter()
+    try:
+        plugin.scroll(driver)
+    except Exception as e:
+        row["error"] = type(e).__name__
+    row["scroll_s"] = round(time.perf_counter() - start, 2)
+
+    row.update(driver.execute_script(COMPLETENESS_JS))
+    row["products_pct"] = round(100 * row["rendered"] / config.products, 1)
+    row["images_pct"] = round(100 * row["images_loaded"] / config.products, 1)
+    row["complete"] = row["rendered"] == config.products and row["images_loaded"] == config.products
+    return row
+
+
+def run(stores, scenarios, host="127.0.0.1", port=8766, driver=None, overrides=None):
+    """
+    Corre el scroll de cada tienda contra cada escenario con un mismo driver y devuelve las filas.
+    """
+    server = start_server(host, port)
+    base_url = f"http://{host}:{port}"
+    own_driver = driver is None
+    driver = driver or plugins.get(stores[0]).setup_driver()
+    rows = []
+    try:
+        for scenario in scenarios:
+            config = SimConfig.scenario(scenario, **(overrides or {}))
+            for store in stores:
+                print(f"[{scenario}] {store}...")
+                rows.append(measure(driver, store, base_url, scenario, config))
+    finally:
+        if own_driver:
+            driver.quit()
+        server.shutdown()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de carga lazy para probar las rutinas de scroll.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Sirve las páginas de prueba (/page?escenario...).")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8766)
+
+    bench = sub.add_parser("run", help="Corre el scroll de las tiendas contra los escenarios.")
+    bench.add_argument("--stores", nargs="+", default=plugins.names())
+    bench.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    bench.add_argument("--set", nargs="*", default=[], metavar="CAMPO=VALOR",
+                       help="Sobrescribe parámetros de SimConfig en todos los escenarios.")
+    bench.add_argument("--port", type=int, default=8766)
+    bench.add_argument("--learn", action="store_true",
+                       help="Usa y actualiza el scroll aprendido (core.scrolling); por defecto se prueban los valores de partida.")
+    bench.add_argument("--output", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        start_server(args.host, args.port)
+        print(f"Simulador en http://{args.host}:{args.port}/page?{SimConfig().to_query()}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    if not args.learn:
+        os.environ["SCRAPER_SCROLL_ADAPT"] = "0"
+    overrides = dict(item.split("=", 1) for item in args.set)
+    rows = run(args.stores, args.scenarios, port=args.port, overrides=overrides)
+
+    print(f"\n{'tienda':12} {'escenario':15} {'productos':>10} {'imágenes':>9} {'scroll s':>9}")
+    for row in rows:
+        flag = "" if row["complete"] else "  <- incompleto"
+        print(f"{row['store']:12} {row['scenario']:15} {row['products_pct']:9.1f}% {row['images_pct']:8.1f}% "
+              f"{row['scroll_s']:9.2f}{flag}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=4)
+        print(f"Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+from core import sites
+
+POLL_INTERVAL = 0.25
+# Si el HTML sigue parseándose (un script síncrono de terceros lo frena), el listado se da
+# por completo cuando la cantidad de elementos no cambia durante este tiempo.
+STABLE_SECONDS = 1.0
+
+# El documento anterior queda marcado: con pageLoadStrategy "none" driver.get vuelve antes del
+# cambio de página y no hay que confundir el listado viejo con el nuevo.
+MARK_JS = "window.__scraperStale = true;"
+READY_JS = """
+if (window.__scraperStale) return [0, "loading"];
+return [document.querySelectorAll(arguments[0]).length, document.readyState];
+"""
+
+
+def stop(driver):
+    """
+    Corta la carga de lo que quede pendiente (widgets, trackers, imágenes) y deja el DOM como está.
+    """
+    try:
+        driver.execute_script("window.stop();")
+    except Exception:
+        pass
+
+
+def wait_ready(driver, ready_selector, deadline):
+    count, stable_since = 0, time.monotonic()
+    while True:
+        try:
+            found, state = driver.execute_script(READY_JS, ready_selector)
+        except Exception:
+            # Entre el commit de la navegación y el nuevo documento el contexto JS puede no existir.
+            found, state = 0, "loading"
+        now = time.monotonic()
+        if found != count:
+            count, stable_since = found, now
+        if count and (state != "loading" or now - stable_since >= STABLE_SECONDS):
+            if state != "complete":
+                stop(driver)
+            return True
+        if now >= deadline:
+            stop(driver)
+            return False
+        time.sleep(POLL_INTERVAL)
+
+
+def load(store, driver, url, ready_selector, budget=None):
+    """
+    Navega a url con la estrategia de carga de la tienda y un tope duro de `budget` segundos
+    (sites.navigation_budget). Apenas el listado (ready_selector) está en el DOM se llama a
+    window.stop() y se vuelve; si el tope se agota se corta igual y el DOM parcial queda para extraer.
+    Devuelve True si el listado apareció a tiempo.
+    """
+    budget = budget or sites.navigation_budget(store)
+    deadline = time.monotonic() + budget
+    # CDPDriver aplica la estrategia en cada get() y se restaura al terminar (el driver puede
+    # ser compartido con otras tiendas); en Selenium se fija al crear la sesión (setup_driver).
+    previous = getattr(driver, "page_load_strategy", None)
+    if previous is not None:
+        driver.page_load_strategy = sites.page_load_strategy(store)
+    driver.set_page_load_timeout(budget)
+
+    try:
+        try:
+            driver.execute_script(MARK_JS)
+        except Exception:
+            pass
+        try:
+            driver.get(url)
+        except (TimeoutException, TimeoutError):
+            stop(driver)
+        return wait_ready(driver, ready_selector, deadline)
+    finally:
+        if previous is not None:
+            driver.page_load_strategy = previous
@@ -0,0 +1,189 @@
+import argparse
+import hashlib
+import json
+import random
+import re
+import time
+import unicodedata
+
+# Palabras que aparecen en casi todos los nombres y no ayudan a distinguir modelos.
+STOPWORDS = {
+    "laptop", "laptops", "notebook", "portatil", "de", "con", "y", "en", "para", "the",
+    "pulgadas", "pulg", "windows", "win", "home", "pro", "negro", "gris", "plata", "color",
+}
+
+TOKEN_RE = re.compile(r'[a-z0-9]+(?:[-/][a-z0-9]+)*')
+
+# Códigos que parecen de modelo pero se repiten entre equipos distintos (CPU, GPU, memoria...).
+GENERIC_CODE_RE = re.compile(
+    r'^(?:i[3579]\d{4,5}[a-z]*|\d{1,2}(?:gb|tb|hz|w)|\d{3,4}(?:gb|hz)|rtx\d{4}|gtx\d{4}'
+    r'|ddr\d|lpddr\d\w*|ultra\d|r[3579]\d{4}[a-z]*|\d{4}x\d{3,4}|wifi\d\w*|win1\d\w*)$'
+)
+
+LSH_BANDS = 12
+LSH_ROWS = 4
+NUM_PERM = LSH_BANDS * LSH_ROWS
+MAX_BUCKET = 200
+# Códigos cortos (ej. "15irh8") identifican una familia, no un SKU: sólo generan candidatos.
+STRONG_CODE_LEN = 8
+MERSENNE = (1 << 61) - 1
+
+
+def _strip_accents(text):
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(name):
+    """
+    Tokens normalizados del nombre (minúsculas, sin tildes ni palabras vacías).
+    """
+    text = _strip_accents((name or "").lower())
+    return [t for t in TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+def model_codes(tokens):
+    """
+    Extrae códigos de modelo / número de parte: tokens alfanuméricos largos con letras
+    y dígitos (82XV00ABLM, G614JV-N3094W, 15-fd0005la), descartando specs genéricas.
+    """
+    codes = set()
+    for token in tokens:
+        # "15-fb0105la" y "15 FB0105LA" deben compartir el código "fb0105la".
+        variants = [token.replace("-", "").replace("/", "")] + re.split(r'[-/]', token)
+        for code in variants:
+            if len(code) < 6 or code.isdigit() or code.isalpha():
+                continue
+            if GENERIC_CODE_RE.match(code):
+                continue
+            codes.add(code)
+    return codes
+
+
+def _shingles(tokens):
+    shingles = set(tokens)
+    shingles.update(a + " " + b for a, b in zip(tokens, tokens[1:]))
+    return shingles
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+
+class MatchIndex:
+    """
+    Índice para encontrar el mismo producto en distintas tiendas sin comparar todos
+    contra todos. Los candidatos salen de dos índices invertidos: por código de
+    modelo (coincidencia exacta) y por bandas MinHash/LSH del nombre. Sólo se
+    puntúan los pares que comparten algún bucket.
+    """
+
+    def __init__(self, seed=7):
+        rnd = random.Random(seed)
+        self.perms = [(rnd.randrange(1, MERSENNE), rnd.randrange(0, MERSENNE)) for _ in range(NUM_PERM)]
+        self.rows = []
+        self.code_index = {}
+        self.lsh_index = {}
+
+    def _signature(self, shingles):
+        hashes = [_hash64(s) for s in shingles]
+        return [min((a * h + b) % MERSENNE for h in hashes) for a, b in self.perms]
+
+    def add(self, store, item):
+        tokens = tokenize(item.get("name"))
+        if not tokens:
+            return None
+        row_id = len(self.rows)
+        codes = model_codes(tokens)
+        self.rows.append({"store": store, "item": item, "tokens": set(tokens), "codes": codes})
+
+        for code in codes:
+            self.code_index.setdefault(code, []).append(row_id)
+
+        signature = self._signature(_shingles(tokens))
+        for band in range(LSH_BANDS):
+            key = (band, tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+            self.lsh_index.setdefault(key, []).append(row_id)
+        return row_id
+
+    def candidates(self):
+        """
+        Pares (i, j) de tiendas distintas que comparten un código o un bucket LSH.
+        Los buckets más grandes que MAX_BUCKET se ignoran (son nombres genéricos).
+        """
+        seen = set()
+        for bucket in list(self.code_index.values()) + list(self.lsh_index.values()):
+            if len(bucket) < 2 or len(bucket) > MAX_BUCKET:
+                continue
+            for x in range(len(bucket)):
+                for y in range(x + 1, len(bucket)):
+                    i, j = bucket[x], bucket[y]
+                    if self.rows[i]["store"] == self.rows[j]["store"]:
+                        continue
+                    pair = (i, j) if i < j else (j, i)
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+    def score(self, i, j):
+        a, b = self.rows[i], self.rows[j]
+        if any(len(code) >= STRONG_CODE_LEN for code in a["codes"] & b["codes"]):
+            return 1.0
+        union = a["tokens"] | b["tokens"]
+        return len(a["tokens"] & b["tokens"]) / len(union) if union else 0.0
+
+    def matches(self, threshold=0.6):
+        """
+        Agrupa los productos equivalentes (union-find sobre los pares aceptados).
+        Devuelve una lista de grupos, cada uno con sus (tienda, producto).
+        """
+        parent = list(range(len(self.rows)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for i, j in self.candidates():
+            if self.score(i, j) >= threshold:
+                parent[find(i)] = find(j)
+
+        groups = {}
+        for row_id in range(len(self.rows)):
+            groups.setdefault(find(row_id), []).append(row_id)
+
+        result = []
+        for members in groups.values():
+            if len({self.rows[m]["store"] for m in members}) < 2:
+                continue
+            result.append([{**self.rows[m]["item"], "store": self.rows[m]["store"]} for m in members])
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encuentra el mismo producto en distintas tiendas.")
+    parser.add_argument("inputs", nargs="+", help="tienda=archivo.json")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--out", default="matches.json")
+    args = parser.parse_args()
+
+    index = MatchIndex()
+    start = time.perf_counter()
+    for spec in args.inputs:
+        store, path = spec.split("=", 1)
+        with open(path, encoding='utf-8') as f:
+            for item in json.load(f):
+                index.add(store, item)
+
+    groups = index.matches(args.threshold)
+    elapsed = time.perf_counter() - start
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(groups, f, indent=4, ensure_ascii=False)
+
+    print(f"{len(index.rows)} productos, {len(groups)} grupos entre tiendas en {elapsed:.2f}s.")
+    print(f"Archivo guardado: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import argparse
+import atexit
+import json
+import os
+import signal
+import threading
+import weakref
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from core import metrics
+
+# Presupuesto de RSS de un driver (chromedriver + Chrome + renderers). 0 desactiva el reciclado.
+DEFAULT_BUDGET_MB = 1536
+
+BROWSER_NAMES = ("chrome", "chromium", "chromium-browser", "google-chrome", "headless_shell")
+DRIVER_NAMES = ("chromedriver",)
+# Nombres del PID 1 con los que "padre 1" sí significa huérfano (reparentado a init).
+INIT_NAMES = ("init", "systemd", "launchd", "tini", "dumb-init", "docker-init", "catatonit")
+
+_lock = threading.Lock()
+_pending = set()
+_baselines = weakref.WeakKeyDictionary()
+_tracked = weakref.WeakSet()
+_state = {"started": False}
+
+
+def budget_mb():
+    return float(os.environ.get("SCRAPER_MEMORY_MB", DEFAULT_BUDGET_MB))
+
+
+def processes():
+    """
+    Procesos del sistema como dicts {pid, ppid, name, cmdline, rss_mb}; con psutil si está, si no desde /proc.
+    """
+    result = []
+    if psutil is not None:
+        for proc in psutil.process_iter(["pid", "ppid", "name", "cmdline", "memory_info", "uids"]):
+            info = proc.info
+            if info["memory_info"] is None:
+                continue
+            result.append({
+                "pid": info["pid"], "ppid": info["ppid"], "name": info["name"] or "",
+                "cmdline": " ".join(info["cmdline"] or []), "rss_mb": info["memory_info"].rss / 1048576,
+                "uid": info["uids"].real if info["uids"] else None,
+            })
+        return result
+
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding='utf-8', errors='replace') as f:
+                stat = f.read()
+            with open(f"/proc/{entry}/cmdline", 'rb') as f:
+                cmdline = f.read().replace(b"\0", b" ").decode('utf-8', 'replace').strip()
+            with open(f"/proc/{entry}/status", encoding='utf-8') as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        # El nombre va entre paréntesis y puede tener espacios: se parte desde el último ')'.
+        name = stat[stat.index("(") + 1:stat.rindex(")")]
+        ppid = int(stat[stat.rindex(")") + 2:].split()[1])
+        rss_kb = int(status.get("VmRSS", "0 kB").split()[0])
+        uid = int(status["Uid"].split()[0]) if "Uid" in status else None
+        result.append({"pid": int(entry), "ppid": ppid, "name": name, "cmdline": cmdline,
+                       "rss_mb": rss_kb / 1024, "uid": uid})
+    return result
+
+
+def descendants(pid, table=None):
+    table = table if table is not None else processes()
+    children = {}
+    for proc in table:
+        children.setdefault(proc["ppid"], []).append(proc)
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child["pid"])
+    return found
+
+
+def driver_pid(driver):
+    """
+    Proceso raíz del driver: Chrome (CDPDriver.process) o chromedriver (Selenium), que tiene a Chrome de hijo.
+    Una pestaña de browserd no tiene proceso propio.
+    """
+    process = getattr(driver, "process", None)
+    if process is None:
+        process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def sample(driver):
+    """
+    RSS del árbol de procesos del driver separado en navegador y renderers, más el heap JS de la pestaña.
+    """
+    result = {"browser_mb": 0.0, "renderer_mb": 0.0, "js_heap_mb": None, "processes": 0}
+    pid = driver_pid(driver)
+    if pid is not None:
+        table = processes()
+        tree = [p for p in table if p["pid"] == pid] + descendants(pid, table)
+        for proc in tree:
+            key = "renderer_mb" if "--type=renderer" in proc["cmdline"] else "browser_mb"
+            result[key] += proc["rss_mb"]
+        result["processes"] = len(tree)
+    try:
+        heap = driver.execute_script("return performance.memory ? performance.memory.usedJSHeapSize : null")
+        result["js_heap_mb"] = round(heap / 1048576, 1) if heap else None
+    except Exception:
+        pass
+    result["browser_mb"] = round(result["browser_mb"], 1)
+    result["renderer_mb"] = round(result["renderer_mb"], 1)
+    result["total_mb"] = round(result["browser_mb"] + result["renderer_mb"], 1)
+    return result
+
+
+def check(store, driver):
+    """
+    Mide el driver después de una página y lo reporta en core.metrics. Si pasa el presupuesto
+    (SCRAPER_MEMORY_MB) lo marca para reciclar: retry.call llama a recover() al terminar la unidad.
+    """
+    track(driver)
+    usage = sample(driver)
+    if not usage["processes"]:
+        return usage
+
+    baseline = _baselines.setdefault(driver, usage["total_mb"])
+    usage["growth_mb"] = round(usage["total_mb"] - baseline, 1)
+    metrics.gauge("browser_rss_mb", store, usage["browser_mb"])
+    metrics.gauge("renderer_rss_mb", store, usage["renderer_mb"])
+    metrics.gauge("rss_growth_mb", store, usage["growth_mb"])
+    if usage["js_heap_mb"] is not None:
+        metrics.gauge("js_heap_mb", store, usage["js_heap_mb"])
+
+    budget = budget_mb()
+    if budget and usage["total_mb"] > budget:
+        print(f"   -> Memoria {usage['total_mb']:.0f} MB (+{usage['growth_mb']:.0f} MB) supera {budget:.0f} MB: "
+              f"se recicla el driver.")
+        with _lock:
+            _pending.add((threading.get_ident(), store))
+    return usage
+
+
+def take_recycle(store):
+    """
+    True (una sola vez) si check() marcó el driver de este hilo para reciclar.
+    """
+    key = (threading.get_ident(), store)
+    with _lock:
+        if key in _pending:
+            _pending.discard(key)
+            return True
+    return False
+
+
+def _protected(table, pid):
+    """
+    Este proceso, sus descendientes y el árbol de cada driver en uso: nunca son huérfanos.
+    """
+    protected = {pid} | {p["pid"] for p in descendants(pid, table)}
+    for driver in list(_tracked):
+        root = driver_pid(driver)
+        if root is not None:
+            protected.add(root)
+            protected.update(p["pid"] for p in descendants(root, table))
+    return protected
+
+
+def orphans(table=None, pid=None):
+    """
+    chromedriver y Chrome de automatización (con --remote-debugging-*) del mismo usuario
+    que quedaron huérfanos (padre init) tras una caída del proceso que los lanzó.
+    Si el PID 1 no es un init (contenedor cuyo PID 1 es este proceso, un scraper o browserd),
+    padre 1 no quiere decir huérfano y no se detecta nada.
+    """
+    pid = os.getpid() if pid is None else pid
+    if pid == 1:
+        return []
+    table = table if table is not None else processes()
+    init = next((p for p in table if p["pid"] == 1), None)
+    if init is not None and init["name"].lower() not in INIT_NAMES:
+        return []
+
+    protected = _protected(table, pid)
+    uid = os.getuid() if hasattr(os, "getuid") else None
+    found = []
+    for proc in table:
+        if proc["ppid"] != 1 or proc["pid"] in protected or (uid is not None and proc["uid"] != uid):
+            continue
+        name = proc["name"].lower()
+        if name in DRIVER_NAMES:
+            found.append(proc)
+        elif name in BROWSER_NAMES and "--type=" not in proc["cmdline"] and "--remote-debugging" in proc["cmdline"]:
+            found.append(proc)
+    return found
+
+
+def _kill(pids):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            continue
+
+
+def reap_orphans():
+    """
+    Mata los huérfanos y sus hijos. Si este proceso es el PID 1 (contenedor) además recoge los zombies.
+    """
+    table = processes()
+    found = orphans(table)
+    pids = []
+    for proc in found:
+        pids.append(proc["pid"])
+        pids.extend(child["pid"] for child in descendants(proc["pid"], table))
+    _kill(pids)
+    if os.getpid() == 1:
+        try:
+            while os.waitpid(-1, os.WNOHANG)[0]:
+                pass
+        except ChildProcessError:
+            pass
+    if found:
+        print(f"Procesos de Chrome huérfanos eliminados: {len(pids)}")
+    return found
+
+
+def _cleanup():
+    """
+    Al salir (incluso tras una excepción en main()) cierra los drivers que quedaron abiertos
+    y mata cualquier chromedriver/Chrome que siga colgando de este proceso.
+    """
+    for driver in list(_tracked):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    leftovers = [p["pid"] for p in descendants(os.getpid())
+                 if p["name"].lower() in BROWSER_NAMES + DRIVER_NAMES]
+    _kill(leftovers)
+
+
+def track(driver):
+    if not _state["started"]:
+        _state["started"] = True
+        reap_orphans()
+        atexit.register(_cleanup)
+    _tracked.add(driver)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memoria de los navegadores y limpieza de procesos huérfanos.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("ps", help="Árbol de chromedriver/Chrome con su RSS.")
+    sub.add_parser("reap", help="Mata los chromedriver/Chrome huérfanos.")
+    args = parser.parse_args()
+
+    if args.command == "reap":
+        print(f"Huérfanos: {len(reap_orphans())}")
+        return
+    table = processes()
+    roots = [p for p in table if p["name"].lower() in DRIVER_NAMES
+             or (p["name"].lower() in BROWSER_NAMES and "--type=" not in p["cmdline"])]
+    seen = set()
+    report = []
+    for proc in roots:
+        if proc["pid"] in seen:
+            continue
+        tree = [proc] + descendants(proc["pid"], table)
+        seen.update(p["pid"] for p in tree)
+        report.append({
+            "pid": proc["pid"], "name": proc["name"], "orphan": proc["ppid"] == 1,
+            "processes": len(tree),
+            "renderer_mb": round(sum(p["rss_mb"] for p in tree if "--type=renderer" in p["cmdline"]), 1),
+            "total_mb": round(sum(p["rss_mb"] for p in tree), 1),
+        })
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
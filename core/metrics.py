@@ -0,0 +1,238 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Contadores por tienda. Se exponen como scraper_<nombre>_total{store="..."}.
+COUNTERS = {
+    "pages_fetched": "Páginas cargadas en el navegador.",
+    "products_extracted": "Productos extraídos.",
+    "empty_pages": "Páginas cargadas sin productos.",
+    "captcha_hits": "Páginas con CAPTCHA o bloqueo.",
+    "timeouts": "Esperas (WebDriverWait / carga) agotadas.",
+    "retries": "Reintentos de una página o unidad.",
+    "driver_recycles": "Drivers recreados por pasar el presupuesto de memoria.",
+    "lazy_images_missed": "Imágenes lazy que no cargaron al terminar el scroll.",
+    "scroll_capped": "Scrolls cortados por tope de pasos o de tiempo (listado que no deja de crecer).",
+    "detail_fetches": "Páginas de detalle descargadas y parseadas (core.enrich).",
+    "detail_not_modified": "Páginas de detalle sin cambios (304) reutilizadas de la caché.",
+    "detail_cache_hits": "Productos cuyo detalle salió de la caché sin pedir la página.",
+    "detail_errors": "Páginas de detalle que fallaron tras los reintentos.",
+    "images_downloaded": "Imágenes descargadas al espejo local (core.assets).",
+    "images_not_modified": "Imágenes sin cambios (304) que no se volvieron a bajar.",
+    "image_errors": "Imágenes que fallaron o no eran una imagen válida.",
+}
+
+# Gauges por tienda (último valor). Se exponen como scraper_<nombre>{store="..."}.
+GAUGES = {
+    "browser_rss_mb": "RSS del navegador sin renderers (MB), última página.",
+    "renderer_rss_mb": "RSS de los renderers (MB), última página.",
+    "js_heap_mb": "Heap JS usado por la pestaña (MB), última página.",
+    "rss_growth_mb": "Crecimiento de RSS desde que se abrió el driver (MB).",
+}
+
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+FILE_INTERVAL = 5
+
+# Reentrante: write_file escribe bajo el lock y snapshot()/render() lo vuelven a tomar.
+_lock = threading.RLock()
+_counters = {}
+_histograms = {}
+_gauges = {}
+_state = {"started": False, "last_write": 0.0}
+
+
+def _ensure_started():
+    """
+    Activa las salidas configuradas por entorno la primera vez que se registra algo:
+    SCRAPER_METRICS_PORT (endpoint /metrics) y/o SCRAPER_METRICS_FILE (.prom o .json).
+    Con varios workers solo uno levanta el endpoint; si el puerto no sirve se avisa y se sigue
+    sin endpoint, una configuración de métricas nunca hace fallar una página.
+    """
+    if _state["started"]:
+        return
+    with _lock:
+        if _state["started"]:
+            return
+        _state["started"] = True
+
+        port = os.environ.get("SCRAPER_METRICS_PORT")
+        if port:
+            try:
+                serve(int(port))
+            except (OSError, ValueError) as e:
+                print(f"   -> No se pudo abrir el endpoint de métricas en el puerto {port!r}: {e}")
+        if os.environ.get("SCRAPER_METRICS_FILE"):
+            atexit.register(write_file)
+
+
+def count(name, store, value=1):
+    _ensure_started()
+    with _lock:
+        key = (name, store)
+        _counters[key] = _counters.get(key, 0) + value
+    _maybe_write()
+
+
+def gauge(name, store, value):
+    _ensure_started()
+    with _lock:
+        _gauges[(name, store)] = value
+    _maybe_write()
+
+
+def observe(store, phase, seconds):
+    _ensure_started()
+    with _lock:
+        key = (store, phase)
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+        hist["sum"] += seconds
+        hist["count"] += 1
+    _maybe_write()
+
+
+def record_page(store, products):
+    """
+    Registra una página procesada: cargada, productos extraídos y si vino vacía.
+    """
+    count("pages_fetched", store)
+    count("products_extracted", store, products)
+    if products == 0:
+        count("empty_pages", store)
+
+
+@contextmanager
+def timer(store, phase):
+    """
+    Mide la duración de una fase (load, wait, scroll, parse...) de una página.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(store, phase, time.perf_counter() - start)
+
+
+def snapshot():
+    with _lock:
+        counters = {}
+        for (name, store), value in _counters.items():
+            counters.setdefault(name, {})[store] = value
+        gauges = {}
+        for (name, store), value in _gauges.items():
+            gauges.setdefault(name, {})[store] = value
+        histograms = {}
+        for (store, phase), hist in _histograms.items():
+            histograms.setdefault(store, {})[phase] = {
+                "buckets": dict(zip(BUCKETS, hist["buckets"])),
+                "sum": round(hist["sum"], 4),
+                "count": hist["count"],
+            }
+    return {"timestamp": time.time(), "counters": counters, "gauges": gauges, "latency_seconds": histograms}
+
+
+def render():
+    """
+    Formato de texto de Prometheus.
+    """
+    lines = []
+    with _lock:
+        for name, help_text in COUNTERS.items():
+            metric = f"scraper_{name}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (counter, store), value in sorted(_counters.items()):
+                if counter == name:
+                    lines.append(f'{metric}{{store="{store}"}} {value}')
+
+        for name, help_text in GAUGES.items():
+            metric = f"scraper_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for (gauge_name, store), value in sorted(_gauges.items()):
+                if gauge_name == name:
+                    lines.append(f'{metric}{{store="{store}"}} {value}')
+
+        metric = "scraper_phase_seconds"
+        lines.append(f"# HELP {metric} Duración de cada fase por página.")
+        lines.append(f"# TYPE {metric} histogram")
+        for (store, phase), hist in sorted(_histograms.items()):
+            labels = f'store="{store}",phase="{phase}"'
+            for bound, value in zip(BUCKETS, hist["buckets"]):
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {hist["count"]}')
+            lines.append(f'{metric}_sum{{{labels}}} {hist["sum"]:.4f}')
+            lines.append(f'{metric}_count{{{labels}}} {hist["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path=None):
+    """
+    Escribe el snapshot (.json) o el texto Prometheus. Se llama desde los hilos del fan-out:
+    escribe bajo el lock, con un temporal por proceso e hilo, y un error de disco solo se
+    informa, nunca llega a quien contó la métrica.
+    """
+    path = path or os.environ.get("SCRAPER_METRICS_FILE")
+    if not path:
+        return
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    try:
+        with _lock:
+            content = json.dumps(snapshot(), indent=4) if path.endswith(".json") else render()
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp, path)
+            _state["last_write"] = time.time()
+    except Exception as e:
+        print(f"   -> No se pudieron escribir las métricas en {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _maybe_write():
+    if os.environ.get("SCRAPER_METRICS_FILE") and time.time() - _state["last_write"] >= FILE_INTERVAL:
+        write_file()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(snapshot()), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = render(), "text/plain; version=0.0.4"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(port, host="0.0.0.0"):
+    """
+    Levanta el exporter en un hilo: /metrics (Prometheus) y /metrics.json.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Métricas en http://{host}:{port}/metrics")
+    return server
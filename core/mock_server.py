@@ -0,0 +1,432 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = "fixtures"
+
+# Estructura de fixtures/<tienda>/manifest.json:
+# {
+#     "pages": {"/ruta?query": "page-1.html", ...},   # páginas de listado grabadas
+#     "ajax": {"2": "ajax-2.html"},                   # Supertec: páginas por AJAX
+#     "batch_size": 12,                               # Lenovo: productos por "Ver más"
+#     "empty": "empty.html"                           # listado vacío (fin de paginación)
+# }
+
+PAGE_PARAMS = ("page", "p")
+
+EMPTY_PAGE = "<html><head><title>Sin resultados</title></head><body><p>No se encontraron productos.</p></body></html>"
+
+CAPTCHA_PAGE = (
+    "<html><head><title>Robot Check</title></head><body>"
+    "<p>Enter the characters you see below</p></body></html>"
+)
+
+PLACEHOLDER_IMG = "data:image/gif;base64,R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw=="
+
+IMG_SRC_RE = re.compile(r'(<img\b[^>]*?)\ssrc="([^"]+)"', re.IGNORECASE)
+SCRIPT_RE = re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+
+LAZY_SHIM = """
+<script>
+(function () {
+  var delay = %(delay)d;
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (!entry.isIntersecting) return;
+      var img = entry.target;
+      observer.unobserve(img);
+      setTimeout(function () { img.src = img.getAttribute('data-src'); }, delay);
+    });
+  });
+  function watch() { document.querySelectorAll('img[data-src]').forEach(function (img) { observer.observe(img); }); }
+  watch();
+  new MutationObserver(watch).observe(document.body, {childList: true, subtree: true});
+})();
+</script>
+"""
+
+VER_MAS_SHIM = """
+<script>
+(function () {
+  var next = 1, total = %(batches)d, delay = %(delay)d;
+  var list = document.querySelector('li.product_item') && document.querySelector('li.product_item').parentElement;
+  if (!list || total === 0) return;
+  var btn = document.createElement('button');
+  btn.className = 'pc_more';
+  btn.textContent = 'Ver más';
+  list.parentElement.appendChild(btn);
+  btn.addEventListener('click', function () {
+    btn.disabled = true;
+    fetch('/%(store)s/__batch/' + next).then(function (r) { return r.text(); }).then(function (html) {
+      setTimeout(function () {
+        list.insertAdjacentHTML('beforeend', html);
+        next += 1;
+        btn.disabled = false;
+        if (next > total) btn.remove();
+      }, delay);
+    });
+  });
+})();
+</script>
+"""
+
+AJAX_SHIM = """
+<script>
+(function () {
+  document.addEventListener('click', function (ev) {
+    var link = ev.target.closest('li.paginate a');
+    if (!link) return;
+    ev.preventDefault();
+    fetch('/%(store)s/__ajax?page=' + link.textContent.trim()).then(function (r) { return r.text(); }).then(function (html) {
+      var doc = new DOMParser().parseFromString(html, 'text/html');
+      document.body.innerHTML = doc.body.innerHTML;
+    });
+  }, true);
+})();
+</script>
+"""
+
+
+class MockConfig:
+    """
+    Parámetros del servidor: latencia, imágenes lazy e inyección de fallas.
+    fail_mode: "503", "captcha", "hang", "empty" o "mixed" (uno al azar).
+    """
+
+    def __init__(self, fixtures=FIXTURES_DIR, latency_ms=0, jitter_ms=0, lazy_images=False,
+                 lazy_delay_ms=150, batch_delay_ms=500, fail_rate=0.0, fail_mode="mixed", hang_s=60):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.lazy_images = lazy_images
+        self.lazy_delay_ms = lazy_delay_ms
+        self.batch_delay_ms = batch_delay_ms
+        self.fail_rate = fail_rate
+        self.fail_mode = fail_mode
+        self.hang_s = hang_s
+
+
+class Fixtures:
+    """
+    Carga (y cachea) las páginas grabadas de cada tienda.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.manifests = {}
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def manifest(self, store):
+        with self.lock:
+            if store not in self.manifests:
+                path = os.path.join(self.root, store, "manifest.json")
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        self.manifests[store] = json.load(f)
+                else:
+                    self.manifests[store] = None
+            return self.manifests[store]
+
+    def read(self, store, name):
+        key = (store, name)
+        with self.lock:
+            if key not in self.files:
+                with open(os.path.join(self.root, store, name), encoding='utf-8') as f:
+                    self.files[key] = f.read()
+            return self.files[key]
+
+    def batches(self, store, name, size):
+        """
+        Divide el listado completo de Lenovo: la página trae el primer lote y el resto
+        se sirve en /__batch/N, como hace el botón "Ver más" real.
+        """
+        from bs4 import BeautifulSoup
+
+        key = (store, name, "batches")
+        with self.lock:
+            cached = self.files.get(key)
+        if cached:
+            return cached
+
+        soup = BeautifulSoup(self.read(store, name), 'html.parser')
+        items = soup.select('li.product_item')
+        rest = items[size:]
+        batches = ["".join(str(item) for item in rest[i:i + size]) for i in range(0, len(rest), size)]
+        for item in rest:
+            item.decompose()
+        result = (str(soup), batches)
+
+        with self.lock:
+            self.files[key] = result
+        return result
+
+
+def route_key(path, query):
+    return path + ("?" + query if query else "")
+
+
+def make_handler(config, fixtures, stats):
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status, body, content_type="text/html; charset=utf-8"):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(data)
+            with stats["lock"]:
+                stats["bytes"] += len(data)
+
+        def _count(self, store, key):
+            with stats["lock"]:
+                per_store = stats["stores"].setdefault(store, {})
+                per_store[key] = per_store.get(key, 0) + 1
+
+        def _inject_failure(self, store):
+            if config.fail_rate <= 0 or random.random() >= config.fail_rate:
+                return False
+            mode = config.fail_mode
+            if mode == "mixed":
+                mode = random.choice(("503", "captcha", "hang", "empty"))
+            self._count(store, f"fail_{mode}")
+
+            if mode == "503":
+                self._send(503, "<html><body>Service Unavailable</body></html>")
+            elif mode == "captcha":
+                self._send(200, CAPTCHA_PAGE)
+            elif mode == "hang":
+                time.sleep(config.hang_s)
+                self._send(504, "<html><body>Gateway Timeout</body></html>")
+            else:
+                self._send(200, EMPTY_PAGE)
+            return True
+
+        def _decorate(self, store, name, manifest):
+            html = SCRIPT_RE.sub("", fixtures.read(store, name))
+            shims = []
+
+            if manifest.get("batch_size"):
+                html, batches = fixtures.batches(store, name, manifest["batch_size"])
+                html = SCRIPT_RE.sub("", html)
+                shims.append(VER_MAS_SHIM % {"batches": len(batches), "delay": config.batch_delay_ms, "store": store})
+
+            if manifest.get("ajax"):
+                shims.append(AJAX_SHIM % {"store": store})
+
+            if config.lazy_images:
+                html = IMG_SRC_RE.sub(lambda m: f'{m.group(1)} src="{PLACEHOLDER_IMG}" data-src="{m.group(2)}"', html)
+                shims.append(LAZY_SHIM % {"delay": config.lazy_delay_ms})
+
+            shim = "".join(shims)
+            if "</body>" in html:
+                return html.replace("</body>", shim + "</body>", 1)
+            return html + shim
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/__stats":
+                with stats["lock"]:
+                    body = json.dumps({"bytes": stats["bytes"], "stores": stats["stores"]})
+                self._send(200, body, "application/json")
+                return
+
+            segments = parts.path.split("/", 2)
+            store = segments[1] if len(segments) > 1 else ""
+            rest = "/" + (segments[2] if len(segments) > 2 else "")
+            manifest = fixtures.manifest(store)
+            if manifest is None:
+                self._send(404, EMPTY_PAGE)
+                return
+
+            delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+            if delay:
+                time.sleep(delay / 1000)
+
+            self._count(store, "requests")
+            if self._inject_failure(store):
+                return
+
+            if rest.startswith("/__batch/"):
+                page_name = next(iter(manifest["pages"].values()))
+                _, batches = fixtures.batches(store, page_name, manifest["batch_size"])
+                index = int(rest.rsplit("/", 1)[1]) - 1
+                html = batches[index] if 0 <= index < len(batches) else ""
+                if config.lazy_images:
+                    html = IMG_SRC_RE.sub(lambda m: f'{m.group(1)} src="{PLACEHOLDER_IMG}" data-src="{m.group(2)}"', html)
+                self._send(200, html)
+                return
+
+            if rest == "/__ajax":
+                page = parse_qs(parts.query).get("page", ["1"])[0]
+                name = manifest.get("ajax", {}).get(page)
+                html = SCRIPT_RE.sub("", fixtures.read(store, name)) if name else EMPTY_PAGE
+                self._send(200, html)
+                return
+
+            name = manifest["pages"].get(route_key(rest, parts.query))
+            if name:
+                self._count(store, "pages")
+                self._send(200, self._decorate(store, name, manifest))
+                return
+
+            # Una página más allá de las grabadas es un listado vacío (fin del catálogo).
+            query = parse_qs(parts.query)
+            if any(param in query for param in PAGE_PARAMS):
+                self._count(store, "empty")
+                empty = manifest.get("empty")
+                self._send(200, fixtures.read(store, empty) if empty else EMPTY_PAGE)
+                return
+
+            self._send(404, EMPTY_PAGE)
+
+    return MockHandler
+
+
+def start_server(config, host="127.0.0.1", port=8765):
+    """
+    Levanta el servidor en un hilo y lo devuelve (server.shutdown() para detenerlo).
+    """
+    stats = {"lock": threading.Lock(), "bytes": 0, "stores": {}}
+    server = ThreadingHTTPServer((host, port), make_handler(config, Fixtures(config.fixtures), stats))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def _record_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.os_manager import ChromeType
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
+    chrome_options.add_argument("--log-level=3")
+    service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+
+def _scroll_to_bottom(driver):
+    last_height = driver.execute_script("return document.body.scrollHeight")
+    for pos in range(0, last_height, 500):
+        driver.execute_script(f"window.scrollTo(0, {pos});")
+        time.sleep(0.1)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    time.sleep(2)
+
+
+def record(store, urls, fixtures=FIXTURES_DIR, batch_size=0, ajax_pages=0):
+    """
+    Graba las páginas reales de una tienda en fixtures/<tienda>/.
+    - Lenovo: usar batch_size > 0; se presiona "Ver más" hasta el final antes de grabar.
+    - Supertec: usar ajax_pages = N; se graban las páginas 2..N haciendo click en la paginación.
+    """
+    from selenium.webdriver.common.by import By
+
+    folder = os.path.join(fixtures, store)
+    os.makedirs(folder, exist_ok=True)
+    manifest = {"pages": {}}
+    if batch_size:
+        manifest["batch_size"] = batch_size
+
+    driver = _record_driver()
+    try:
+        for i, url in enumerate(urls, start=1):
+            print(f"Grabando {store} {i}/{len(urls)}: {url}")
+            driver.get(url)
+            time.sleep(5)
+            _scroll_to_bottom(driver)
+
+            if batch_size:
+                from lenovo.lenovo_nube import scroll_inteligente
+                scroll_inteligente(driver)
+
+            name = f"page-{i}.html"
+            with open(os.path.join(folder, name), 'w', encoding='utf-8') as f:
+                f.write(driver.page_source)
+            parts = urlsplit(url)
+            manifest["pages"][route_key(parts.path, parts.query)] = name
+
+            if ajax_pages and i == 1:
+                manifest["ajax"] = {"1": name}
+                for page in range(2, ajax_pages + 1):
+                    link = driver.find_element(By.XPATH, f"//li[contains(@class, 'paginate')]/a[text()='{page}']")
+                    driver.execute_script("arguments[0].click();", link)
+                    time.sleep(5)
+                    _scroll_to_bottom(driver)
+                    ajax_name = f"ajax-{page}.html"
+                    with open(os.path.join(folder, ajax_name), 'w', encoding='utf-8') as f:
+                        f.write(driver.page_source)
+                    manifest["ajax"][str(page)] = ajax_name
+    finally:
+        driver.quit()
+
+    with open(os.path.join(folder, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    print(f"Manifest guardado: {os.path.join(folder, 'manifest.json')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor mock de e-commerce con páginas grabadas.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Sirve las páginas grabadas.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency-ms", type=float, default=0)
+    serve.add_argument("--jitter-ms", type=float, default=0)
+    serve.add_argument("--lazy-images", action="store_true", help="Mueve src a data-src y lo restaura al entrar en viewport.")
+    serve.add_argument("--lazy-delay-ms", type=int, default=150)
+    serve.add_argument("--batch-delay-ms", type=int, default=500)
+    serve.add_argument("--fail-rate", type=float, default=0.0)
+    serve.add_argument("--fail-mode", default="mixed", choices=("mixed", "503", "captcha", "hang", "empty"))
+
+    rec = sub.add_parser("record", help="Graba páginas reales de una tienda.")
+    rec.add_argument("store")
+    rec.add_argument("urls", nargs="+")
+    rec.add_argument("--batch-size", type=int, default=0)
+    rec.add_argument("--ajax-pages", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.store, args.urls, args.fixtures, args.batch_size, args.ajax_pages)
+        return
+
+    config = MockConfig(
+        fixtures=args.fixtures, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        lazy_images=args.lazy_images, lazy_delay_ms=args.lazy_delay_ms,
+        batch_delay_ms=args.batch_delay_ms, fail_rate=args.fail_rate, fail_mode=args.fail_mode,
+    )
+    server = start_server(config, args.host, args.port)
+    print(f"Mock escuchando en http://{args.host}:{args.port}  (SCRAPER_MOCK_URL=http://{args.host}:{args.port})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
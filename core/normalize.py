@@ -0,0 +1,109 @@
+import re
+from urllib.parse import urlsplit, urlunsplit, unquote
+
+# Valores de relleno que los extractores usan cuando un campo no existe.
+PLACEHOLDERS = {"", "No SKU", "No especificado", "No imagen", "Sin Nombre"}
+
+ASIN_RE = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})')
+
+# Segmento de tamaño de las imágenes VTEX: /arquivos/ids/123456-500-500/...
+VTEX_SIZE_RE = re.compile(r"(/arquivos/ids/\d+)-\d+-\d+")
+
+
+def canonical_url(url):
+    """
+    Normaliza la URL de un producto para usarla como identificador estable.
+    Quita query string y fragmentos (parámetros de tracking, ref=, qid=...).
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+
+    asin = ASIN_RE.search(unquote(url))
+    if asin:
+        return "amazon:" + asin.group(1)
+
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme or "https", parts.netloc.lower(), path, "", ""))
+
+
+def image_key(url):
+    """
+    URL de imagen sin el tamaño pedido, para comparar corridas: en VTEX la misma foto
+    cambia de URL si cambia la resolución configurada (-300-300 -> -500-500).
+    """
+    if not url:
+        return url
+    return VTEX_SIZE_RE.sub(r"\1", url)
+
+
+def product_key(item):
+    """
+    Devuelve el identificador del producto dentro de su tienda.
+    Prioridad: product_id > sku > código interno > URL canónica > nombre.
+    """
+    for field in ("product_id", "sku", "internal_code"):
+        value = item.get(field)
+        if value is not None and str(value).strip() not in PLACEHOLDERS:
+            return str(value).strip()
+
+    url = canonical_url(item.get("url"))
+    if url:
+        return url
+
+    name = item.get("name") or ""
+    return re.sub(r'\W+', '', name).upper()
+
+
+PRICE_RE = re.compile(r'(US\$|S/\.?|\$)?\s*(\d[\d.,]*)')
+
+CURRENCIES = {"S/": "PEN", "S/.": "PEN", "US$": "USD", "$": "USD"}
+
+
+def _parse_amount(raw):
+    raw = raw.strip(".,")
+    if "," in raw and "." in raw:
+        decimal = "." if raw.rfind(".") > raw.rfind(",") else ","
+        thousands = "," if decimal == "." else "."
+        raw = raw.replace(thousands, "").replace(decimal, ".")
+    elif "," in raw:
+        # "2,999" es separador de miles; "2999,50" es decimal.
+        if re.search(r',\d{3}$', raw):
+            raw = raw.replace(",", "")
+        else:
+            raw = raw.replace(",", ".")
+    elif raw.count(".") > 1 or re.search(r'^\d{1,3}\.\d{3}$', raw):
+        raw = raw.replace(".", "")
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def parse_price(value, default_currency="PEN"):
+    """
+    Convierte el texto de precio de los extractores ("S/ 2,999.00", "$899.99",
+    "S/. 1,499.00 (Efectivo)", 3499.0) en (monto, moneda).
+    Si hay varios precios (ej. Memory Kings con dólares y soles) se prefiere el de soles.
+    Devuelve (None, None) para "Agotado" y similares.
+    """
+    if value is None:
+        return None, None
+    if isinstance(value, (int, float)):
+        return (float(value), default_currency) if value > 0 else (None, None)
+
+    found = []
+    for symbol, raw in PRICE_RE.findall(str(value)):
+        amount = _parse_amount(raw)
+        if amount:
+            found.append((amount, CURRENCIES.get(symbol, default_currency)))
+
+    if not found:
+        return None, None
+    for amount, currency in found:
+        if currency == "PEN":
+            return amount, currency
+    return found[0]
@@ -0,0 +1,95 @@
+import json
+import os
+
+from core.assets import mirror_images
+from core.enrich import enrich_products
+from core.export import CatalogExporter, export_products
+from core.history import PriceHistory
+from core.specs import add_specs
+from core.store import ProductStore
+
+
+class Run:
+    """
+    Una corrida de una tienda. Los scrapers agregan cada página con add() y guardan al final
+    con save(). Con SCRAPER_EXPORT_DIR cada página va directo al Parquet (un row group cada
+    ROW_GROUP_SIZE filas) en lugar de exportarse todo el catálogo al final; lo que agregan
+    después core.enrich / core.specs queda en el JSON y la base, no en el Parquet.
+    Cada unidad que no se pudo scrapear (bloqueo, circuito abierto, error) se anota con fail():
+    una corrida incompleta no marca como eliminados los productos que no vio.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.products = []
+        self.failures = []
+        export_dir = os.environ.get("SCRAPER_EXPORT_DIR")
+        self.exporter = CatalogExporter(export_dir, store) if export_dir else None
+
+    def add(self, products):
+        self.products.extend(products)
+        if self.exporter is not None:
+            self.exporter.add(products)
+
+    def fail(self, reason):
+        self.failures.append(str(reason))
+
+    @property
+    def complete(self):
+        return not self.failures
+
+    def save(self, output_file):
+        return save_products(self.store, self.products, output_file, run=self)
+
+
+def save_products(store, products, output_file, run=None, complete=None):
+    """
+    Guarda el resultado de una corrida.
+    Por defecto escribe el JSON completo; si SCRAPER_DB apunta a una base SQLite
+    (modo incremental) sólo se escriben los productos nuevos, cambiados o eliminados;
+    los eliminados sólo se marcan si la corrida fue completa (complete, o run.complete).
+    Si SCRAPER_HISTORY está definido, los precios se agregan además al historial,
+    y con SCRAPER_EXPORT_DIR la corrida también se exporta a Parquet (si viene de un Run,
+    ya se fue exportando por página y acá solo se cierra el archivo).
+    Con SCRAPER_SPECS=1 se agregan antes las columnas de specs extraídas del nombre,
+    y con SCRAPER_ENRICH=1 los datos de la página de detalle de cada producto (core.enrich).
+    Con SCRAPER_IMAGES_DIR las imágenes se bajan a ese espejo local (core.assets).
+    """
+    if os.environ.get("SCRAPER_ENRICH"):
+        enrich_products(store, products)
+
+    if os.environ.get("SCRAPER_IMAGES_DIR"):
+        mirror_images(store, products)
+
+    if os.environ.get("SCRAPER_SPECS"):
+        add_specs(products)
+
+    export_dir = os.environ.get("SCRAPER_EXPORT_DIR")
+    if run is not None and run.exporter is not None:
+        run.exporter.close()
+        print(f"Exportado a Parquet: {run.exporter.path}")
+    elif export_dir:
+        print(f"Exportado a Parquet: {export_products(export_dir, store, products)}")
+
+    history_path = os.environ.get("SCRAPER_HISTORY")
+    if history_path:
+        with PriceHistory(history_path) as history:
+            history.append_run(store, products)
+
+    if complete is None:
+        complete = run.complete if run is not None else True
+
+    db_path = os.environ.get("SCRAPER_DB")
+
+    if db_path:
+        if not complete:
+            print("Corrida incompleta: no se marcan productos eliminados.")
+        with ProductStore(db_path) as db:
+            summary = db.sync(store, products, mark_removed=complete)
+        print(f"Modo incremental ({db_path}): {summary['new']} nuevos, {summary['changed']} cambiados, "
+              f"{summary['removed']} eliminados, {summary['unchanged']} sin cambios.")
+        return summary
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(products, f, indent=4, ensure_ascii=False)
+    return None
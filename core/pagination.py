@@ -0,0 +1,188 @@
+import math
+import re
+
+from core.normalize import product_key
+
+# Tope absoluto de páginas, aunque la tienda anuncie más.
+MAX_PAGES = 200
+
+# Cómo leer la paginación de cada tienda desde la primera página:
+# - numbers: enlaces/botones con el número de página (se toma el mayor).
+# - next: enlace "siguiente"; si no aparece, la página actual es la última.
+# - total: texto con el total de resultados; se divide por los productos de la primera página.
+SELECTORS = {
+    "amazon": {
+        "numbers": ".s-pagination-strip .s-pagination-item:not(.s-pagination-previous):not(.s-pagination-next)",
+        "next": "a.s-pagination-next",
+    },
+    "falabella": {
+        "numbers": "button[id^='testId-pagination-bottom-button']",
+        "next": "#testId-pagination-bottom-arrow-right",
+    },
+    "hp": {
+        "numbers": ".pages-items .item a.page span:not(.label)",
+        "next": ".pages-items a.action.next",
+        "total": ".toolbar-amount .toolbar-number:last-child",
+    },
+    "infotec": {
+        "numbers": ".pagination .page-list a.js-search-link",
+        "next": ".pagination a.next",
+    },
+    "magitech": {
+        "numbers": ".pages-items .item a.page span:not(.label)",
+        "next": ".pages-items a.action.next",
+        "total": ".toolbar-amount .toolbar-number:last-child",
+    },
+    "oechsle": {
+        "total": ".resultado-busca-numero .value",
+    },
+    "realplaza": {
+        "total": ".vtex-search-result-3-x-totalProducts--layout",
+    },
+}
+
+NUMBER_RE = re.compile(r'\d[\d.,]*')
+
+
+def _number(text):
+    match = NUMBER_RE.search(text or "")
+    if not match:
+        return None
+    return int(re.sub(r'[.,]', '', match.group(0)))
+
+
+class Paginator:
+    """
+    Recorre las páginas de un listado sin depender de un total fijo.
+    Lee la cantidad real de páginas (o el enlace "siguiente") de la primera página
+    y corta en la primera página vacía o repetida (tiendas que, pasado el final,
+    devuelven otra vez la última página).
+
+        pager = Paginator("oechsle", lambda page: f"{url}&page={page}", max_pages=10)
+        for page, target_url in pager:
+            products = ...
+            if not pager.accept(products, driver):
+                break
+    """
+
+    def __init__(self, store, page_url, max_pages=10, start=1):
+        self.store = store
+        self.page_url = page_url
+        # Límite mientras no se sepa el total: el valor fijo que usaba el scraper.
+        self.max_pages = max_pages
+        self.start = start
+        self.last_page = None
+        self.has_next = True
+        self.next_seen = False
+        self.seen = set()
+        self.page = start - 1
+        self.page_size = None
+
+    def __iter__(self):
+        while self.has_next:
+            self.page += 1
+            # Con enlace "siguiente" el límite es el tope absoluto: el listado dice cuándo termina.
+            limit = self.last_page or (MAX_PAGES if self.next_seen else self.max_pages)
+            if self.page > min(limit, MAX_PAGES):
+                return
+            yield self.page, self.page_url(self.page)
+
+    def remaining(self):
+        """
+        Páginas que faltan cuando ya se conoce el total, para repartirlas entre varios drivers.
+        Da el recorrido por terminado.
+        """
+        last = min(self.last_page or self.page, MAX_PAGES)
+        pages = [(page, self.page_url(page)) for page in range(self.page + 1, last + 1)]
+        self.has_next = False
+        return pages
+
+    def label(self):
+        return f"{self.page}/{self.last_page}" if self.last_page else str(self.page)
+
+    def discover(self, driver, page_size):
+        """
+        Lee la paginación de la página cargada en el navegador. Devuelve la última página o None.
+        """
+        from selenium.webdriver.common.by import By
+
+        selectors = SELECTORS.get(self.store, {})
+        if selectors.get("numbers"):
+            numbers = [_number(el.text) for el in driver.find_elements(By.CSS_SELECTOR, selectors["numbers"])]
+            numbers = [n for n in numbers if n]
+            if numbers:
+                return max(numbers)
+
+        if selectors.get("total") and page_size:
+            elements = driver.find_elements(By.CSS_SELECTOR, selectors["total"])
+            total = _number(elements[0].text) if elements else None
+            if total:
+                return max(1, math.ceil(total / page_size))
+        return None
+
+    def _next_links(self, driver):
+        from selenium.webdriver.common.by import By
+
+        selector = SELECTORS.get(self.store, {}).get("next")
+        if not selector:
+            return None
+        return driver.find_elements(By.CSS_SELECTOR, selector)
+
+    @staticmethod
+    def _enabled(links):
+        disabled = [el for el in links if el.get_attribute("disabled") or "disabled" in (el.get_attribute("class") or "")]
+        return len(disabled) < len(links)
+
+    def probe(self, driver):
+        """
+        Relee la paginación en una página posterior (core.fanout): devuelve la última página
+        anunciada (o None) y si hay un enlace "siguiente" habilitado. No cambia el estado.
+        """
+        links = self._next_links(driver)
+        return self.discover(driver, self.page_size), bool(links) and self._enabled(links)
+
+    def _check_next(self, driver):
+        links = self._next_links(driver)
+        if links is None:
+            return
+        if not links:
+            # Solo se confía en la ausencia del enlace si ya apareció en páginas anteriores
+            # (si el selector no coincide con el HTML se sigue hasta max_pages).
+            if self.next_seen:
+                self.has_next = False
+            return
+        self.next_seen = True
+        if not self._enabled(links):
+            self.has_next = False
+
+    def accept(self, products, driver=None):
+        """
+        Registra los productos de la página actual. Devuelve False si hay que dejar de paginar:
+        página vacía o sin ningún producto nuevo.
+        """
+        if not products:
+            self.has_next = False
+            return False
+
+        keys = {product_key(p) for p in products}
+        if keys <= self.seen:
+            print(f"   -> Página {self.page} repetida: fin del listado.")
+            self.has_next = False
+            return False
+        self.seen |= keys
+
+        if driver is not None:
+            if self.page == self.start and self.last_page is None:
+                self.page_size = len(products)
+                self.last_page = self.discover(driver, len(products))
+                if self.last_page:
+                    print(f"   -> Paginación detectada: {self.last_page} páginas.")
+            if self.last_page is None:
+                self._check_next(driver)
+            elif self.page >= self.last_page:
+                # Algunas tiendas solo muestran una ventana de números (1 2 3 4 ...):
+                # si en la "última" página sigue habiendo "siguiente", se continúa por el enlace.
+                self._check_next(driver)
+                if self.has_next and self.next_seen:
+                    self.last_page = None
+        return True
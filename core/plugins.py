@@ -0,0 +1,281 @@
+import argparse
+import importlib
+
+# Estrategias de obtención de la página.
+BROWSER = "browser"
+HTTP = "http"
+API = "api"
+
+
+class StorePlugin:
+    """
+    Interfaz común de una tienda para orquestadores (pools, colas, planificadores, bench):
+
+    - units(): unidades de trabajo, cada una es la tupla de argumentos de scrape(). En las tiendas
+      paginadas son las páginas hasta el tope fijo; run() las recorre con core.pagination.
+    - scrape(driver, *unit): carga la unidad en un driver ya abierto y devuelve los productos
+      (con esperas, detección de bloqueos y métricas). No crea ni cierra el navegador,
+      así varias tiendas pueden compartir el mismo driver.
+    - extract(html, *unit): solo el parseo, para HTML ya descargado.
+    - ready: selector CSS que indica que el listado cargó (READY_SELECTOR del script, el mismo
+      que espera su scrape_page).
+    - fetch: BROWSER, HTTP o API. Hoy todas las tiendas necesitan navegador (JS o imágenes lazy).
+    - page_url(page): si la tienda pagina por URL (para core.pagination).
+    - policy: RETRY_POLICY del script si tiene una propia (core.retry.RetryPolicy), si no None.
+
+    El módulo del scraper se importa recién al usarlo.
+    """
+
+    def __init__(self, name, module, extract, scroll, fetch=BROWSER, paginated=False):
+        self.name = name
+        self.module_name = module
+        self.fetch = fetch
+        self.paginated = paginated
+        self._extract = extract
+        self._scroll = scroll
+        self._module = None
+
+    def __repr__(self):
+        return f"StorePlugin({self.name!r}, fetch={self.fetch!r})"
+
+    @property
+    def module(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.module_name)
+        return self._module
+
+    @property
+    def ready(self):
+        return self.module.READY_SELECTOR
+
+    @property
+    def policy(self):
+        return getattr(self.module, "RETRY_POLICY", None)
+
+    def units(self):
+        return self.module.listing_units()
+
+    def page_url(self, page):
+        if not self.paginated:
+            raise ValueError(f"{self.name} no pagina por URL")
+        return self.module.page_url(page)
+
+    @property
+    def max_pages(self):
+        return getattr(self.module, "TOTAL_PAGES", 1)
+
+    def setup_driver(self):
+        """
+        Driver del scraper (Selenium); con SCRAPER_BROWSERD, una pestaña del navegador compartido
+        (core.browserd); con SCRAPER_BACKEND=cdp, un Chrome propio controlado por CDP directo
+        sobre el perfil persistente de la tienda (core.profiles).
+        """
+        from core import browserd, cdp, profiles, sites
+
+        if browserd.address():
+            return browserd.attach()
+        if cdp.backend() == "cdp":
+            if not profiles.enabled():
+                return cdp.launch(sites.chrome_arguments())
+            profile = profiles.acquire(self.name)
+            driver = cdp.launch(sites.chrome_arguments() + profiles.cache_arguments(), user_data_dir=profile.path)
+            return profile.bind(driver)
+        return self.module.setup_driver()
+
+    def driver_key(self):
+        """
+        Lo que distingue al driver de esta tienda: estrategia de carga (core.sites) y perfil
+        persistente propio (core.profiles). Dos tiendas con la misma clave pueden compartir driver.
+        """
+        from core import browserd, profiles, sites
+
+        if browserd.address():
+            return "browserd"
+        return sites.page_load_strategy(self.name), self.name if profiles.enabled() else None
+
+    def scrape(self, driver, *unit):
+        return self.module.scrape_page(driver, *unit)
+
+    def scroll(self, driver):
+        return getattr(self.module, self._scroll)(driver)
+
+    def extract(self, html, *unit):
+        return self._extract(self.module, html, *unit)
+
+
+REGISTRY = {}
+
+
+def register(plugin):
+    REGISTRY[plugin.name] = plugin
+    return plugin
+
+
+def get(name):
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Tienda desconocida: {name} (disponibles: {', '.join(names())})") from None
+
+
+def names():
+    return sorted(REGISTRY)
+
+
+# El extractor recibe (módulo, html, *unidad) para cubrir las firmas distintas de cada script.
+register(StorePlugin(
+    "amazon", "amazon.amazon_scraper",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_amazon", paginated=True,
+))
+register(StorePlugin(
+    "asus", "asus.asus_scraper",
+    lambda m, html, url=None, category="": m.extract_category_data(html, category), "scroll_asus",
+))
+register(StorePlugin(
+    "falabella", "fallabela.fallabela",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_falabella", paginated=True,
+))
+register(StorePlugin(
+    "hp", "hp.hp_local",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_para_imagenes", paginated=True,
+))
+register(StorePlugin(
+    "infotec", "infotec.infotec_scraper",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_infotec", paginated=True,
+))
+register(StorePlugin(
+    "lenovo", "lenovo.lenovo_local",
+    lambda m, html, *unit: m.extract_data(html), "scroll_inteligente",
+))
+register(StorePlugin(
+    "magitech", "magitech.magitech_scraper",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_magitech", paginated=True,
+))
+register(StorePlugin(
+    "memorykings", "memorykings.memorykings_scraper",
+    lambda m, html, *unit: m.extract_category_data(html), "scroll_memorykings",
+))
+register(StorePlugin(
+    "oechsle", "oechsle.oechsle",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_oechsle", paginated=True,
+))
+register(StorePlugin(
+    "realplaza", "realPlaza.realplaza",
+    lambda m, html, *unit: m.extract_page_data(html), "scroll_realplaza", paginated=True,
+))
+register(StorePlugin(
+    "supertec", "supertec.supertec_scraper",
+    lambda m, html, *unit: m.extract_products(html), "scroll_supertec",
+))
+
+
+def _units(plugin):
+    """
+    Unidades a recorrer con el driver compartido: en las tiendas paginadas, las páginas de un
+    core.pagination.Paginator (corta en la primera vacía o repetida y lee el total real de la
+    primera página); en las demás, units(). Devuelve (pager o None, iterador de unidades).
+    """
+    from core import pagination
+
+    if not plugin.paginated:
+        return None, iter(plugin.units())
+    pager = pagination.Paginator(plugin.name, plugin.page_url, max_pages=plugin.max_pages)
+    return pager, ((url,) for _, url in pager)
+
+
+def run(store_names, driver=None):
+    """
+    Scrapea varias tiendas con un navegador a la vez y devuelve {tienda: core.output.Run}.
+    Si no se pasa driver, cada tienda usa el setup_driver propio: se comparte mientras la
+    estrategia de carga y el perfil coinciden (driver_key) y se cambia cuando difieren, así
+    Magitech conserva su "none" + window.stop aunque no sea la primera. Un driver pasado por el
+    llamador se usa tal cual para todas las tiendas, con su perfil y su estrategia.
+    """
+    from core import retry
+    from core.output import Run
+
+    own_driver = driver is None
+    plugins = [get(name) for name in store_names]
+    state = {"driver": driver, "key": None, "plugin": None}
+
+    def close_driver():
+        try:
+            state["driver"].quit()
+        except Exception:
+            pass
+
+    def open_driver(plugin):
+        if not own_driver:
+            return
+        key = plugin.driver_key()
+        if state["driver"] is not None and key == state["key"]:
+            return
+        if state["driver"] is not None:
+            close_driver()
+            state["driver"] = None
+        state["driver"], state["key"] = plugin.setup_driver(), key
+
+    def restart_driver():
+        close_driver()
+        state["driver"] = state["plugin"].setup_driver() if own_driver else plugins[0].setup_driver()
+
+    results = {}
+    try:
+        for plugin in plugins:
+            state["plugin"] = plugin
+            open_driver(plugin)
+            store_run = Run(plugin.name)
+            pager, units = _units(plugin)
+            for unit in units:
+                print(f"[{plugin.name}] {unit[0]}")
+                try:
+                    products = retry.call(
+                        plugin.name, lambda: plugin.scrape(state["driver"], *unit),
+                        policy=plugin.policy, recover=restart_driver,
+                    )
+                except retry.EmptyPage:
+                    if pager:
+                        break
+                    continue
+                except (retry.PageBlocked, retry.CircuitOpen) as e:
+                    print(f"   -> Tienda bloqueada ({e}). Se pasa a la siguiente.")
+                    store_run.fail(e)
+                    break
+                except Exception as e:
+                    print(f"   -> Error: {e}")
+                    store_run.fail(e)
+                    continue
+                if pager and not pager.accept(products, state["driver"]):
+                    break
+                store_run.add(products)
+            results[plugin.name] = store_run
+    finally:
+        if own_driver and state["driver"] is not None:
+            state["driver"].quit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro de tiendas (plugins).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Lista las tiendas registradas y sus unidades.")
+    runner = sub.add_parser(
+        "run", help="Scrapea varias tiendas con un navegador a la vez (se cambia si la tienda usa otro "
+                    "perfil o estrategia de carga).")
+    runner.add_argument("stores", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name in names():
+            plugin = get(name)
+            print(f"{name:12} {plugin.fetch:8} {len(plugin.units()):3} unidades  listo: {plugin.ready}")
+        return
+
+    for store, store_run in run(args.stores).items():
+        output_file = f"{store}_laptops.json"
+        store_run.save(output_file)
+        print(f"{store}: {len(store_run.products)} productos -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()
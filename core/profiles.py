@@ -0,0 +1,242 @@
+import argparse
+import os
+import shutil
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "scraper-profiles")
+DEFAULT_CACHE_MB = 256
+MAX_SLOTS = 32
+
+# Lo que Chrome deja entre sesiones y no sirve (o impide) reabrir el perfil.
+STALE_ENTRIES = (
+    "SingletonLock", "SingletonSocket", "SingletonCookie",
+    os.path.join("Default", "Sessions"), os.path.join("Default", "Current Session"),
+    os.path.join("Default", "Current Tabs"), os.path.join("Default", "Last Session"),
+    os.path.join("Default", "Last Tabs"),
+)
+
+# Cachés secundarias que se podan primero cuando el perfil pasa su límite.
+PRUNABLE = (
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Code Cache"),
+    "GrShaderCache", "ShaderCache", "GraphiteDawnCache",
+    os.path.join("Default", "GPUCache"),
+)
+
+
+def enabled():
+    return os.environ.get("SCRAPER_PROFILES", "1") != "0"
+
+
+def root():
+    """
+    Carpeta de perfiles: SCRAPER_PROFILE_DIR (ej. /dev/shm/scraper-profiles para tmpfs) o ~/.cache.
+    """
+    return os.environ.get("SCRAPER_PROFILE_DIR", DEFAULT_ROOT)
+
+
+def cache_mb():
+    return int(os.environ.get("SCRAPER_PROFILE_CACHE_MB", DEFAULT_CACHE_MB))
+
+
+def dir_size(path):
+    total = 0
+    for base, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(base, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def _remove(path):
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def reset(path):
+    """
+    Quita los locks y la sesión anterior que deja un Chrome cerrado de golpe.
+    """
+    os.makedirs(path, exist_ok=True)
+    for entry in STALE_ENTRIES:
+        _remove(os.path.join(path, entry))
+
+
+def prune(path, limit):
+    """
+    La caché HTTP ya está acotada por --disk-cache-size; lo demás (Code Cache, Service Workers...)
+    se poda si el perfil pasa el doble del límite, y si aun así pasa el triple se borra entero.
+    """
+    size = dir_size(path)
+    if size <= 2 * limit:
+        return size
+    for entry in PRUNABLE:
+        _remove(os.path.join(path, entry))
+    size = dir_size(path)
+    if size > 3 * limit:
+        print(f"   -> Perfil {path} ocupa {size / 1048576:.0f} MB: se borra.")
+        shutil.rmtree(path, ignore_errors=True)
+        size = 0
+    return size
+
+
+def cache_arguments():
+    return [f"--disk-cache-size={cache_mb() * 1024 * 1024}"]
+
+
+class Profile:
+    """
+    Perfil de Chrome persistente para un worker: <root>/<nombre>-<slot>.
+    El slot se reserva con un flock, así dos navegadores vivos nunca comparten carpeta,
+    y el perfil (con su caché HTTP de bundles JS/CSS) se reutiliza en la siguiente sesión.
+    """
+
+    def __init__(self, name, slot, path, lock_file):
+        self.name = name
+        self.slot = slot
+        self.path = path
+        self.lock_file = lock_file
+        self.limit = cache_mb() * 1024 * 1024
+
+    def __repr__(self):
+        return f"Profile({self.path!r})"
+
+    def prepare(self):
+        reset(self.path)
+        with open(os.path.join(self.path, ".last_used"), 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+
+    def chrome_arguments(self):
+        return [f"--user-data-dir={self.path}", *cache_arguments()]
+
+    def release(self):
+        if self.lock_file is None:
+            return
+        try:
+            prune(self.path, self.limit)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+
+    def bind(self, driver):
+        """
+        Libera el perfil cuando se cierra el driver.
+        """
+        original_quit = driver.quit
+
+        def quit():
+            try:
+                original_quit()
+            finally:
+                self.release()
+
+        driver.quit = quit
+        return driver
+
+
+def acquire(name, base=None):
+    """
+    Reserva el primer slot libre del perfil `name` y lo deja listo para Chrome.
+    """
+    base = base or root()
+    os.makedirs(base, exist_ok=True)
+    for slot in range(MAX_SLOTS):
+        path = os.path.join(base, f"{name}-{slot}")
+        lock_file = open(path + ".lock", 'a+')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+        elif slot != os.getpid() % MAX_SLOTS:
+            lock_file.close()
+            continue
+        profile = Profile(name, slot, path, lock_file)
+        profile.prepare()
+        return profile
+    raise RuntimeError(f"No hay slots de perfil libres para {name} en {base}")
+
+
+def chrome_arguments(name):
+    """
+    Para los setup_driver: devuelve (perfil, argumentos de Chrome). Con SCRAPER_PROFILES=0
+    no se reserva nada y Chrome usa un perfil temporal como antes.
+    """
+    if not enabled():
+        return None, []
+    profile = acquire(name)
+    return profile, profile.chrome_arguments()
+
+
+def bind(profile, driver):
+    return profile.bind(driver) if profile else driver
+
+
+def clean(base=None, older_than_days=7):
+    """
+    Borra perfiles sin uso hace más de `older_than_days` días y que no estén reservados.
+    """
+    base = base or root()
+    if not os.path.isdir(base):
+        return []
+    removed = []
+    for entry in sorted(os.listdir(base)):
+        path = os.path.join(base, entry)
+        if not os.path.isdir(path):
+            continue
+        try:
+            with open(os.path.join(path, ".last_used"), encoding='utf-8') as f:
+                last_used = float(f.read().strip() or 0)
+        except (OSError, ValueError):
+            last_used = os.path.getmtime(path)
+        if time.time() - last_used < older_than_days * 86400:
+            continue
+        with open(path + ".lock", 'a+') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+            shutil.rmtree(path, ignore_errors=True)
+        os.remove(path + ".lock")
+        removed.append(entry)
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfiles persistentes de Chrome por worker.")
+    parser.add_argument("--root", default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    cleaner = sub.add_parser("clean", help="Borra perfiles sin uso.")
+    cleaner.add_argument("--older-than-days", type=float, default=7)
+    args = parser.parse_args()
+
+    base = args.root or root()
+    if args.command == "list":
+        if not os.path.isdir(base):
+            print(f"Sin perfiles en {base}")
+            return
+        for entry in sorted(os.listdir(base)):
+            path = os.path.join(base, entry)
+            if os.path.isdir(path):
+                print(f"{entry:24} {dir_size(path) / 1048576:8.1f} MB")
+    else:
+        removed = clean(base, args.older_than_days)
+        print(f"Perfiles borrados: {len(removed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import json
+import os
+import random
+import time
+
+from core import memory, metrics
+
+# Tipos de falla.
+TIMEOUT = "timeout"
+BLOCK = "block"
+EMPTY = "empty"
+NOT_FOUND = "not_found"
+DRIVER_CRASH = "driver_crash"
+ERROR = "error"
+
+CRASH_MARKERS = (
+    "invalid session id", "chrome not reachable", "disconnected", "session deleted",
+    "no such window", "target window already closed", "tab crashed", "connection refused",
+    "max retries exceeded",
+)
+
+
+class ScrapeError(Exception):
+    kind = ERROR
+
+
+class PageBlocked(ScrapeError):
+    """
+    La tienda respondió con CAPTCHA / página de bloqueo.
+    """
+    kind = BLOCK
+
+
+class EmptyPage(ScrapeError):
+    """
+    La página cargó pero no trae productos.
+    """
+    kind = EMPTY
+
+
+class PageNotFound(EmptyPage):
+    """
+    La página no existe (404): fin de la paginación, no se reintenta.
+    """
+    kind = NOT_FOUND
+
+
+class CircuitOpen(ScrapeError):
+    """
+    El circuito de la tienda está abierto: no se hacen más pedidos hasta que venza el enfriamiento.
+    """
+    kind = BLOCK
+
+
+def classify(exc):
+    """
+    Clasifica una excepción en TIMEOUT, BLOCK, EMPTY, NOT_FOUND, DRIVER_CRASH o ERROR.
+    """
+    if isinstance(exc, ScrapeError):
+        return exc.kind
+    name = type(exc).__name__
+    if name == "TimeoutException" or isinstance(exc, TimeoutError):
+        return TIMEOUT
+    if name in ("InvalidSessionIdException", "NoSuchWindowException") or isinstance(exc, ConnectionError):
+        return DRIVER_CRASH
+    message = str(exc).lower()
+    if any(marker in message for marker in CRASH_MARKERS):
+        return DRIVER_CRASH
+    return ERROR
+
+
+class RetryPolicy:
+    """
+    Intentos máximos por tipo de falla y backoff exponencial con jitter.
+    """
+
+    def __init__(self, attempts=None, base_delay=3.0, max_delay=60.0, jitter=0.5):
+        # Una página vacía suele ser el fin del catálogo: no se reintenta salvo que la tienda
+        # lo pida (Magitech a veces entrega la grilla vacía).
+        self.attempts = {TIMEOUT: 3, EMPTY: 1, DRIVER_CRASH: 2, BLOCK: 2, ERROR: 2}
+        if attempts:
+            self.attempts.update(attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt, kind):
+        base = self.base_delay * (4 if kind == BLOCK else 1)
+        delay = min(self.max_delay, base * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class CircuitBreaker:
+    """
+    Abre el circuito de una tienda tras varias fallas seguidas del mismo tipo
+    (por defecto 2 bloqueos, 4 timeouts o 3 caídas del driver). Mientras está
+    abierto no se hacen pedidos; al vencer el enfriamiento se permite un intento
+    de prueba (half-open) y un nuevo fallo lo vuelve a abrir.
+    Si SCRAPER_CIRCUIT_FILE está definido, el estado se guarda entre corridas.
+    """
+
+    def __init__(self, store, thresholds=None, cooldown=900, state_file=None):
+        self.store = store
+        self.thresholds = {BLOCK: 2, TIMEOUT: 4, DRIVER_CRASH: 3}
+        if thresholds:
+            self.thresholds.update(thresholds)
+        self.cooldown = cooldown
+        self.state_file = state_file
+        self.failures = {}
+        self.open_until = self._load()
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return 0.0
+        try:
+            with open(self.state_file, encoding='utf-8') as f:
+                return json.load(f).get(self.store, 0.0)
+        except (OSError, ValueError):
+            return 0.0
+
+    def _save(self):
+        if not self.state_file:
+            return
+        state = {}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {}
+        state[self.store] = self.open_until
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=4)
+
+    def is_open(self):
+        return time.time() < self.open_until
+
+    def allow(self):
+        return not self.is_open()
+
+    def record_success(self):
+        self.failures = {}
+        if self.open_until:
+            self.open_until = 0.0
+            self._save()
+
+    def record_failure(self, kind):
+        threshold = self.thresholds.get(kind)
+        if threshold is None:
+            return
+        self.failures[kind] = self.failures.get(kind, 0) + 1
+        # Tras el enfriamiento (half-open) basta una falla para volver a abrir.
+        if self.failures[kind] >= threshold or self.open_until:
+            self.open_until = time.time() + self.cooldown
+            self.failures = {}
+            self._save()
+            print(f"   !!! Circuito ABIERTO para {self.store} por {kind} "
+                  f"(se reintentará en {self.cooldown / 60:.0f} min). !!!")
+
+
+_breakers = {}
+
+
+def breaker(store):
+    if store not in _breakers:
+        _breakers[store] = CircuitBreaker(store, state_file=os.environ.get("SCRAPER_CIRCUIT_FILE"))
+    return _breakers[store]
+
+
+def call(store, fn, policy=None, recover=None):
+    """
+    Ejecuta fn() con reintentos según el tipo de falla.
+    - recover(): se llama antes de reintentar una caída del driver (ej. recrearlo), y después
+      de una unidad exitosa si core.memory marcó el driver por pasar el presupuesto de memoria.
+    - Lanza CircuitOpen si la tienda está bloqueada, o la última excepción si se agotan los intentos.
+    """
+    policy = policy or RetryPolicy()
+    circuit = breaker(store)
+    attempt = 0
+
+    while True:
+        if not circuit.allow():
+            raise CircuitOpen(f"circuito abierto para {store}")
+        attempt += 1
+        try:
+            result = fn()
+        except Exception as e:
+            kind = classify(e)
+            if kind == BLOCK:
+                metrics.count("captcha_hits", store)
+            circuit.record_failure(kind)
+
+            if attempt >= policy.attempts.get(kind, 1) or not circuit.allow():
+                raise
+            wait = policy.delay(attempt, kind)
+            print(f"   -> Falla ({kind}): {e}. Reintento {attempt} en {wait:.1f}s...")
+            metrics.count("retries", store)
+            time.sleep(wait)
+            if kind == DRIVER_CRASH and recover:
+                recover()
+            continue
+
+        circuit.record_success()
+        if recover and memory.take_recycle(store):
+            metrics.count("driver_recycles", store)
+            recover()
+        return result
@@ -0,0 +1,241 @@
+import argparse
+import hashlib
+import json
+import math
+import sqlite3
+import time
+
+from core.normalize import product_key
+
+HOUR = 3600
+
+# Límites del intervalo de refresco de una unidad.
+MIN_INTERVAL = HOUR
+MAX_INTERVAL = 7 * 24 * HOUR
+
+# Costo supuesto (segundos de navegador) de una unidad que nunca se midió.
+DEFAULT_COST_S = 45.0
+
+# Prior del estimador: equivale a haber observado PRIOR_HOURS con la tasa de la tienda
+# (o 1 cambio por día si la tienda tampoco tiene historia).
+PRIOR_HOURS = 24.0
+DEFAULT_RATE = 1 / 24.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    store       TEXT NOT NULL,
+    unit        TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    products    INTEGER,
+    cost_s      REAL,
+    args        TEXT,
+    PRIMARY KEY (store, unit, observed_at)
+) WITHOUT ROWID;
+"""
+
+
+def unit_fingerprint(products):
+    """
+    Hash de (producto, precio, stock) de una página: cambia si entra/sale un producto o cambia un precio.
+    """
+    rows = sorted(
+        (product_key(p), str(p.get("price")), str(p.get("stock"))) for p in products
+    )
+    return hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class FreshnessScheduler:
+    """
+    Estima cada cuánto cambia cada (tienda, página/categoría) a partir de corridas
+    anteriores y arma la lista de unidades a refrescar que entra en un presupuesto
+    de minutos de navegador, priorizando donde es más probable que el precio haya cambiado.
+    """
+
+    def __init__(self, path="frescura.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, store, unit, products, observed_at=None, cost_s=None, args=()):
+        """
+        unit es la URL de la unidad; args, el resto de los argumentos de scrape_page (p. ej. la
+        categoría de ASUS), que se guardan para poder volver a encolarla completa.
+        """
+        observed_at = observed_at if observed_at is not None else time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO observations (store, unit, observed_at, fingerprint, products, cost_s, args) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (store, unit, observed_at, unit_fingerprint(products), len(products), cost_s,
+                 json.dumps(list(args), ensure_ascii=False)),
+            )
+
+    def record_queue(self, queue, job):
+        """
+        Registra las unidades terminadas de un job de core.workqueue.
+        """
+        count = 0
+        for unit in queue.completed(job):
+            self.record(unit["store"], unit["url"], unit["products"], unit["finished_at"], unit["duration_s"],
+                        unit["args"])
+            count += 1
+        return count
+
+    def _history(self):
+        units = {}
+        for row in self.conn.execute(
+            "SELECT store, unit, observed_at, fingerprint, cost_s, args FROM observations "
+            "ORDER BY store, unit, observed_at"
+        ):
+            units.setdefault((row["store"], row["unit"]), []).append(row)
+        return units
+
+    @staticmethod
+    def _changes(rows):
+        changes, hours = 0, 0.0
+        for previous, current in zip(rows, rows[1:]):
+            hours += (current["observed_at"] - previous["observed_at"]) / HOUR
+            if current["fingerprint"] != previous["fingerprint"]:
+                changes += 1
+        return changes, hours
+
+    def estimates(self, now=None):
+        """
+        Tasa de cambio (cambios/hora), intervalo de refresco y costo de cada unidad conocida.
+        La tasa de cada unidad se suaviza hacia la de su tienda cuando hay pocas observaciones.
+        """
+        now = now if now is not None else time.time()
+        history = self._history()
+
+        store_totals = {}
+        for (store, _), rows in history.items():
+            changes, hours = self._changes(rows)
+            total = store_totals.setdefault(store, [0, 0.0])
+            total[0] += changes
+            total[1] += hours
+
+        result = []
+        for (store, unit), rows in history.items():
+            changes, hours = self._changes(rows)
+            store_changes, store_hours = store_totals[store]
+            prior_rate = (store_changes + 1) / (store_hours + 24) if store_hours else DEFAULT_RATE
+            rate = (changes + prior_rate * PRIOR_HOURS) / (hours + PRIOR_HOURS)
+
+            # Intervalo: tiempo hasta que la probabilidad de cambio llega al 50%.
+            interval = min(MAX_INTERVAL, max(MIN_INTERVAL, math.log(2) / rate * HOUR))
+            costs = [row["cost_s"] for row in rows if row["cost_s"]]
+            age = now - rows[-1]["observed_at"]
+            result.append({
+                "store": store,
+                "unit": unit,
+                "args": json.loads(rows[-1]["args"] or "[]"),
+                "observations": len(rows),
+                "rate_per_hour": round(rate, 4),
+                "interval_h": round(interval / HOUR, 2),
+                "age_h": round(age / HOUR, 2),
+                "due": age >= interval,
+                "p_changed": round(1 - math.exp(-rate * age / HOUR), 4),
+                # Piso de 1 s: una unidad medida en ~0 s no puede dividir la prioridad por cero.
+                "cost_s": max(1.0, round(sum(costs[-5:]) / len(costs[-5:]), 1)) if costs else DEFAULT_COST_S,
+            })
+        return result
+
+    def plan(self, budget_minutes, now=None, seeds=()):
+        """
+        Lista priorizada de unidades vencidas que entra en el presupuesto de minutos de navegador.
+        Orden: probabilidad de cambio por segundo de navegador. Las semillas (store, unit) o
+        (store, unit, args), como las de core.workqueue, sin historia van primero con el costo por defecto.
+        """
+        estimates = self.estimates(now)
+        known = {(e["store"], e["unit"]) for e in estimates}
+        candidates = []
+        for seed in seeds:
+            store, unit = seed[0], seed[1]
+            if (store, unit) in known:
+                continue
+            known.add((store, unit))
+            candidates.append({
+                "store": store, "unit": unit, "args": list(seed[2]) if len(seed) > 2 else [],
+                "observations": 0, "due": True, "p_changed": 1.0, "cost_s": DEFAULT_COST_S,
+                "interval_h": None, "rate_per_hour": None, "age_h": None,
+            })
+        candidates += [e for e in estimates if e["due"]]
+        candidates.sort(key=lambda e: (e["observations"] > 0, -e["p_changed"] / e["cost_s"]))
+
+        budget = budget_minutes * 60
+        selected, spent = [], 0.0
+        for candidate in candidates:
+            if spent + candidate["cost_s"] > budget:
+                continue
+            spent += candidate["cost_s"]
+            selected.append(candidate)
+        return selected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planificador de refresco según la frecuencia de cambio.")
+    parser.add_argument("--db", default="frescura.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Registra las unidades terminadas de un job de core.workqueue.")
+    ingest.add_argument("job")
+    ingest.add_argument("--queue", default="cola.db")
+
+    record = sub.add_parser("record", help="Registra un *_laptops.json como observación de una unidad.")
+    record.add_argument("store")
+    record.add_argument("unit")
+    record.add_argument("json_file")
+
+    sub.add_parser("rates", help="Muestra la tasa de cambio e intervalo de cada unidad.")
+
+    plan = sub.add_parser("plan", help="Lista priorizada de unidades que entra en el presupuesto.")
+    plan.add_argument("--budget-min", type=float, required=True)
+    plan.add_argument("--enqueue", metavar="JOB", help="Encola el plan en core.workqueue con su prioridad.")
+    plan.add_argument("--queue", default="cola.db")
+    plan.add_argument("--stores", nargs="*", help="Tiendas cuyas unidades (core.plugins) siembran el plan; "
+                                                  "por defecto todas.")
+
+    args = parser.parse_args()
+
+    with FreshnessScheduler(args.db) as scheduler:
+        if args.command == "ingest":
+            from core.workqueue import SQLiteQueue
+            with SQLiteQueue(args.queue) as queue:
+                print(f"Observaciones registradas: {scheduler.record_queue(queue, args.job)}")
+        elif args.command == "record":
+            with open(args.json_file, encoding='utf-8') as f:
+                scheduler.record(args.store, args.unit, json.load(f))
+        elif args.command == "rates":
+            estimates = sorted(scheduler.estimates(), key=lambda e: -e["rate_per_hour"])
+            print(json.dumps(estimates, indent=4, ensure_ascii=False))
+        else:
+            from core import plugins
+            seeds = [(store, unit[0], unit[1:])
+                     for store in (args.stores or plugins.names()) for unit in plugins.get(store).units()]
+            selected = scheduler.plan(args.budget_min, seeds=seeds)
+            minutes = sum(e["cost_s"] for e in selected) / 60
+            print(json.dumps(selected, indent=4, ensure_ascii=False))
+            print(f"{len(selected)} unidades, {minutes:.1f} de {args.budget_min:.0f} minutos de navegador.")
+            if args.enqueue:
+                from core.workqueue import SQLiteQueue
+                with SQLiteQueue(args.queue) as queue:
+                    for rank, e in enumerate(selected):
+                        queue.enqueue(args.enqueue, [(e["store"], e["unit"], e["args"])],
+                                      priority=len(selected) - rank)
+                print(f"Encolado en {args.enqueue}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+
+from core import metrics
+
+DEFAULT_FILE = os.path.join(os.path.expanduser("~"), ".cache", "scraper-scroll.json")
+
+POLL_INTERVAL = 0.05
+BOTTOM_STABLE = 0.3
+
+# Valores de partida (los que estaban fijos en cada script): paso en px, espera máxima por paso,
+# espera final al fondo, rebote hacia arriba al terminar y si el paso lleva jitter "humano".
+DEFAULTS = {
+    "amazon": {"step": 600, "pause": 0.25, "settle": 1.5, "nudge": 0, "jitter": True},
+    "asus": {"step": 400, "pause": 0.1, "settle": 2.0, "nudge": 600, "jitter": False},
+    "falabella": {"step": 400, "pause": 0.15, "settle": 1.5, "nudge": 0, "jitter": False},
+    "hp": {"step": 500, "pause": 0.1, "settle": 2.0, "nudge": 0, "jitter": False},
+    "infotec": {"step": 400, "pause": 0.1, "settle": 1.0, "nudge": 0, "jitter": False},
+    "magitech": {"step": 400, "pause": 0.2, "settle": 1.5, "nudge": 0, "jitter": False},
+    "memorykings": {"step": 400, "pause": 0.1, "settle": 1.5, "nudge": 0, "jitter": False},
+    "oechsle": {"step": 400, "pause": 0.1, "settle": 1.5, "nudge": 0, "jitter": False},
+    "realplaza": {"step": 500, "pause": 0.15, "settle": 1.5, "nudge": 500, "jitter": False},
+    "supertec": {"step": 400, "pause": 0.1, "settle": 1.0, "nudge": 0, "jitter": False},
+}
+
+# Límites seguros de lo aprendido.
+BOUNDS = {"step": (200, 1600), "pause": (0.05, 1.5), "settle": (0.3, 4.0)}
+
+# Tope duro de una pasada (pasos y segundos): en listados con scroll infinito (Real Plaza y
+# Oechsle en VTEX IO) el alto crece mientras se baja y sin tope se seguiría trayendo las
+# páginas siguientes. No se aprenden; se pueden fijar por tienda en SCRAPER_SCROLL_FILE.
+LIMITS = {"max_steps": 60, "max_seconds": 45.0}
+STORE_LIMITS = {
+    "oechsle": {"max_steps": 40, "max_seconds": 30.0},
+    "realplaza": {"max_steps": 30, "max_seconds": 30.0},
+}
+
+# Peso de la corrida nueva al suavizar (media móvil exponencial).
+ALPHA = 0.3
+
+# Imágenes visibles (con caja) que todavía no cargaron: sin terminar, sin src, con placeholder data:
+# o de 1px. Una imagen rota (cargó con error) no cuenta, si no frenaría cada paso hasta el tope,
+# y tampoco las que quedan fuera de pantalla en horizontal (slides de carruseles), que nunca cargan.
+# Con arguments[0] = true cuenta solo las del viewport; devuelve [pendientes, alto del documento].
+PENDING_JS = """
+var onlyViewport = arguments[0], pending = 0, vh = window.innerHeight, vw = window.innerWidth;
+var images = document.images;
+for (var i = 0; i < images.length; i++) {
+    var img = images[i], box = img.getBoundingClientRect();
+    if (box.width < 2 || box.height < 2 || box.right < 0 || box.left > vw) continue;
+    if (onlyViewport && (box.bottom < 0 || box.top > vh)) continue;
+    var src = img.currentSrc || img.src || "";
+    if (!img.complete || src === "" || src.indexOf("data:") === 0 || img.naturalWidth === 1) pending++;
+}
+return [pending, document.body.scrollHeight];
+"""
+
+_lock = threading.Lock()
+
+
+def _clamp(name, value):
+    low, high = BOUNDS[name]
+    return min(high, max(low, value))
+
+
+def adaptive():
+    return os.environ.get("SCRAPER_SCROLL_ADAPT", "1") != "0"
+
+
+def tuning_file():
+    return os.environ.get("SCRAPER_SCROLL_FILE", DEFAULT_FILE)
+
+
+def load_tuning(path=None):
+    path = path or tuning_file()
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def profile(store):
+    """
+    Parámetros de scroll de la tienda: los aprendidos si hay, si no los de DEFAULTS.
+    """
+    params = dict(DEFAULTS.get(store, DEFAULTS["supertec"]))
+    params.update(LIMITS)
+    params.update(STORE_LIMITS.get(store, {}))
+    if adaptive():
+        learned = load_tuning().get(store, {})
+        params.update({k: learned[k] for k in (*BOUNDS, *LIMITS) if k in learned})
+    return params
+
+
+def _quantile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def learn(store, params, stats):
+    """
+    Ajusta los parámetros con lo observado en una pasada y los guarda:
+    - pause: p90 del tiempo real hasta que el viewport terminó de cargar, con margen.
+    - settle: lo que tardó el fondo en quedar completo, con margen.
+    - step: si quedaron imágenes sin cargar se achica (y se alarga la pausa); si todo cargó
+      rápido se agranda, así los sitios rápidos necesitan menos pasos.
+    """
+    new = {}
+    latencies = stats["latencies"]
+    if latencies:
+        new["pause"] = _quantile(latencies, 0.9) * 1.5 + POLL_INTERVAL
+    else:
+        new["pause"] = params["pause"]
+    new["settle"] = stats["settle_s"] * 1.5 + 0.2
+    new["step"] = params["step"]
+
+    if stats["missed"]:
+        new["step"] = params["step"] * 0.75
+        new["pause"] = max(new["pause"], params["pause"]) * 1.5
+        new["settle"] = max(new["settle"], params["settle"]) * 1.5
+    elif latencies and _quantile(latencies, 0.9) < params["pause"] * 0.5:
+        new["step"] = params["step"] * 1.15
+
+    tuned = {}
+    for name in BOUNDS:
+        # Si se perdieron imágenes se aplica directo; si no, se suaviza para no oscilar.
+        value = new[name] if stats["missed"] else ALPHA * new[name] + (1 - ALPHA) * params[name]
+        tuned[name] = round(_clamp(name, value), 3)
+    tuned["step"] = int(tuned["step"])
+    previous = load_tuning().get(store, {})
+    # Los topes fijados a mano en el archivo se conservan.
+    tuned.update({k: previous[k] for k in LIMITS if k in previous})
+    tuned["runs"] = previous.get("runs", 0) + 1
+    tuned["updated_at"] = time.time()
+    save_tuning(store, tuned)
+    return tuned
+
+
+def save_tuning(store, values, path=None):
+    path = path or tuning_file()
+    with _lock:
+        tuning = load_tuning(path)
+        tuning[store] = values
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(tuning, f, indent=4)
+        os.replace(tmp, path)
+
+
+def _pending(driver, only_viewport):
+    pending, height = driver.execute_script(PENDING_JS, only_viewport)
+    return pending, height
+
+
+def _wait_loaded(driver, only_viewport, limit, stable=0.0):
+    """
+    Espera hasta que no queden imágenes pendientes (en el viewport o en toda la página) y el alto
+    del documento no cambie durante `stable` segundos, o hasta `limit`.
+    Devuelve (segundos esperados, pendientes, alto del documento).
+    """
+    start = time.monotonic()
+    last_height, stable_since = None, start
+    while True:
+        pending, height = _pending(driver, only_viewport)
+        now = time.monotonic()
+        if height != last_height:
+            last_height, stable_since = height, now
+        elapsed = now - start
+        if (not pending and now - stable_since >= stable) or elapsed >= limit:
+            return elapsed, pending, height
+        time.sleep(POLL_INTERVAL)
+
+
+def scroll(store, driver):
+    """
+    Baja la página por pasos y en cada paso espera a que carguen las imágenes lazy del viewport
+    (como máximo la pausa aprendida), revisando el alto del documento en cada paso. Corta al llegar
+    a max_steps pasos o max_seconds segundos aunque el documento siga creciendo. Al fondo espera
+    el resto y cuenta las imágenes que no llegaron a cargar. Con SCRAPER_SCROLL_ADAPT activo
+    (por defecto) lo observado ajusta paso y esperas para la próxima vez.
+    """
+    params = profile(store)
+    latencies = []
+    start = time.monotonic()
+    capped = False
+
+    pos = 0
+    height = driver.execute_script("return document.body.scrollHeight")
+    while pos < height:
+        if len(latencies) >= params["max_steps"] or time.monotonic() - start >= params["max_seconds"]:
+            capped = True
+            break
+        step = params["step"]
+        if params["jitter"]:
+            step = int(step * random.uniform(0.67, 1.33))
+        pos += step
+        driver.execute_script(f"window.scrollTo(0, {pos});")
+        elapsed, pending, height = _wait_loaded(driver, True, params["pause"])
+        latencies.append(elapsed)
+        if params["jitter"] and not pending:
+            time.sleep(random.uniform(0, params["pause"]))
+
+    # Al fondo puede llegar otra tanda de productos: se espera a que el alto se estabilice.
+    # Si se cortó por el tope no se salta al fondo, que traería otra tanda más.
+    if capped:
+        print(f"   -> Scroll de {store} cortado tras {len(latencies)} pasos (el listado sigue creciendo).")
+        metrics.count("scroll_capped", store)
+    else:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    settle_s, missed, _ = _wait_loaded(driver, False, params["settle"], stable=BOTTOM_STABLE)
+    if params["nudge"]:
+        driver.execute_script(f"window.scrollBy(0, -{params['nudge']});")
+        time.sleep(min(1.0, params["pause"] * 4))
+
+    for latency in latencies:
+        metrics.observe(store, "lazy", latency)
+    if missed:
+        metrics.count("lazy_images_missed", store, missed)
+
+    stats = {"steps": len(latencies), "latencies": latencies, "settle_s": settle_s, "missed": missed,
+             "capped": capped, "seconds": round(time.monotonic() - start, 2)}
+    if adaptive():
+        stats["tuned"] = learn(store, params, stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parámetros de scroll aprendidos por tienda.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="Muestra lo aprendido frente a los valores de partida.")
+    reset = sub.add_parser("reset", help="Olvida lo aprendido de una tienda (o de todas).")
+    reset.add_argument("store", nargs="?")
+    args = parser.parse_args()
+
+    tuning = load_tuning()
+    if args.command == "show":
+        report = {store: {"default": {**DEFAULTS[store], **LIMITS, **STORE_LIMITS.get(store, {})},
+                          "learned": tuning.get(store)} for store in sorted(DEFAULTS)}
+        print(json.dumps(report, indent=4))
+        return
+    path = tuning_file()
+    if args.store:
+        tuning.pop(args.store, None)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(tuning, f, indent=4)
+    elif os.path.exists(path):
+        os.remove(path)
+    print("Listo.")
+
+
+if __name__ == "__main__":
+    main()
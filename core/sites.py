@@ -0,0 +1,77 @@
+import os
+from urllib.parse import urlsplit
+
+# Origen real de cada tienda. Los scrapers arman sus URLs a partir de base_url(),
+# así se pueden apuntar al servidor mock (core.mock_server) sin tocar el código.
+ORIGINS = {
+    "amazon": "https://www.amazon.com",
+    "asus": "https://www.asus.com",
+    "falabella": "https://www.falabella.com.pe",
+    "hp": "https://www.hp.com",
+    "infotec": "https://www.infotec.com.pe",
+    "lenovo": "https://www.lenovo.com",
+    "magitech": "https://www.magitech.pe",
+    "memorykings": "https://www.memorykings.pe",
+    "oechsle": "https://www.oechsle.pe",
+    "realplaza": "https://www.realplaza.com",
+    "supertec": "https://supertec.com.pe",
+}
+
+# pageLoadStrategy de Chrome por tienda ("normal" si no figura): con "none" driver.get vuelve
+# apenas arranca la navegación y core.loading espera solo el listado. Magitech (Magento 1.x)
+# tarda en el load por widgets de terceros aunque los productos ya estén en el HTML.
+PAGE_LOAD_STRATEGIES = {
+    "magitech": "none",
+}
+
+# Tope duro (segundos) para navegar y tener el listado; pasado el tope se corta la carga
+# y se extrae lo que haya en el DOM.
+NAVIGATION_BUDGETS = {
+    "magitech": 25,
+}
+DEFAULT_NAVIGATION_BUDGET = 60
+
+
+def base_url(store):
+    """
+    Origen a usar para la tienda. Prioridad:
+    <TIENDA>_BASE_URL > SCRAPER_MOCK_URL/<tienda> > origen real.
+    """
+    override = os.environ.get(f"{store.upper()}_BASE_URL")
+    if override:
+        return override.rstrip('/')
+
+    mock = os.environ.get("SCRAPER_MOCK_URL")
+    if mock:
+        return f"{mock.rstrip('/')}/{store}"
+
+    return ORIGINS[store]
+
+
+def chrome_arguments():
+    """
+    Argumentos extra de Chrome. Contra el mock se bloquea toda resolución DNS
+    excepto localhost, así ninguna imagen/CDN de las páginas grabadas sale a la red.
+    """
+    mock = os.environ.get("SCRAPER_MOCK_URL")
+    if not mock:
+        return []
+    host = urlsplit(mock).hostname or "127.0.0.1"
+    return [f"--host-resolver-rules=MAP * ~NOTFOUND , EXCLUDE {host} , EXCLUDE localhost"]
+
+
+def page_load_strategy(store):
+    """
+    <TIENDA>_PAGE_LOAD (normal, eager o none) > tabla > "normal".
+    """
+    strategy = os.environ.get(f"{store.upper()}_PAGE_LOAD") or PAGE_LOAD_STRATEGIES.get(store, "normal")
+    if strategy not in ("normal", "eager", "none"):
+        raise ValueError(f"Estrategia de carga inválida para {store}: {strategy}")
+    return strategy
+
+
+def navigation_budget(store):
+    """
+    <TIENDA>_NAV_BUDGET > tabla > DEFAULT_NAVIGATION_BUDGET.
+    """
+    return float(os.environ.get(f"{store.upper()}_NAV_BUDGET") or NAVIGATION_BUDGETS.get(store, DEFAULT_NAVIGATION_BUDGET))
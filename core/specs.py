@@ -0,0 +1,240 @@
+import argparse
+import json
+import re
+import statistics
+import time
+
+SPEC_FIELDS = ("cpu_family", "cpu_gen", "ram_gb", "ssd_gb", "gpu", "screen_in")
+
+# Presupuesto por fila para el benchmark: las filas que tardan más se reportan en over_budget.
+# La extracción no se corta por tiempo, así el resultado no depende de la carga de la máquina.
+ROW_BUDGET_US = 200
+MAX_NAME_LEN = 300
+
+STORAGE_SIZES_GB = {128, 256, 512, 1000, 1024, 2000, 2048}
+RAM_SIZES_GB = {4, 8, 12, 16, 18, 24, 32, 36, 48, 64, 96, 128}
+
+
+def _intel_gen(model):
+    # i7-13620H -> 13, i5-1135G7 -> 11, i5-8250U -> 8
+    if len(model) == 5 or model.startswith("1"):
+        return int(model[:2])
+    return int(model[0])
+
+
+def _size_gb(amount, unit):
+    value = float(amount.replace(",", "."))
+    return int(value * 1024) if unit.lower() == "tb" else int(value)
+
+
+HDD_AFTER_RE = re.compile(r'\s*hdd\b')
+
+
+def _storage_gb(m):
+    # Tamaño suelto (sin "ssd" al lado): se descarta si es el disco duro ("1tb hdd", "hdd de 1tb").
+    if HDD_AFTER_RE.match(m.string, m.end()) or "hdd" in m.string[max(0, m.start() - 8):m.start()]:
+        return None
+    if m.group(2).lower() == "tb" or int(float(m.group(1))) in STORAGE_SIZES_GB:
+        return _size_gb(m.group(1), m.group(2))
+    return None
+
+
+# Cada tabla es una lista ordenada (patrón compilado, función que arma el valor).
+# Se usa el primer patrón que coincide, así los más específicos van primero.
+CPU_TABLE = [
+    (re.compile(r'\bcore\s*ultra\s*([3579])\s*(?:processor\s*)?(\d)(\d{2})[a-z]{0,2}\b'),
+     lambda m: (f"Core Ultra {m.group(1)}", int(m.group(2)))),
+    (re.compile(r'\bcore\s*ultra\s*([3579])\b'),
+     lambda m: (f"Core Ultra {m.group(1)}", None)),
+    (re.compile(r'\bi([3579])[\s-]*(\d{4,5})[a-z]{0,2}\d?\b'),
+     lambda m: (f"Core i{m.group(1)}", _intel_gen(m.group(2)))),
+    (re.compile(r'\bcore\s*([357])\s+(\d)\d{2}[a-z]\b'),
+     lambda m: (f"Core {m.group(1)}", int(m.group(2)))),
+    (re.compile(r'\bryzen\s*ai\s*([579])\s*(?:hx\s*)?(\d)\d{2}\b'),
+     lambda m: (f"Ryzen AI {m.group(1)}", int(m.group(2)))),
+    (re.compile(r'\bryzen\s*([3579])\s*(?:pro\s*)?(\d)\d{3}[a-z]{0,2}\b'),
+     lambda m: (f"Ryzen {m.group(1)}", int(m.group(2)))),
+    (re.compile(r'\bryzen\s*([3579])\b'),
+     lambda m: (f"Ryzen {m.group(1)}", None)),
+    (re.compile(r'\b(?:core\s*)?i([3579])\b'),
+     lambda m: (f"Core i{m.group(1)}", None)),
+    (re.compile(r'\b(celeron|pentium|athlon)\b'),
+     lambda m: (m.group(1).capitalize(), None)),
+    (re.compile(r'\b(?:apple\s*)?(m[1-4])(\s*(?:pro|max))?\b'),
+     lambda m: ((m.group(1).upper() + (m.group(2) or "").title()).strip(), int(m.group(1)[1]))),
+    (re.compile(r'\bsnapdragon\s*x\s*(elite|plus)?'),
+     lambda m: (f"Snapdragon X {(m.group(1) or '').title()}".strip(), None)),
+]
+
+# Generación escrita aparte ("13th Gen", "12va generación") cuando el modelo no la trae.
+GEN_RE = re.compile(r'\b(\d{1,2})\s*(?:th|va|ma|ra|da|na|ª|°|º)?\s*gen')
+
+RAM_TABLE = [
+    (re.compile(r'\b(\d{1,3})\s*gb\s*(?:de\s*)?(?:ram|memoria|(?:lp)?ddr\d\w*)\b'),
+     lambda m: int(m.group(1))),
+    (re.compile(r'\b(?:ram|memoria)\s*(?:de\s*)?(\d{1,3})\s*gb\b'),
+     lambda m: int(m.group(1))),
+    (re.compile(r'\b(\d{1,3})\s*gb\b(?!\s*(?:ssd|emmc|hdd|ufs|vram|gddr|pcie|nvme|m\.2))'),
+     lambda m: int(m.group(1)) if int(m.group(1)) in RAM_SIZES_GB else None),
+]
+
+SSD_TABLE = [
+    (re.compile(r'\b(\d+(?:[.,]\d)?)\s*(tb|gb)\s*(?:(?:pcie|nvme|m\.2|gen\s*\d)\s*)*ssd\b'),
+     lambda m: _size_gb(m.group(1), m.group(2))),
+    (re.compile(r'\bssd\s*(?:de\s*)?(?:(?:pcie|nvme|m\.2)\s*)*(\d+(?:[.,]\d)?)\s*(tb|gb)\b'),
+     lambda m: _size_gb(m.group(1), m.group(2))),
+    (re.compile(r'\b(\d+(?:[.,]\d)?)\s*(tb|gb)\b'),
+     _storage_gb),
+]
+
+GPU_TABLE = [
+    (re.compile(r'\b(rtx|gtx)\s*a?(\d{3,4})\s*(ti)?\b'),
+     lambda m: f"{m.group(1).upper()} {m.group(2)}{' Ti' if m.group(3) else ''}"),
+    (re.compile(r'\b(?:radeon\s*)?rx\s*(\d{4}[ms]?)\b'),
+     lambda m: f"Radeon RX {m.group(1).upper()}"),
+    (re.compile(r'\barc\s*(a\d{3}m)\b'),
+     lambda m: f"Intel Arc {m.group(1).upper()}"),
+    (re.compile(r'\b(?:intel\s*)?arc\b'),
+     lambda m: "Intel Arc"),
+    (re.compile(r'\biris\s*xe\b'),
+     lambda m: "Intel Iris Xe"),
+    (re.compile(r'\bradeon\b'),
+     lambda m: "Radeon"),
+]
+
+SCREEN_TABLE = [
+    (re.compile(r'\b(\d{2}(?:[.,]\d{1,2})?)\s*(?:"|”|\'\'|pulgadas|pulg\b|in\b|inch)'),
+     lambda m: _screen(m.group(1))),
+    (re.compile(r'\b(1[0-8][.,]\d)\b'),
+     lambda m: _screen(m.group(1))),
+]
+
+
+def _screen(raw):
+    value = float(raw.replace(",", "."))
+    return value if 10 <= value <= 19 else None
+
+
+def _first(table, text):
+    for pattern, build in table:
+        for match in pattern.finditer(text):
+            value = build(match)
+            if value is not None:
+                return value
+    return None
+
+
+def _cpu(text, result):
+    found = _first(CPU_TABLE, text)
+    if found:
+        result["cpu_family"], result["cpu_gen"] = found
+    if result["cpu_family"] and result["cpu_gen"] is None:
+        gen = GEN_RE.search(text)
+        if gen:
+            result["cpu_gen"] = int(gen.group(1))
+
+
+STAGES = [
+    _cpu,
+    lambda text, result: result.__setitem__("ram_gb", _first(RAM_TABLE, text)),
+    lambda text, result: result.__setitem__("ssd_gb", _first(SSD_TABLE, text)),
+    lambda text, result: result.__setitem__("gpu", _first(GPU_TABLE, text)),
+    lambda text, result: result.__setitem__("screen_in", _first(SCREEN_TABLE, text)),
+]
+
+
+def extract_specs(name):
+    """
+    Extrae CPU, RAM, SSD, GPU y pantalla del nombre del producto.
+    Devuelve un dict con SPEC_FIELDS; los campos no encontrados quedan en None.
+    """
+    result = dict.fromkeys(SPEC_FIELDS)
+    text = (name or "")[:MAX_NAME_LEN].lower()
+    for stage in STAGES:
+        stage(text, result)
+    return result
+
+
+def extract_batch(names):
+    return [extract_specs(name) for name in names]
+
+
+def add_specs(products):
+    """
+    Agrega las columnas de specs a cada producto (sin pisar campos existentes).
+    """
+    for item, specs in zip(products, extract_batch([p.get("name") for p in products])):
+        for field, value in specs.items():
+            item.setdefault(field, value)
+    return products
+
+
+def benchmark(names, budget_us=ROW_BUDGET_US, rounds=3):
+    """
+    Mide el costo por fila y la cobertura de cada columna; over_budget cuenta las filas
+    que tardaron más de budget_us (se miden, no se cortan).
+    """
+    timings = []
+    results = []
+    for _ in range(rounds):
+        results = []
+        for name in names:
+            start = time.perf_counter_ns()
+            results.append(extract_specs(name))
+            timings.append((time.perf_counter_ns() - start) / 1000)
+
+    over_budget = sum(1 for t in timings if t > budget_us)
+
+    timings.sort()
+    coverage = {field: sum(1 for r in results if r[field] is not None) / max(len(results), 1)
+                for field in SPEC_FIELDS}
+    return {
+        "rows": len(names),
+        "mean_us": round(statistics.fmean(timings), 2) if timings else 0,
+        "p50_us": round(timings[len(timings) // 2], 2) if timings else 0,
+        "p99_us": round(timings[int(len(timings) * 0.99)], 2) if timings else 0,
+        "over_budget": round(over_budget / max(rounds, 1)),
+        "coverage": {k: round(v, 3) for k, v in coverage.items()},
+    }
+
+
+SAMPLE_NAMES = [
+    "Laptop Lenovo IdeaPad Slim 3 15IRH8 Intel Core i5-13420H 16GB RAM 512GB SSD 15.6\" FHD",
+    "ASUS ROG Strix G16 G614JV-N3094W i7-13650HX 16GB DDR5 1TB SSD RTX 4060 16\"",
+    "HP Victus 15-fb0105la AMD Ryzen 5 5600H 8GB 512GB SSD Radeon RX 6500M 15.6 pulgadas",
+    "Laptop ASUS Zenbook 14 OLED Intel Core Ultra 7 155H 32GB 1TB Intel Arc 14\"",
+    "Apple MacBook Air 13.6'' Chip M2 8GB 256GB SSD",
+    "LAPTOP HP 250 G9 CORE I3-1215U 8GB 256GB SSD 15.6\" FREEDOS",
+    "Lenovo V15 G4 AMN Ryzen 3 7320U 8GB 256GB 15.6",
+    "Laptop Acer Aspire 5 Intel Core i7 12va Gen 16GB 512GB Iris Xe 14 pulgadas",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrae specs de los nombres de producto.")
+    parser.add_argument("json_files", nargs="*", help="*_laptops.json de entrada")
+    parser.add_argument("--bench", action="store_true", help="Mide costo por fila en lugar de escribir.")
+    parser.add_argument("--budget-us", type=float, default=ROW_BUDGET_US,
+                        help="Umbral por fila para over_budget en --bench.")
+    args = parser.parse_args()
+
+    if args.bench:
+        names = []
+        for path in args.json_files:
+            with open(path, encoding='utf-8') as f:
+                names.extend(p.get("name") for p in json.load(f))
+        report = benchmark(names or SAMPLE_NAMES * 500, args.budget_us)
+        print(json.dumps(report, indent=4))
+        return
+
+    for path in args.json_files:
+        with open(path, encoding='utf-8') as f:
+            products = json.load(f)
+        add_specs(products)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(products, f, indent=4, ensure_ascii=False)
+        print(f"{path}: specs agregadas a {len(products)} productos.")
+
+
+if __name__ == "__main__":
+    main()
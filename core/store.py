@@ -0,0 +1,261 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+from core.normalize import image_key, product_key
+
+# Campos que, si cambian, generan un registro en la tabla de cambios.
+TRACKED_FIELDS = ("price", "stock", "image_url")
+
+BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    store       TEXT NOT NULL,
+    product_id  TEXT NOT NULL,
+    name        TEXT,
+    price       TEXT,
+    stock       TEXT,
+    image_url   TEXT,
+    url         TEXT,
+    data        TEXT,
+    fingerprint TEXT,
+    first_seen  REAL,
+    last_seen   REAL,
+    updated_at  REAL,
+    removed_at  REAL,
+    PRIMARY KEY (store, product_id)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    store       TEXT NOT NULL,
+    product_id  TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    data        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_time ON changes (observed_at);
+CREATE INDEX IF NOT EXISTS idx_changes_store_time ON changes (store, observed_at);
+"""
+
+UPSERT_SQL = """
+INSERT INTO products (store, product_id, name, price, stock, image_url, url, data,
+                      fingerprint, first_seen, last_seen, updated_at, removed_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+ON CONFLICT (store, product_id) DO UPDATE SET
+    name = excluded.name,
+    price = excluded.price,
+    stock = excluded.stock,
+    image_url = excluded.image_url,
+    url = excluded.url,
+    data = excluded.data,
+    fingerprint = excluded.fingerprint,
+    last_seen = excluded.last_seen,
+    updated_at = excluded.updated_at,
+    removed_at = NULL
+"""
+
+
+def fingerprint(item):
+    """
+    Hash de los campos rastreados (precio, stock, imagen). La imagen entra sin el segmento de
+    tamaño, así un cambio de resolución no cuenta como cambio del producto.
+    """
+    values = [image_key(item.get(field)) if field == "image_url" else item.get(field)
+              for field in TRACKED_FIELDS]
+    raw = json.dumps(values, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def parse_since(value):
+    """
+    Acepta epoch (número) o fecha 'YYYY-MM-DD[ HH:MM:SS]' y devuelve epoch.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no reconocida: {value}")
+
+
+def _chunks(rows, size=BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class ProductStore:
+    """
+    Almacén local (SQLite) de productos por (tienda, product_id).
+    Guarda el último estado conocido y un log de cambios para consultas incrementales.
+    """
+
+    def __init__(self, path="productos.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def sync(self, store, products, timestamp=None, mark_removed=True):
+        """
+        Compara la corrida actual con el estado guardado y escribe sólo las diferencias.
+        Devuelve un resumen con la cantidad de productos nuevos, cambiados, eliminados y sin cambios.
+        """
+        now = timestamp if timestamp is not None else time.time()
+
+        known = {}
+        for row in self.conn.execute(
+            "SELECT product_id, fingerprint, removed_at, image_url FROM products WHERE store = ?", (store,)
+        ):
+            known[row["product_id"]] = (row["fingerprint"], row["removed_at"], row["image_url"])
+
+        current = {}
+        for item in products:
+            current[product_key(item)] = item
+
+        upserts, touches, resized, changes = [], [], [], []
+        for pid, item in current.items():
+            fp = fingerprint(item)
+            previous = known.get(pid)
+
+            alive = previous is not None and previous[1] is None
+            if alive and previous[0] == fp:
+                if previous[2] == item.get("image_url"):
+                    touches.append((now, store, pid))
+                else:
+                    # Misma imagen en otro tamaño: se guarda la URL nueva sin registrar un cambio.
+                    data = json.dumps(item, ensure_ascii=False, default=str)
+                    resized.append((item.get("image_url"), data, now, store, pid))
+                continue
+
+            kind = "changed" if alive else "new"
+            data = json.dumps(item, ensure_ascii=False, default=str)
+            upserts.append((
+                store, pid, item.get("name"), _text(item.get("price")), _text(item.get("stock")),
+                item.get("image_url"), item.get("url"), data, fp, now, now, now,
+            ))
+            changes.append((store, pid, kind, now, data))
+
+        removed = []
+        if mark_removed and current:
+            removed = [pid for pid, (_, removed_at, _) in known.items()
+                       if removed_at is None and pid not in current]
+
+        with self.conn:
+            for batch in _chunks(upserts):
+                self.conn.executemany(UPSERT_SQL, batch)
+            for batch in _chunks(touches):
+                self.conn.executemany(
+                    "UPDATE products SET last_seen = ? WHERE store = ? AND product_id = ?", batch
+                )
+            for batch in _chunks(resized):
+                self.conn.executemany(
+                    "UPDATE products SET image_url = ?, data = ?, last_seen = ? WHERE store = ? AND product_id = ?",
+                    batch,
+                )
+            for batch in _chunks(removed):
+                self.conn.executemany(
+                    "UPDATE products SET removed_at = ?, updated_at = ? WHERE store = ? AND product_id = ?",
+                    [(now, now, store, pid) for pid in batch],
+                )
+                changes.extend((store, pid, "removed", now, None) for pid in batch)
+            for batch in _chunks(changes):
+                self.conn.executemany(
+                    "INSERT INTO changes (store, product_id, kind, observed_at, data) VALUES (?, ?, ?, ?, ?)",
+                    batch,
+                )
+
+        new_count = sum(1 for c in changes if c[2] == "new")
+        return {
+            "new": new_count,
+            "changed": len(upserts) - new_count,
+            "removed": len(removed),
+            "unchanged": len(touches) + len(resized),
+        }
+
+    def changes_since(self, since, store=None):
+        """
+        Lista los cambios (new / changed / removed) registrados desde `since` (epoch).
+        """
+        sql = "SELECT store, product_id, kind, observed_at, data FROM changes WHERE observed_at > ?"
+        params = [since]
+        if store:
+            sql += " AND store = ?"
+            params.append(store)
+        sql += " ORDER BY id"
+
+        result = []
+        for row in self.conn.execute(sql, params):
+            result.append({
+                "store": row["store"],
+                "product_id": row["product_id"],
+                "kind": row["kind"],
+                "observed_at": row["observed_at"],
+                "product": json.loads(row["data"]) if row["data"] else None,
+            })
+        return result
+
+    def current(self, store=None):
+        """
+        Devuelve el catálogo vigente (productos no eliminados).
+        """
+        sql = "SELECT data, last_seen FROM products WHERE removed_at IS NULL"
+        params = []
+        if store:
+            sql += " AND store = ?"
+            params.append(store)
+        return [dict(json.loads(row["data"]), last_seen=row["last_seen"])
+                for row in self.conn.execute(sql, params)]
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén incremental de productos (SQLite).")
+    parser.add_argument("--db", default="productos.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Carga un *_laptops.json en el almacén.")
+    ingest.add_argument("store")
+    ingest.add_argument("json_file")
+
+    changes = sub.add_parser("changes", help="Muestra los cambios desde una fecha.")
+    changes.add_argument("--since", required=True)
+    changes.add_argument("--store")
+
+    args = parser.parse_args()
+
+    with ProductStore(args.db) as db:
+        if args.command == "ingest":
+            with open(args.json_file, encoding='utf-8') as f:
+                products = json.load(f)
+            summary = db.sync(args.store, products)
+            print(f"{args.store}: {summary['new']} nuevos, {summary['changed']} cambiados, "
+                  f"{summary['removed']} eliminados, {summary['unchanged']} sin cambios.")
+        else:
+            rows = db.changes_since(parse_since(args.since), args.store)
+            print(json.dumps(rows, indent=4, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from core import plugins, retry
+from core.output import save_products
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    job          TEXT NOT NULL,
+    store        TEXT NOT NULL,
+    url          TEXT NOT NULL,
+    args         TEXT,
+    priority     REAL NOT NULL DEFAULT 0,
+    status       TEXT NOT NULL DEFAULT 'pending',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    worker       TEXT,
+    lease_until  REAL,
+    heartbeat_at REAL,
+    started_at   REAL,
+    created_at   REAL,
+    finished_at  REAL,
+    products     INTEGER,
+    result       TEXT,
+    error        TEXT,
+    UNIQUE (job, store, url)
+);
+CREATE INDEX IF NOT EXISTS idx_units_lease ON units (job, status, priority);
+"""
+
+
+class WorkQueue:
+    """
+    Cola de unidades (tienda, url) compartida entre varias instancias.
+    Cada unidad se toma con un lease que el worker renueva con heartbeats; si el worker
+    muere, el lease vence y otra instancia la retoma. Un backend en red (Redis, Firestore,
+    Cloud Tasks...) solo tiene que implementar estos métodos.
+    """
+
+    def enqueue(self, job, units, priority=0):
+        """
+        units: lista de (store, url) o (store, url, args). Las repetidas en el mismo job se ignoran.
+        """
+        raise NotImplementedError
+
+    def lease(self, job, worker, n=1, ttl=LEASE_SECONDS, exclude=()):
+        raise NotImplementedError
+
+    def heartbeat(self, unit_id, worker, ttl=LEASE_SECONDS):
+        """
+        Extiende el lease. Devuelve False si el worker ya no es dueño de la unidad.
+        """
+        raise NotImplementedError
+
+    def complete(self, unit_id, worker, products):
+        raise NotImplementedError
+
+    def fail(self, unit_id, worker, error, retryable=True):
+        raise NotImplementedError
+
+    def release(self, unit_id, worker):
+        """
+        Devuelve la unidad a la cola sin contar el intento (ej. circuito abierto en este worker).
+        """
+        raise NotImplementedError
+
+    def status(self, job):
+        raise NotImplementedError
+
+    def completed(self, job):
+        """
+        Unidades terminadas con su resultado y duración (para core.scheduler).
+        """
+        raise NotImplementedError
+
+    def results(self, job):
+        """
+        Productos de las unidades terminadas, agrupados por tienda y en orden de encolado.
+        """
+        raise NotImplementedError
+
+    def incomplete_stores(self, job):
+        """
+        Tiendas del job con alguna unidad sin terminar (pendiente, tomada o fallida).
+        Para esas tiendas collect no marca productos eliminados.
+        """
+        raise NotImplementedError
+
+
+class SQLiteQueue(WorkQueue):
+    """
+    Backend de referencia sobre un archivo SQLite (varios procesos en la misma máquina
+    o un volumen compartido). El lease se toma dentro de BEGIN IMMEDIATE, así dos
+    workers nunca reciben la misma unidad.
+    """
+
+    def __init__(self, path="cola.db", max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, sql_fn):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = sql_fn(self.conn)
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, job, units, priority=0):
+        now = time.time()
+        rows = []
+        for unit in units:
+            store, url = unit[0], unit[1]
+            args = list(unit[2]) if len(unit) > 2 else []
+            rows.append((job, store, url, json.dumps(args), priority, now))
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO units (job, store, url, args, priority, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def lease(self, job, worker, n=1, ttl=LEASE_SECONDS, exclude=()):
+        now = time.time()
+
+        def take(conn):
+            # Leases vencidos que ya agotaron sus intentos no vuelven a la cola.
+            conn.execute(
+                "UPDATE units SET status = ?, error = 'lease vencido', finished_at = ? "
+                "WHERE job = ? AND status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, now, job, LEASED, now, self.max_attempts),
+            )
+            sql = ("SELECT id FROM units WHERE job = ? AND (status = ? OR (status = ? AND lease_until < ?))")
+            params = [job, PENDING, LEASED, now]
+            if exclude:
+                sql += f" AND store NOT IN ({', '.join('?' * len(exclude))})"
+                params.extend(exclude)
+            sql += " ORDER BY priority DESC, id LIMIT ?"
+            params.append(n)
+            ids = [row["id"] for row in conn.execute(sql, params)]
+            if not ids:
+                return []
+
+            marks = ", ".join("?" * len(ids))
+            conn.execute(
+                f"UPDATE units SET status = ?, worker = ?, lease_until = ?, heartbeat_at = ?, started_at = ?, "
+                f"attempts = attempts + 1 WHERE id IN ({marks})",
+                [LEASED, worker, now + ttl, now, now] + ids,
+            )
+            rows = conn.execute(
+                f"SELECT id, job, store, url, args, attempts FROM units WHERE id IN ({marks}) ORDER BY priority DESC, id",
+                ids,
+            )
+            return [dict(row, args=json.loads(row["args"] or "[]")) for row in rows]
+
+        return self._transaction(take)
+
+    def _owned_update(self, sql, params, unit_id, worker):
+        def update(conn):
+            cursor = conn.execute(sql + " WHERE id = ? AND worker = ? AND status = ?", params + [unit_id, worker, LEASED])
+            return cursor.rowcount == 1
+
+        return self._transaction(update)
+
+    def heartbeat(self, unit_id, worker, ttl=LEASE_SECONDS):
+        now = time.time()
+        return self._owned_update("UPDATE units SET lease_until = ?, heartbeat_at = ?", [now + ttl, now], unit_id, worker)
+
+    def complete(self, unit_id, worker, products):
+        data = json.dumps(products, ensure_ascii=False, default=str)
+        return self._owned_update(
+            "UPDATE units SET status = ?, finished_at = ?, products = ?, result = ?, error = NULL",
+            [DONE, time.time(), len(products), data], unit_id, worker,
+        )
+
+    def fail(self, unit_id, worker, error, retryable=True):
+        def update(conn):
+            row = conn.execute(
+                "SELECT attempts FROM units WHERE id = ? AND worker = ? AND status = ?", (unit_id, worker, LEASED)
+            ).fetchone()
+            if row is None:
+                return False
+            final = not retryable or row["attempts"] >= self.max_attempts
+            conn.execute(
+                "UPDATE units SET status = ?, error = ?, lease_until = NULL, finished_at = ? WHERE id = ?",
+                (FAILED if final else PENDING, str(error)[:500], time.time() if final else None, unit_id),
+            )
+            return True
+
+        return self._transaction(update)
+
+    def release(self, unit_id, worker):
+        return self._owned_update(
+            "UPDATE units SET status = ?, lease_until = NULL, attempts = MAX(attempts - 1, 0)", [PENDING], unit_id, worker,
+        )
+
+    def status(self, job):
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM units WHERE job = ? GROUP BY status", (job,)):
+            counts[row["status"]] = row["n"]
+        products = self.conn.execute(
+            "SELECT COALESCE(SUM(products), 0) FROM units WHERE job = ? AND status = ?", (job, DONE)
+        ).fetchone()[0]
+        return dict(counts, products=products)
+
+    def completed(self, job):
+        rows = self.conn.execute(
+            "SELECT store, url, args, started_at, finished_at, result FROM units WHERE job = ? AND status = ? "
+            "ORDER BY id",
+            (job, DONE),
+        )
+        return [{
+            "store": row["store"],
+            "url": row["url"],
+            "args": json.loads(row["args"] or "[]"),
+            "finished_at": row["finished_at"],
+            "duration_s": (row["finished_at"] - row["started_at"]) if row["started_at"] else None,
+            "products": json.loads(row["result"] or "[]"),
+        } for row in rows]
+
+    def incomplete_stores(self, job):
+        return {row["store"] for row in self.conn.execute(
+            "SELECT DISTINCT store FROM units WHERE job = ? AND status != ?", (job, DONE)
+        )}
+
+    def results(self, job):
+        grouped = {}
+        for row in self.conn.execute(
+            "SELECT store, result FROM units WHERE job = ? AND status = ? ORDER BY id", (job, DONE)
+        ):
+            grouped.setdefault(row["store"], []).extend(json.loads(row["result"] or "[]"))
+        return grouped
+
+
+class _Heartbeat:
+    """
+    Renueva el lease de una unidad en un hilo mientras el worker la procesa.
+    """
+
+    def __init__(self, queue, unit_id, worker, ttl):
+        self.queue = queue
+        self.unit_id = unit_id
+        self.worker = worker
+        self.ttl = ttl
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.ttl / 3):
+            if not self.queue.heartbeat(self.unit_id, self.worker, self.ttl):
+                print(f"   -> Lease perdido para la unidad {self.unit_id}.")
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def work(queue, job, worker=None, ttl=LEASE_SECONDS, max_units=None):
+    """
+    Toma unidades del job hasta vaciar la cola: un driver por tienda (el de su scraper),
+    cada página con core.retry y el lease renovado por heartbeats.
+    """
+    worker = worker or default_worker_id()
+    drivers = {}
+    blocked = set()
+    done = 0
+
+    def restart(store):
+        try:
+            drivers[store].quit()
+        except Exception:
+            pass
+        drivers[store] = plugins.get(store).setup_driver()
+
+    try:
+        while max_units is None or done < max_units:
+            units = queue.lease(job, worker, n=1, ttl=ttl, exclude=sorted(blocked))
+            if not units:
+                break
+            unit = units[0]
+            store = unit["store"]
+            print(f"[{worker}] Unidad {unit['id']} ({store}, intento {unit['attempts']}): {unit['url']}")
+
+            plugin = plugins.get(store)
+            # Un solo navegador a la vez por worker: al cambiar de tienda se cierra el anterior.
+            for other in [s for s in drivers if s != store]:
+                drivers.pop(other).quit()
+            if store not in drivers:
+                drivers[store] = plugin.setup_driver()
+
+            with _Heartbeat(queue, unit["id"], worker, ttl):
+                try:
+                    products = retry.call(
+                        store, lambda: plugin.scrape(drivers[store], unit["url"], *unit["args"]),
+                        policy=plugin.policy, recover=lambda: restart(store),
+                    )
+                except retry.EmptyPage:
+                    # Incluye PageNotFound: una página pasado el final del listado se completa vacía.
+                    products = []
+                except retry.CircuitOpen:
+                    print(f"   -> Circuito abierto para {store}: se devuelve la unidad y se omite la tienda.")
+                    queue.release(unit["id"], worker)
+                    blocked.add(store)
+                    continue
+                except Exception as e:
+                    print(f"   -> Falla: {e}")
+                    queue.fail(unit["id"], worker, e)
+                    if retry.classify(e) == retry.BLOCK:
+                        blocked.add(store)
+                    continue
+
+            if queue.complete(unit["id"], worker, products):
+                print(f"   -> {len(products)} productos.")
+            else:
+                print("   -> El lease venció antes de terminar; se descarta el resultado.")
+            done += 1
+    finally:
+        for driver in drivers.values():
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cola de trabajo compartida (tienda, url) con leases.")
+    parser.add_argument("--db", default=os.environ.get("SCRAPER_QUEUE", "cola.db"))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="Encola URLs de una tienda ({page} se expande con --pages); "
+                                             "sin URLs, encola las unidades de su plugin.")
+    enqueue.add_argument("job")
+    enqueue.add_argument("store", choices=plugins.names())
+    enqueue.add_argument("urls", nargs="*")
+    enqueue.add_argument("--pages", type=int, default=1)
+    enqueue.add_argument("--priority", type=float, default=0)
+
+    worker = sub.add_parser("work", help="Procesa unidades hasta vaciar la cola.")
+    worker.add_argument("job")
+    worker.add_argument("--worker-id")
+    worker.add_argument("--ttl", type=int, default=LEASE_SECONDS)
+    worker.add_argument("--max-units", type=int)
+
+    status = sub.add_parser("status")
+    status.add_argument("job")
+
+    collect = sub.add_parser("collect", help="Guarda los productos del job por tienda (core.output).")
+    collect.add_argument("job")
+
+    args = parser.parse_args()
+
+    with SQLiteQueue(args.db) as queue:
+        if args.command == "enqueue":
+            units = [(args.store, unit[0], unit[1:]) for unit in plugins.get(args.store).units()] if not args.urls else []
+            for url in args.urls:
+                if "{page}" in url:
+                    units.extend((args.store, url.format(page=page)) for page in range(1, args.pages + 1))
+                else:
+                    units.append((args.store, url))
+            added = queue.enqueue(args.job, units, priority=args.priority)
+            print(f"{added} unidades nuevas en {args.job} ({len(units) - added} ya estaban).")
+        elif args.command == "work":
+            done = work(queue, args.job, args.worker_id, args.ttl, args.max_units)
+            print(f"Unidades completadas: {done}")
+        elif args.command == "status":
+            print(json.dumps(queue.status(args.job), indent=4))
+        else:
+            incomplete = queue.incomplete_stores(args.job)
+            for store, products in queue.results(args.job).items():
+                output_file = f"{store}_{args.job}.json"
+                save_products(store, products, output_file, complete=store not in incomplete)
+                print(f"{store}: {len(products)} productos -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()
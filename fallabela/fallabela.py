@@ -1,5 +1,6 @@
 import time
-import json
+import os
+import sys
 import random
 import re
 from selenium import webdriver
@@ -13,6 +14,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, fanout, memory, metrics, pagination, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = "[data-testid='ssr-pod']"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -25,8 +33,13 @@ def setup_driver():
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
     chrome_options.add_argument("--log-level=3") 
     
+    profile, profile_args = profiles.chrome_arguments("falabella")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("falabella")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     return driver
 
 def scroll_falabella(driver):
@@ -35,22 +48,7 @@ def scroll_falabella(driver):
     Baja poco a poco para asegurar que las imágenes 'lazy' se rendericen.
     """
     print("   -> Bajando para cargar imágenes...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    
-
-    step = 400
-    for pos in range(0, last_height, step):
-        driver.execute_script(f"window.scrollTo(0, {pos});")
-
-        time.sleep(0.15)
-        
-
-        if pos % 2000 == 0:
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            
-
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1.5)
+    scrolling.scroll("falabella", driver)
 
 def extract_page_data(html_content):
     """
@@ -134,55 +132,107 @@ def extract_page_data(html_content):
         
     return page_products
 
+def scrape_page(driver, url):
+    """
+    Carga una página del listado, espera los productos, hace scroll y extrae.
+    """
+    with metrics.timer("falabella", "load"):
+        driver.get(url)
+
+    try:
+        with metrics.timer("falabella", "wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+            )
+    except TimeoutException:
+        metrics.count("timeouts", "falabella")
+        print("   -> Alerta: Tiempo de espera agotado (posiblemente página vacía o bloqueo).")
+
+    blocks.check("falabella", driver)
+
+    with metrics.timer("falabella", "scroll"):
+        scroll_falabella(driver)
+
+    with metrics.timer("falabella", "parse"):
+        products = extract_page_data(driver.page_source)
+    metrics.record_page("falabella", len(products))
+    memory.check("falabella", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+TOTAL_PAGES = 10  # tope mientras no se detecte la paginación real
+
+
+def page_url(page):
+    return sites.base_url("falabella") + f"/falabella-pe/category/cat40712/Laptops?page={page}"
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): una por página hasta el tope.
+    """
+    return [(page_url(page),) for page in range(1, TOTAL_PAGES + 1)]
+
+
 def main():
-    base_url = "https://www.falabella.com.pe/falabella-pe/category/cat40712/Laptops"
-    total_pages = 10 
+    n_workers = fanout.workers("falabella")
     
-    all_products = []
+    run = Run("falabella")
     driver = None
 
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = setup_driver()
+
     try:
         print("--- Iniciando Scraping Falabella (10 Páginas) ---")
         driver = setup_driver()
 
-        for page in range(1, total_pages + 1):
-            target_url = f"{base_url}?page={page}"
-            print(f"\nProcesando Página {page}/{total_pages}: {target_url}")
+        pager = pagination.Paginator("falabella", page_url, max_pages=TOTAL_PAGES)
+        for page, target_url in pager:
+            print(f"\nProcesando Página {pager.label()}: {target_url}")
             
             try:
-                driver.get(target_url)
-                
-
-                try:
-                    WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='ssr-pod']"))
-                    )
-                except TimeoutException:
-                    print("   -> Alerta: Tiempo de espera agotado (posiblemente página vacía o bloqueo).")
-                
-
-                scroll_falabella(driver)
-                
-
-                current_products = extract_page_data(driver.page_source)
+                current_products = retry.call("falabella", lambda: scrape_page(driver, target_url), recover=restart_driver)
                 print(f"   -> Encontrados: {len(current_products)} productos.")
+                if not pager.accept(current_products, driver):
+                    break
                 
-                all_products.extend(current_products)
+                run.add(current_products)
+                if n_workers > 1 and pager.last_page:
+                    handed, driver = driver, None
+                    fanout.run_pages("falabella", pager, scrape_page, setup_driver, n_workers, run, driver=handed)
+                    break
                 
 
                 sleep_time = random.uniform(2, 5)
                 print(f"   -> Pausa de seguridad de {sleep_time:.2f}s...")
                 time.sleep(sleep_time)
 
+            except retry.EmptyPage:
+                print("   -> Página sin productos: fin de la paginación.")
+                break
+            except (retry.PageBlocked, retry.CircuitOpen) as e:
+                print(f"   -> Tienda bloqueada ({e}). Se detiene el scraping.")
+                run.fail(e)
+                break
             except Exception as e:
                 print(f"   -> Error en página {page}: {e}")
+                run.fail(e)
 
 
         output_file = 'falabella_laptops_10paginas.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN: Se extrajeron {len(all_products)} productos en total.")
+        print(f"\nRESUMEN: Se extrajeron {len(run.products)} productos en total.")
         print(f"Archivo guardado: {output_file}")
 
     except Exception as e:
@@ -1,5 +1,4 @@
-import time
-import json
+import os
 import sys
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -12,6 +11,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, fanout, images, memory, metrics, pagination, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = ".product-items"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -24,8 +30,13 @@ def setup_driver():
 
     chrome_options.add_argument("--log-level=3")
     
+    profile, profile_args = profiles.chrome_arguments("hp")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("hp")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     return driver
 
 def scroll_para_imagenes(driver):
@@ -35,16 +46,7 @@ def scroll_para_imagenes(driver):
     No necesitamos buscar botones, solo asegurarnos de que las imágenes carguen.
     """
     print("   -> Cargando imágenes (scroll)...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    
-
-    for pos in range(0, last_height, 500):
-        driver.execute_script(f"window.scrollTo(0, {pos});")
-        time.sleep(0.1)
-    
-
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(2) 
+    scrolling.scroll("hp", driver)
 
 def extract_page_data(html_content):
     
@@ -78,20 +80,7 @@ def extract_page_data(html_content):
 
 
         img_tag = card.select_one('img.product-image-photo')
-        image_url = "No imagen"
-        
-        if img_tag:
-            src = img_tag.get('src')
-
-            if src and "placeholder" not in src and "lazy" not in src:
-                image_url = src
-
-            elif img_tag.get('data-src'):
-                image_url = img_tag.get('data-src')
-            elif img_tag.get('data-original'):
-                image_url = img_tag.get('data-original')
-                
-        item['image_url'] = image_url
+        item['image_url'] = images.best_image_url(img_tag, "hp", card)
         
 
         item['url'] = name_tag.get('href')
@@ -100,50 +89,108 @@ def extract_page_data(html_content):
         
     return page_products
 
+def scrape_page(driver, url):
+    """
+    Carga una página del listado, espera los productos y extrae; el scroll solo se hace
+    si a algún producto le falta la imagen en el markup (core.images).
+    """
+    with metrics.timer("hp", "load"):
+        driver.get(url)
+
+    with metrics.timer("hp", "wait"):
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+        )
+
+    blocks.check("hp", driver)
+
+    # Primero sin scroll: si el markup ya trae la imagen de todos los productos, alcanza con cargar y parsear.
+    with metrics.timer("hp", "parse"):
+        products = extract_page_data(driver.page_source)
+
+    if not images.covered("hp", products):
+        with metrics.timer("hp", "scroll"):
+            scroll_para_imagenes(driver)
+        with metrics.timer("hp", "parse"):
+            products = extract_page_data(driver.page_source)
+    metrics.record_page("hp", len(products))
+    memory.check("hp", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+TOTAL_PAGES = 4  # tope mientras no se detecte la paginación real
+
+
+def page_url(page):
+    return sites.base_url("hp") + f"/pe-es/shop/laptops.html?p={page}"
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): una por página hasta el tope.
+    """
+    return [(page_url(page),) for page in range(1, TOTAL_PAGES + 1)]
+
+
 def main():
 
-    base_url = "https://www.hp.com/pe-es/shop/laptops.html"
-    total_pages = 4 
+    n_workers = fanout.workers("hp")
     
-    all_products = []
+    run = Run("hp")
     driver = None
 
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = setup_driver()
+
     try:
         print("--- Iniciando Scraping HP (Multi-página) ---")
         driver = setup_driver()
 
-        for page in range(1, total_pages + 1):
-            target_url = f"{base_url}?p={page}"
-            print(f"\nProcesando Página {page}/{total_pages}: {target_url}")
+        pager = pagination.Paginator("hp", page_url, max_pages=TOTAL_PAGES)
+        for page, target_url in pager:
+            print(f"\nProcesando Página {pager.label()}: {target_url}")
             
             try:
-                driver.get(target_url)
-                
-
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".product-items"))
-                )
-                
-
-                scroll_para_imagenes(driver)
-                
-
-                current_products = extract_page_data(driver.page_source)
+                current_products = retry.call("hp", lambda: scrape_page(driver, target_url), recover=restart_driver)
                 print(f"   -> Encontrados: {len(current_products)} productos.")
+                if not pager.accept(current_products, driver):
+                    break
                 
-                all_products.extend(current_products)
+                run.add(current_products)
+                if n_workers > 1 and pager.last_page:
+                    handed, driver = driver, None
+                    fanout.run_pages("hp", pager, scrape_page, setup_driver, n_workers, run, driver=handed)
+                    break
                 
+            except retry.EmptyPage:
+                print("   -> Página sin productos: fin de la paginación.")
+                break
+            except (retry.PageBlocked, retry.CircuitOpen) as e:
+                print(f"   -> Tienda bloqueada ({e}). Se detiene el scraping.")
+                run.fail(e)
+                break
             except TimeoutException:
+                metrics.count("timeouts", "hp")
                 print(f"   -> Error: Tiempo de espera agotado en página {page}.")
+                run.fail(f"timeout en página {page}")
             except Exception as e:
                 print(f"   -> Error inesperado en página {page}: {e}")
+                run.fail(e)
 
 
         output_file = 'hp_laptops_completo.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN FINAL: Se extrajeron {len(all_products)} productos en total.")
+        print(f"\nRESUMEN FINAL: Se extrajeron {len(run.products)} productos en total.")
         print(f"Datos guardados en: {output_file}")
 
     except Exception as e:
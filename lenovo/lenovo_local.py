@@ -1,9 +1,7 @@
 import time
-import json
 import re
 import os
-import shutil
-import tempfile
+import sys
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -15,6 +13,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, images, memory, metrics, profiles, retry, sites
+from core.output import save_products
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = ".product_list"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -24,8 +29,13 @@ def setup_driver():
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
     
+    profile, profile_args = profiles.chrome_arguments("lenovo")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("lenovo")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     return driver
 
 def scroll_inteligente(driver):
@@ -107,59 +117,80 @@ def extract_data(html_content):
 
 
         img_tag = card.select_one('.product_img img') or card.select_one('img')
-        
-        image_url = "No imagen"
-        if img_tag:
+        item['image_url'] = images.best_image_url(img_tag, "lenovo", card)
 
-            src = img_tag.get('src')
+        products_data.append(item)
 
-            data_src = img_tag.get('data-src') or img_tag.get('data-lazy')
-            
+    return products_data
 
-            if src and "data:image" not in src and "base64" not in src:
-                image_url = src
-            elif data_src:
-                image_url = data_src
-            
+def scrape_page(driver, url):
+    """
+    Carga el listado, espera la lista inicial, hace scroll y extrae.
+    """
+    with metrics.timer("lenovo", "load"):
+        driver.get(url)
 
-            if image_url and image_url.startswith("//"):
-                image_url = "https:" + image_url
-                
-        item['image_url'] = image_url
+    try:
+        with metrics.timer("lenovo", "wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+            )
+    except TimeoutException:
+        metrics.count("timeouts", "lenovo")
+        print("Alerta: No se detectó la lista inicial de productos.")
 
-        products_data.append(item)
+    blocks.check("lenovo", driver)
+
+    with metrics.timer("lenovo", "scroll"):
+        scroll_inteligente(driver)
+
+    print("Procesando datos...")
+    with metrics.timer("lenovo", "parse"):
+        products = extract_data(driver.page_source)
+    metrics.record_page("lenovo", len(products))
+    memory.check("lenovo", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): el listado completo de ofertas.
+    """
+    return [(sites.base_url("lenovo") + "/pe/es/d/ofertas/intel/",)]
 
-    return products_data
 
 def main():
-    url = "https://www.lenovo.com/pe/es/d/ofertas/intel/"
+    url, = listing_units()[0]
     
     driver = None
+
+    def restart_driver():
+        nonlocal driver
+        print("Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = setup_driver()
+
     try:
         print("Iniciando navegador...")
         driver = setup_driver()
         
         print(f"Navegando a: {url}")
-        driver.get(url)
-        
+        complete = True
         try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "product_list"))
-            )
-        except TimeoutException:
-            print("Alerta: No se detectó la lista inicial de productos.")
-
-        scroll_inteligente(driver)
-        
-        print("Obteniendo código fuente final...")
-        page_source = driver.page_source
-        
-        print("Procesando datos...")
-        data = extract_data(page_source)
+            data = retry.call("lenovo", lambda: scrape_page(driver, url), recover=restart_driver)
+        except retry.ScrapeError as e:
+            print(f"No se pudo extraer el listado ({e}).")
+            data = []
+            complete = False
         
         output_file = 'lenovo_completo.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        save_products("lenovo", data, output_file, complete=complete)
             
         print(f"GUARDADO: {len(data)} productos en {output_file}")
         
@@ -1,13 +1,18 @@
 
 import time
 import re
+import os
+import sys
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-URL = "https://www.lenovo.com/pe/es/d/ofertas/intel/"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, images, metrics, sites
+
+URL = sites.base_url("lenovo") + "/pe/es/d/ofertas/intel/"
 
 def scroll_inteligente(driver):
     
@@ -58,18 +63,23 @@ def scroll_inteligente(driver):
 def scrape(driver):
     
     print(f"--- Scrapeando LENOVO ({URL}) ---")
-    driver.get(URL)
+    with metrics.timer("lenovo", "load"):
+        driver.get(URL)
     
 
     try:
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "product_list"))
-        )
+        with metrics.timer("lenovo", "wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "product_list"))
+            )
     except TimeoutException:
+        metrics.count("timeouts", "lenovo")
         print("   [Alerta] No se detectó la lista inicial (Timeout). Continuando...")
 
+    blocks.check("lenovo", driver)
 
-    scroll_inteligente(driver)
+    with metrics.timer("lenovo", "scroll"):
+        scroll_inteligente(driver)
 
     print("   [Lenovo] Procesando HTML final...")
     soup = BeautifulSoup(driver.page_source, 'html.parser')
@@ -100,19 +110,7 @@ def scrape(driver):
 
 
             img_tag = item.select_one('.product_img img') or item.select_one('img')
-            image_url = None
-            
-            if img_tag:
-                src = img_tag.get('src')
-                data_src = img_tag.get('data-src') or img_tag.get('data-lazy')
-                
-                if src and "data:image" not in src and "base64" not in src:
-                    image_url = src
-                elif data_src:
-                    image_url = data_src
-                
-                if image_url and image_url.startswith("//"):
-                    image_url = "https:" + image_url
+            image_url = images.best_image_url(img_tag, "lenovo", item, default=None)
 
 
             pid = item.get("data-product-code") or re.sub(r'\W+', '', name)[:20].upper()
@@ -129,4 +127,5 @@ def scrape(driver):
                 })
         except: continue
             
+    metrics.record_page("lenovo", len(products))
     return products
\ No newline at end of file
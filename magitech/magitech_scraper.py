@@ -1,18 +1,25 @@
 import time
-import json
+import os
+import sys
 import random
 import re
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, fanout, loading, memory, metrics, pagination, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = "li.item"
+
+# Magitech a veces entrega la página sin productos: una página vacía se reintenta.
+RETRY_POLICY = retry.RetryPolicy(attempts={retry.EMPTY: 3}, base_delay=5)
+
 def setup_driver():
     
     chrome_options = Options()
@@ -29,8 +36,13 @@ def setup_driver():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
+    profile, profile_args = profiles.chrome_arguments("magitech")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("magitech")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     
 
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -43,15 +55,7 @@ def scroll_magitech(driver):
     Baja más lento para simular comportamiento humano.
     """
     print("   -> Bajando para cargar elementos...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    step = 400
-    
-    for pos in range(0, last_height, step):
-        driver.execute_script(f"window.scrollTo(0, {pos});")
-        time.sleep(0.2) 
-        
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1.5)
+    scrolling.scroll("magitech", driver)
 
 def extract_page_data(html_content):
     """
@@ -129,77 +133,103 @@ def extract_page_data(html_content):
         
     return page_products
 
+def scrape_page(driver, url):
+    """
+    Carga una página del listado, espera los productos, hace scroll y extrae.
+    La carga no espera el load completo: apenas está la grilla (li.item) se corta con
+    window.stop() y se extrae, con un tope duro de navegación (core.loading).
+    Magitech a veces entrega la página sin productos: se lanza EmptyPage para reintentar.
+    """
+    with metrics.timer("magitech", "load"):
+        ready = loading.load("magitech", driver, url, READY_SELECTOR)
+
+    if not ready:
+        metrics.count("timeouts", "magitech")
+        print("   -> Alerta: La grilla no apareció dentro del tope de carga. Verificando si es un error 404 o carga lenta...")
+
+    blocks.check("magitech", driver)
+
+    with metrics.timer("magitech", "scroll"):
+        scroll_magitech(driver)
+
+    with metrics.timer("magitech", "parse"):
+        products = extract_page_data(driver.page_source)
+    metrics.record_page("magitech", len(products))
+    memory.check("magitech", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos, posible fallo de carga")
+    return products
+
+
+TOTAL_PAGES = 3  # tope mientras no se detecte la paginación real
+
+
+def page_url(page):
+    return sites.base_url("magitech") + f"/laptops.html?p={page}"
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): una por página hasta el tope.
+    """
+    return [(page_url(page),) for page in range(1, TOTAL_PAGES + 1)]
+
+
 def main():
-    base_url = "https://www.magitech.pe/laptops.html"
-    total_pages = 3 
-    all_products = []
+    n_workers = fanout.workers("magitech")
+    run = Run("magitech")
     driver = None
 
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = setup_driver()
+
     try:
         print("--- Iniciando Scraping Magitech (10 Páginas - Modo Robusto) ---")
         driver = setup_driver()
 
-        for page in range(1, total_pages + 1):
-            target_url = f"{base_url}?p={page}"
-            
-
-            max_retries = 3
-            success = False
-            
-            for attempt in range(max_retries):
-                print(f"\nProcesando Página {page}/{total_pages} (Intento {attempt + 1}): {target_url}")
-                
-                try:
-                    driver.get(target_url)
-                    
-
-                    try:
-                        WebDriverWait(driver, 30).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "li.item"))
-                        )
-                    except TimeoutException:
-                        print("   -> Alerta: Tiempo de espera agotado. Verificando si es un error 404 o carga lenta...")
-
-                        if "404" in driver.title:
-                             print("   -> Error 404 detectado. Página no existe.")
-
-                             break 
-                    
-
-                    scroll_magitech(driver)
-                    
-
-                    current_products = extract_page_data(driver.page_source)
-                    count = len(current_products)
-                    print(f"   -> Encontrados: {count} productos.")
-                    
-                    if count > 0:
-                        all_products.extend(current_products)
-                        success = True
-
-                        time.sleep(random.uniform(3, 6)) 
-                        break 
-                    else:
-                        print("   -> 0 productos encontrados. Posible fallo de carga.")
-                        if attempt < max_retries - 1:
-                            wait_time = random.uniform(8, 12)
-                            print(f"   -> Esperando {wait_time:.1f}s antes de reintentar...")
-                            time.sleep(wait_time)
-                            driver.refresh() 
-                
-                except Exception as e:
-                    print(f"   -> Error en intento {attempt + 1}: {e}")
-                    time.sleep(5)
-
-            if not success:
-                print(f"   -> ADVERTENCIA: No se pudo extraer la página {page} después de {max_retries} intentos.")
+        pager = pagination.Paginator("magitech", page_url, max_pages=TOTAL_PAGES)
+        for page, target_url in pager:
+            print(f"\nProcesando Página {pager.label()}: {target_url}")
+
+            try:
+                current_products = retry.call(
+                    "magitech", lambda: scrape_page(driver, target_url), policy=RETRY_POLICY, recover=restart_driver
+                )
+                print(f"   -> Encontrados: {len(current_products)} productos.")
+                if not pager.accept(current_products, driver):
+                    break
+                run.add(current_products)
+                if n_workers > 1 and pager.last_page:
+                    handed, driver = driver, None
+                    fanout.run_pages("magitech", pager, scrape_page, setup_driver, n_workers, run,
+                                     policy=RETRY_POLICY, driver=handed)
+                    break
+
+                time.sleep(random.uniform(3, 6))
+
+            except retry.PageNotFound:
+                print("   -> Error 404 detectado. Página no existe.")
+                break
+            except (retry.PageBlocked, retry.CircuitOpen) as e:
+                print(f"   -> Tienda bloqueada ({e}). Se detiene el scraping.")
+                run.fail(e)
+                break
+            except Exception as e:
+                print(f"   -> ADVERTENCIA: No se pudo extraer la página {page}: {e}")
+                run.fail(e)
 
 
         output_file = 'magitech_laptops.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN: Se extrajeron {len(all_products)} productos en total.")
+        print(f"\nRESUMEN: Se extrajeron {len(run.products)} productos en total.")
         print(f"Archivo guardado: {output_file}")
 
     except Exception as e:
@@ -209,4 +239,4 @@ def main():
             driver.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,5 +1,6 @@
 import time
-import json
+import os
+import sys
 import random
 import re
 from selenium import webdriver
@@ -13,6 +14,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, fanout, memory, metrics, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = ".content"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -23,8 +31,13 @@ def setup_driver():
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
     chrome_options.add_argument("--log-level=3")
     
+    profile, profile_args = profiles.chrome_arguments("memorykings")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("memorykings")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     return driver
 
 def scroll_memorykings(driver):
@@ -32,15 +45,7 @@ def scroll_memorykings(driver):
     Scroll para asegurar que las imágenes 'lazy' de Memory Kings se carguen.
     """
     print("   -> Bajando para cargar catálogo...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    step = 400
-    
-    for pos in range(0, last_height, step):
-        driver.execute_script(f"window.scrollTo(0, {pos});")
-        time.sleep(0.1)
-        
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1.5)
+    scrolling.scroll("memorykings", driver)
 
 def extract_category_data(html_content):
     """
@@ -128,60 +133,112 @@ def extract_category_data(html_content):
         
     return page_products
 
+def scrape_page(driver, url):
+    """
+    Carga una categoría, espera los productos, hace scroll y extrae.
+    """
+    with metrics.timer("memorykings", "load"):
+        driver.get(url)
+
+    try:
+        with metrics.timer("memorykings", "wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+            )
+    except TimeoutException:
+        metrics.count("timeouts", "memorykings")
+        print("   -> Alerta: Tiempo de espera agotado (posible categoría vacía).")
+
+    blocks.check("memorykings", driver)
+
+    with metrics.timer("memorykings", "scroll"):
+        scroll_memorykings(driver)
+
+    with metrics.timer("memorykings", "parse"):
+        products = extract_category_data(driver.page_source)
+    metrics.record_page("memorykings", len(products))
+    memory.check("memorykings", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+CATEGORIES = [
+    "/listados/247/laptops-intel-core-i3",
+    "/listados/258/laptops-intel-core-i5",
+    "/listados/257/laptops-intel-core-i7",
+    "/listados/464/laptops-intel-core-ultra-5",
+    "/listados/927/laptops-intel-core-i9",
+    "/listados/465/laptops-intel-core-ultra-7",
+    "/listados/1263/laptops-intel-core-ultra-9",
+]
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page): una por categoría.
+    """
+    origin = sites.base_url("memorykings")
+    return [(origin + path,) for path in CATEGORIES]
+
+
 def main():
 
-    categories = [
-        "https://www.memorykings.pe/listados/247/laptops-intel-core-i3", 
-        "https://www.memorykings.pe/listados/258/laptops-intel-core-i5",
-        "https://www.memorykings.pe/listados/257/laptops-intel-core-i7",
-        "https://www.memorykings.pe/listados/464/laptops-intel-core-ultra-5",
-        "https://www.memorykings.pe/listados/927/laptops-intel-core-i9",
-        "https://www.memorykings.pe/listados/465/laptops-intel-core-ultra-7",
-        "https://www.memorykings.pe/listados/1263/laptops-intel-core-ultra-9"
-    ]
+    categories = [url for url, in listing_units()]
     
-    all_products = []
+    run = Run("memorykings")
     driver = None
+    n_workers = fanout.workers("memorykings")
 
-    try:
-        print("--- Iniciando Scraping Memory Kings ---")
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
         driver = setup_driver()
 
-        for url in categories:
-            print(f"\nProcesando Categoría: {url}")
+    try:
+        print("--- Iniciando Scraping Memory Kings ---")
+        if n_workers > 1:
+            print(f"Repartiendo {len(categories)} categorías entre {n_workers} navegadores...")
+            results = fanout.run("memorykings", categories, scrape_page, setup_driver, n_workers)
+            for current_products in results:
+                if current_products is None:
+                    run.fail("unidad fallida en el reparto")
+                else:
+                    run.add(current_products)
+        else:
+            driver = setup_driver()
+            for url in categories:
+                print(f"\nProcesando Categoría: {url}")
             
-            try:
-                driver.get(url)
-                
-
                 try:
-                    WebDriverWait(driver, 20).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "content"))
-                    )
-                except TimeoutException:
-                    print("   -> Alerta: Tiempo de espera agotado (posible categoría vacía).")
-                
-
-                scroll_memorykings(driver)
-                
-
-                current_products = extract_category_data(driver.page_source)
-                print(f"   -> Encontrados: {len(current_products)} productos.")
+                    current_products = retry.call("memorykings", lambda: scrape_page(driver, url), recover=restart_driver)
+                    print(f"   -> Encontrados: {len(current_products)} productos.")
                 
-                all_products.extend(current_products)
+                    run.add(current_products)
                 
 
-                time.sleep(random.uniform(3, 5))
+                    time.sleep(random.uniform(3, 5))
 
-            except Exception as e:
-                print(f"   -> Error procesando URL: {e}")
+                except retry.EmptyPage:
+                    print("   -> Categoría sin productos.")
+                except (retry.PageBlocked, retry.CircuitOpen) as e:
+                    print(f"   -> Tienda bloqueada ({e}). Se detiene el scraping.")
+                    run.fail(e)
+                    break
+                except Exception as e:
+                    print(f"   -> Error procesando URL: {e}")
+                    run.fail(e)
 
 
         output_file = 'memorykings_laptops.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN: Se extrajeron {len(all_products)} productos en total.")
+        print(f"\nRESUMEN: Se extrajeron {len(run.products)} productos en total.")
         print(f"Archivo guardado: {output_file}")
 
     except Exception as e:
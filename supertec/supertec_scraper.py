@@ -1,5 +1,6 @@
 import time
-import json
+import os
+import sys
 import random
 import re
 from selenium import webdriver
@@ -13,6 +14,13 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from bs4 import BeautifulSoup
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import blocks, memory, metrics, profiles, retry, scrolling, sites
+from core.output import Run
+
+# Selector que indica que el listado cargó (lo usan también core.plugins y core.bench).
+READY_SELECTOR = ".prods"
+
 def setup_driver():
     
     chrome_options = Options()
@@ -23,8 +31,13 @@ def setup_driver():
     chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36")
     chrome_options.add_argument("--log-level=3")
     
+    profile, profile_args = profiles.chrome_arguments("supertec")
+    for arg in sites.chrome_arguments() + profile_args:
+        chrome_options.add_argument(arg)
+    chrome_options.page_load_strategy = sites.page_load_strategy("supertec")
+
     service = Service(ChromeDriverManager(chrome_type=ChromeType.GOOGLE).install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver = profiles.bind(profile, webdriver.Chrome(service=service, options=chrome_options))
     return driver
 
 def scroll_supertec(driver):
@@ -32,15 +45,7 @@ def scroll_supertec(driver):
     Scroll para asegurar carga de imágenes.
     """
     print("   -> Bajando para cargar catálogo...")
-    last_height = driver.execute_script("return document.body.scrollHeight")
-    step = 400
-    
-    for pos in range(0, last_height, step):
-        driver.execute_script(f"window.scrollTo(0, {pos});")
-        time.sleep(0.1)
-        
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(1)
+    scrolling.scroll("supertec", driver)
 
 def extract_products(html_content):
     """
@@ -116,34 +121,72 @@ def extract_products(html_content):
         
     return page_products
 
+def scrape_page(driver, url):
+    """
+    Carga el listado, espera los productos, hace scroll y extrae la primera página.
+    """
+    with metrics.timer("supertec", "load"):
+        driver.get(url)
+
+    try:
+        with metrics.timer("supertec", "wait"):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, READY_SELECTOR))
+            )
+    except TimeoutException:
+        metrics.count("timeouts", "supertec")
+        print("Alerta: No cargaron productos iniciales.")
+
+    blocks.check("supertec", driver)
+
+    with metrics.timer("supertec", "scroll"):
+        scroll_supertec(driver)
+
+    with metrics.timer("supertec", "parse"):
+        products = extract_products(driver.page_source)
+    metrics.record_page("supertec", len(products))
+    memory.check("supertec", driver)
+
+    if not products:
+        raise retry.EmptyPage("0 productos")
+    return products
+
+
+def listing_units():
+    """
+    Unidades de trabajo (argumentos de scrape_page). La página 2 llega por AJAX y solo la recorre main().
+    """
+    return [(sites.base_url("supertec") + "/productos-categorias/1/PORTATILES",)]
+
+
 def main():
-    start_url = "https://supertec.com.pe/productos-categorias/1/PORTATILES"
-    all_products = []
+    start_url, = listing_units()[0]
+    run = Run("supertec")
     driver = None
 
+    def restart_driver():
+        nonlocal driver
+        print("   -> Reiniciando navegador...")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        driver = setup_driver()
+
     try:
         print("--- Iniciando Scraping Supertec (Navegación AJAX) ---")
         driver = setup_driver()
         
         print(f"Cargando sitio principal: {start_url}")
-        driver.get(start_url)
-        
-
-        try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "prods"))
-            )
-        except TimeoutException:
-            print("Alerta: No cargaron productos iniciales.")
-
-
         print("\nProcesando Página 1...")
-        scroll_supertec(driver) 
-        
-
-        products_p1 = extract_products(driver.page_source)
+        try:
+            products_p1 = retry.call("supertec", lambda: scrape_page(driver, start_url), recover=restart_driver)
+        except retry.ScrapeError as e:
+            print(f"   -> No se pudo extraer la página 1 ({e}).")
+            run.fail(e)
+            products_p1 = []
         print(f"   -> Encontrados (limpios): {len(products_p1)}")
-        all_products.extend(products_p1)
+        run.add(products_p1)
 
 
         print("\nIntentando ir a la Página 2...")
@@ -167,35 +210,34 @@ def main():
 
             
 
-            scroll_supertec(driver)
+            with metrics.timer("supertec", "scroll"):
+                scroll_supertec(driver)
             
 
-            products_p2 = extract_products(driver.page_source)
+            with metrics.timer("supertec", "parse"):
+                products_p2 = extract_products(driver.page_source)
+            metrics.record_page("supertec", len(products_p2))
             print(f"   -> Encontrados en P2 (limpios): {len(products_p2)}")
             
 
 
-            existing_urls = set(p['url'] for p in all_products)
-            new_products_count = 0
-            
-            for p in products_p2:
-                if p['url'] not in existing_urls:
-                    all_products.append(p)
-                    new_products_count += 1
+            existing_urls = set(p['url'] for p in run.products)
+            new_products = [p for p in products_p2 if p['url'] not in existing_urls]
+            run.add(new_products)
             
-            print(f"   -> Nuevos productos agregados: {new_products_count}")
+            print(f"   -> Nuevos productos agregados: {len(new_products)}")
 
         except NoSuchElementException:
             print("   -> No se encontró el botón de la página 2 (¿Quizás solo hay una página?).")
         except Exception as e:
             print(f"   -> Error intentando cambiar de página: {e}")
+            run.fail(e)
 
 
         output_file = 'supertec_laptops.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(all_products, f, indent=4, ensure_ascii=False)
+        run.save(output_file)
             
-        print(f"\nRESUMEN: Se extrajeron {len(all_products)} productos válidos.")
+        print(f"\nRESUMEN: Se extrajeron {len(run.products)} productos válidos.")
         print(f"Archivo guardado: {output_file}")
 
     except Exception as e:
@@ -0,0 +1,99 @@
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from core import assets
+from core.assets import NO_THUMBS, AssetStore, mirror_images
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+
+
+def products(site):
+    return [
+        {"name": "A", "image_url": f"{site.url}/a.png"},
+        {"name": "B", "image_url": f"{site.url}/b.png"},
+        {"name": "C", "image_url": f"{site.url}/logo.svg"},
+    ]
+
+
+def serve(site):
+    site.pages["/a.png"] = (PNG, "image/png")
+    site.pages["/b.png"] = (PNG, "image/png")
+    site.pages["/logo.svg"] = (SVG, "image/svg+xml")
+
+
+def test_same_content_is_stored_once_and_revalidated(site, tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "Image", None)
+    serve(site)
+    root = str(tmp_path / "imagenes")
+
+    items = products(site)
+    stats = mirror_images("hp", items, root=root)
+    assert stats["downloaded"] == 3
+    assert stats["new_blobs"] == 2 and stats["duplicate_blobs"] == 1
+    assert items[0]["image_file"] == items[1]["image_file"]
+    assert (tmp_path / "imagenes" / items[0]["image_file"]).read_bytes() == PNG
+
+    # Dentro del TTL no se pide nada.
+    assert mirror_images("hp", products(site), root=root)["fresh"] == 3
+    assert len(site.requests) == 3
+
+    # Con el TTL vencido se revalida con el ETag y el servidor contesta 304.
+    items = products(site)
+    assert mirror_images("hp", items, root=root, ttl=0)["not_modified"] == 3
+    assert all("If-None-Match" in headers for _, headers in site.requests[3:])
+    assert items[2]["image_file"].endswith(".svg")
+
+
+def test_svg_is_marked_and_not_requeued(site, tmp_path, monkeypatch):
+    serve(site)
+    root = str(tmp_path / "imagenes")
+
+    # Sin Pillow: el PNG queda pendiente y el SVG se marca igual.
+    monkeypatch.setattr(assets, "Image", None)
+    items = products(site)
+    mirror_images("hp", items, root=root)
+    png, svg = items[0]["image_sha256"], items[2]["image_sha256"]
+    with AssetStore(root) as store:
+        blobs = store.blobs({png, svg})
+    assert blobs[png]["thumbs"] == 0
+    assert blobs[svg]["thumbs"] == NO_THUMBS
+
+    # Con "Pillow": solo el PNG vuelve a la cola de miniaturas.
+    queued = []
+
+    def make_thumbnails(root, sha, ext, sizes=assets.THUMB_SIZES):
+        queued.append(ext)
+        return 10, 10, len(sizes)
+
+    monkeypatch.setattr(assets, "Image", object())
+    monkeypatch.setattr(assets, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(assets, "make_thumbnails", make_thumbnails)
+    for _ in range(2):
+        stats = mirror_images("hp", products(site), root=root, ttl=0, procs=1)
+    assert queued == ["png"]
+    assert stats["thumbnails"] == 0
+    with AssetStore(root) as store:
+        assert store.stats()["with_thumbs"] == 1
+        assert store.blobs({svg})[svg]["thumbs"] == NO_THUMBS
+
+
+def test_corrupt_image_is_marked_and_not_requeued(site, tmp_path, monkeypatch):
+    site.pages["/rota.jpg"] = (b"\xff\xd8\xff\xe0 truncado", "image/jpeg")
+    root = str(tmp_path / "imagenes")
+    opened = []
+
+    def open_image(path):
+        opened.append(path)
+        raise OSError("cannot identify image file")
+
+    monkeypatch.setattr(assets, "Image", types.SimpleNamespace(open=open_image))
+    monkeypatch.setattr(assets, "ProcessPoolExecutor", ThreadPoolExecutor)
+    for _ in range(2):
+        items = [{"name": "A", "image_url": f"{site.url}/rota.jpg"}]
+        mirror_images("hp", items, root=root, ttl=0, procs=1)
+
+    assert len(opened) == 1
+    sha = items[0]["image_sha256"]
+    with AssetStore(root) as store:
+        assert store.blobs({sha})[sha]["thumbs"] == NO_THUMBS
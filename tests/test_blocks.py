@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from core import blocks, retry
+from core.blocks import CAPTCHA, HEAD_CHARS, NOT_FOUND, OK, UNAVAILABLE, detect
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+
+AMAZON_CAPTCHA = """<!doctype html><html><head><title dir="ltr">Amazon.com</title></head><body>
+<div class="a-container"><h4>Enter the characters you see below</h4>
+<form method="get" action="/errors/validateCaptcha" name="">
+<input type=hidden name="amzn" value="abc"><img src="https://images-na.ssl-images-amazon.com/captcha/x/Captcha_y.jpg">
+</form></div></body></html>"""
+
+
+class FakeDriver:
+    def __init__(self, html):
+        self.html = html
+
+    def execute_script(self, script, chars):
+        return self.html[:chars]
+
+
+def page(title, body="<ul><li class='product'>Laptop</li></ul>"):
+    return f"<html><head><title>{title}</title></head><body>{body}</body></html>"
+
+
+def test_amazon_captcha_body():
+    verdict = detect("amazon", AMAZON_CAPTCHA)
+    assert verdict.kind == CAPTCHA and verdict.blocked
+    # El patrón es propio de Amazon: en otra tienda el mismo título no alcanza.
+    assert detect("hp", AMAZON_CAPTCHA).ok
+
+
+def test_page_without_title_is_ok():
+    assert detect("hp", "<html><body><div class='grid'>Laptop HP</div></body></html>").kind == OK
+
+
+@pytest.mark.parametrize("title, kind", [
+    ("404 Not Found", NOT_FOUND),
+    ("Página no encontrada | Oechsle", NOT_FOUND),
+    ("503 Service Temporarily Unavailable", UNAVAILABLE),
+    ("502 Bad Gateway", UNAVAILABLE),
+    ("Just a moment...", blocks.BLOCKED),
+])
+def test_titles(title, kind):
+    assert detect("oechsle", page(title)).kind == kind
+
+
+def test_bytes_input():
+    assert detect("amazon", AMAZON_CAPTCHA.encode("utf-8")).kind == CAPTCHA
+    assert detect("hp", page("Laptops | HP Store").encode("utf-8")).ok
+
+
+def test_marker_past_the_prefix_is_ignored():
+    html = "<html><head><title>Laptops</title></head><body>" + "x" * HEAD_CHARS + '<div id="px-captcha"></div>'
+    assert detect("hp", html).ok
+    assert detect("hp", html[:HEAD_CHARS - 100] + '<div id="px-captcha"></div>').kind == CAPTCHA
+
+
+@pytest.mark.parametrize("store", sorted(os.listdir(FIXTURES)))
+def test_recorded_listings_are_not_flagged(store):
+    with open(os.path.join(FIXTURES, store, "page-1.html"), encoding="utf-8") as f:
+        assert detect(store, f.read()).ok
+
+
+def test_check_raises_what_retry_understands():
+    with pytest.raises(retry.PageBlocked):
+        blocks.check("amazon", FakeDriver(AMAZON_CAPTCHA))
+    with pytest.raises(retry.PageNotFound):
+        blocks.check("hp", FakeDriver(page("404 Not Found")))
+    with pytest.raises(retry.ScrapeError) as error:
+        blocks.check("hp", FakeDriver("<html><body>Service Unavailable</body></html>"))
+    assert retry.classify(error.value) == retry.ERROR
+    assert blocks.check("hp", FakeDriver(page("Laptops"))).ok
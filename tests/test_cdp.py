@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from core.cdp import OBJECT_GROUP, CDPDriver
+
+
+class FakeConnection:
+    """
+    Responde lo mínimo de Runtime.* para find_elements y guarda los mensajes enviados.
+    """
+
+    def __init__(self, found=2):
+        self.found = found
+        self.sent = []
+        self.ids = iter(range(1, 1000))
+
+    def send(self, method, params=None, timeout=None):
+        self.sent.append((method, params or {}))
+        if method in ("Runtime.evaluate", "Runtime.callFunctionOn"):
+            return {"result": {"objectId": f"obj-{next(self.ids)}"}}
+        if method == "Runtime.getProperties":
+            items = [{"name": str(i), "value": {"objectId": f"el-{next(self.ids)}"}} for i in range(self.found)]
+            return {"result": items + [{"name": "length", "value": {"value": self.found}}]}
+        return {}
+
+    def on(self, method, callback):
+        pass
+
+    def off(self, method, callback):
+        pass
+
+    def methods(self, name):
+        return [params for method, params in self.sent if method == name]
+
+
+def driver(found=2):
+    d = CDPDriver(FakeConnection(found))
+    d.page_load_strategy = "none"
+    return d
+
+
+def test_find_elements_releases_temporaries_and_groups_elements():
+    d = driver()
+    elements = d.find_elements("css selector", ".item")
+    assert len(elements) == 2
+
+    created = d.conn.methods("Runtime.evaluate") + d.conn.methods("Runtime.callFunctionOn")
+    assert all(params["objectGroup"] == OBJECT_GROUP for params in created)
+    released = {params["objectId"] for params in d.conn.methods("Runtime.releaseObject")}
+    assert released == {"obj-1", "obj-2"}
+    assert not released & {e.object_id for e in elements}
+
+
+def test_navigation_releases_the_element_group():
+    d = driver()
+    d.find_elements("css selector", ".item")
+    d.get("https://example.pe")
+    assert d.conn.methods("Runtime.releaseObjectGroup") == [{"objectGroup": OBJECT_GROUP}]
+    assert [m for m, _ in d.conn.sent][-2:] == ["Runtime.releaseObjectGroup", "Page.navigate"]
+
+
+def test_child_search_does_not_release_the_parent():
+    d = driver(found=1)
+    parent = d.find_element("css selector", ".grid")
+    d.conn.sent.clear()
+    parent.find_elements("tag name", "li")
+    released = {params["objectId"] for params in d.conn.methods("Runtime.releaseObject")}
+    assert parent.object_id not in released
+    assert len(released) == 1
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from core import enrich
+from core.enrich import DetailCache, Fetcher, enrich_products
+
+DETAIL_HTML = """<html><head><script type="application/ld+json">{}</script></head>
+<body><table><tr><th>Procesador</th><td>Intel Core i5</td></tr></table></body></html>"""
+
+
+def detail_page(sku):
+    ld = {"@type": "Product", "sku": sku, "brand": {"name": "HP"}}
+    return DETAIL_HTML.format(json.dumps(ld)).encode(), "text/html"
+
+
+def listing(site, price="S/ 100"):
+    return [{"name": "HP 15", "url": f"{site.url}/p/1", "price": price}]
+
+
+def test_detail_is_merged_and_revalidated_with_etag(site, tmp_path):
+    site.pages["/p/1"] = detail_page("SKU-1")
+    cache = str(tmp_path / "detalles.db")
+
+    products = listing(site)
+    stats = enrich_products("lenovo", products, cache_path=cache, limit=2)
+    assert stats["fetched"] == 1
+    assert products[0]["sku"] == "SKU-1"
+    assert products[0]["brand"] == "HP"
+    assert products[0]["detail_specs"] == {"Procesador": "Intel Core i5"}
+
+    # Dentro del TTL y con el listado igual no se pide nada.
+    assert enrich_products("lenovo", listing(site), cache_path=cache)["cached"] == 1
+    assert len(site.requests) == 1
+
+    # TTL vencido: pedido condicional, 304 y los datos salen de la caché.
+    products = listing(site)
+    stats = enrich_products("lenovo", products, cache_path=cache, ttl=0)
+    assert stats["not_modified"] == 1
+    assert products[0]["sku"] == "SKU-1"
+    assert "If-None-Match" in site.requests[-1][1]
+
+
+def test_listing_change_refetches_and_gone_is_cached(site, tmp_path):
+    site.pages["/p/1"] = detail_page("SKU-1")
+    cache = str(tmp_path / "detalles.db")
+    enrich_products("lenovo", listing(site), cache_path=cache)
+
+    site.pages["/p/1"] = detail_page("SKU-2")
+    products = listing(site, price="S/ 90")
+    assert enrich_products("lenovo", products, cache_path=cache)["fetched"] == 1
+    assert products[0]["sku"] == "SKU-2"
+
+    missing = [{"name": "HP 14", "url": f"{site.url}/p/404", "price": "S/ 1"}]
+    assert enrich_products("lenovo", missing, cache_path=cache)["gone"] == 1
+    with DetailCache(cache) as db:
+        assert {(row["status"], row["n"]) for row in db.stats("lenovo")} == {(200, 1), (404, 1)}
+
+
+def test_retry_backoff_releases_slots(monkeypatch):
+    calls = []
+    replies = {"https://a.pe/1": [(503, {"Retry-After": "0"}), (200, {})], "https://b.pe/1": [(200, {})]}
+
+    async def fake_get_once(self, url, headers):
+        calls.append(url)
+        status, response_headers = replies[url].pop(0)
+        return status, response_headers, ""
+
+    monkeypatch.setattr(Fetcher, "_get_once", fake_get_once)
+    monkeypatch.setattr(enrich.random, "uniform", lambda a, b: 0.2)
+
+    async def main():
+        fetcher = Fetcher(1, per_domain=1)
+        first = asyncio.create_task(fetcher.get("https://a.pe/1", {}))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(fetcher.get("https://b.pe/1", {}))
+        return await asyncio.gather(first, second)
+
+    results = asyncio.run(main())
+    assert [status for status, _, _ in results] == [200, 200]
+    # b.pe no espera a que a.pe termine su pausa de reintento.
+    assert calls == ["https://a.pe/1", "https://b.pe/1", "https://a.pe/1"]
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from core.export import CatalogExporter
+from core.output import Run
+
+SCRAPER_ENV = ("SCRAPER_DB", "SCRAPER_HISTORY", "SCRAPER_SPECS", "SCRAPER_ENRICH", "SCRAPER_IMAGES_DIR")
+
+
+def page(n, start=0):
+    return [{"name": f"Laptop {i}", "price": f"S/ {1000 + i}", "url": f"https://x.pe/p/{i}"}
+            for i in range(start, start + n)]
+
+
+def test_rows_are_flushed_in_row_groups(tmp_path):
+    with CatalogExporter(str(tmp_path), "hp", timestamp=0, row_group_size=2) as exporter:
+        exporter.add(page(3))
+        # Un row group ya escrito, una fila en el buffer.
+        assert exporter.rows == 2 and len(exporter.buffer) == 1
+        exporter.add(page(2, start=3))
+    meta = pq.ParquetFile(exporter.path).metadata
+    assert meta.num_rows == 5
+    assert meta.num_row_groups == 3
+
+
+def test_same_second_runs_do_not_collide(tmp_path):
+    with CatalogExporter(str(tmp_path), "hp", timestamp=0) as first, \
+            CatalogExporter(str(tmp_path), "hp", timestamp=0) as second:
+        first.add(page(1))
+        second.add(page(1))
+    assert first.path != second.path
+    assert os.path.exists(first.path) and os.path.exists(second.path)
+
+
+def test_run_streams_pages_and_publishes_on_save(tmp_path, monkeypatch):
+    for name in SCRAPER_ENV:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("SCRAPER_EXPORT_DIR", str(tmp_path / "export"))
+
+    run = Run("oechsle")
+    run.add(page(2))
+    run.add(page(2, start=2))
+    # Mientras la corrida sigue, solo existe el archivo parcial.
+    assert os.path.exists(run.exporter.partial_path)
+    assert not os.path.exists(run.exporter.path)
+
+    output = tmp_path / "oechsle.json"
+    run.save(str(output))
+    assert pq.ParquetFile(run.exporter.path).metadata.num_rows == 4
+    assert not os.path.exists(run.exporter.partial_path)
+    assert len(json.loads(output.read_text(encoding='utf-8'))) == 4
+    assert run.exporter.path.startswith(str(tmp_path / "export" / "store=oechsle"))
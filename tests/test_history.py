@@ -0,0 +1,49 @@
+from core.history import DAY, PriceHistory
+
+
+def run(price, n=1):
+    return [{"name": f"Laptop {n}", "url": f"https://x.pe/p/{n}", "price": price}]
+
+
+def test_unchanged_prices_extend_the_current_segment(tmp_path):
+    with PriceHistory(str(tmp_path / "h.db")) as db:
+        assert db.append_run("hp", run("S/ 2,999.00"), timestamp=100) == {"extended": 0, "new_points": 1}
+        assert db.append_run("hp", run("S/ 2,999.00"), timestamp=200) == {"extended": 1, "new_points": 0}
+        db.append_run("hp", run("S/ 2,499.00"), timestamp=300)
+        # Una corrida vieja repetida no reescribe el historial.
+        assert db.append_run("hp", run("S/ 1,000.00"), timestamp=250) == {"extended": 0, "new_points": 0}
+
+        segments = db.history("hp", "https://x.pe/p/1")
+        assert [(s["start_ts"], s["end_ts"], s["price"], s["samples"]) for s in segments] == [
+            (100, 200, 2999.0, 2), (300, 300, 2499.0, 1),
+        ]
+        assert segments[0]["currency"] == "PEN"
+        assert [s["price"] for s in db.history("hp", "https://x.pe/p/1", start=250)] == [2499.0]
+        assert [s["price"] for s in db.history("hp", "https://x.pe/p/1", end=150)] == [2999.0]
+
+
+def test_price_drops_against_the_price_at_since(tmp_path):
+    with PriceHistory(str(tmp_path / "h.db")) as db:
+        db.append_run("hp", run("S/ 1,000") + run("S/ 500", n=2), timestamp=100)
+        db.append_run("hp", run("S/ 800") + run("S/ 480", n=2), timestamp=200)
+        db.append_run("asus", run("S/ 100"), timestamp=100)
+        db.append_run("asus", run("S/ 50"), timestamp=200)
+
+        drops = db.price_drops(since=150)
+        assert [(d["store"], d["before"], d["now"]) for d in drops] == [("asus", 100, 50), ("hp", 1000, 800)]
+        assert [d["store"] for d in db.price_drops(since=150, store="hp")] == ["hp"]
+        assert db.price_drops(since=150, threshold=0.6) == []
+
+
+def test_downsample_keeps_one_segment_per_bucket_and_the_current_one(tmp_path):
+    with PriceHistory(str(tmp_path / "h.db")) as db:
+        prices = ["S/ 100", "S/ 90", "S/ 100", "S/ 80", "S/ 70"]
+        for i, price in enumerate(prices):
+            db.append_run("hp", run(price), timestamp=i * DAY / 4)
+        now = 3 * DAY
+        db.append_run("hp", run("S/ 60"), timestamp=now)
+
+        assert db.downsample(older_than=DAY) == {"before": 4, "after": 1}
+        segments = db.history("hp", "https://x.pe/p/1")
+        assert [(s["start_ts"], s["price"]) for s in segments] == [(0, 80.0), (DAY, 70.0), (now, 60.0)]
+        assert segments[0]["samples"] == 4
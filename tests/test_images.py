@@ -0,0 +1,62 @@
+from bs4 import BeautifulSoup
+
+from core.images import NO_IMAGE, best_image_url, covered, is_placeholder, parse_srcset
+
+VTEX = "https://oechsle.vteximg.com.br/arquivos/ids/4567"
+
+
+def img(html, store=None, **kwargs):
+    soup = BeautifulSoup(html, "html.parser")
+    return best_image_url(soup.find("img"), store, card=soup, **kwargs)
+
+
+def test_parse_srcset():
+    assert parse_srcset("a.jpg 320w, b.jpg 640w,c.jpg") == [(320, "a.jpg"), (640, "b.jpg"), (0, "c.jpg")]
+    assert parse_srcset("a.jpg 1x, b.jpg 2x") == [(1000, "a.jpg"), (2000, "b.jpg")]
+    assert parse_srcset("a.jpg bad") == [(0, "a.jpg")]
+    assert parse_srcset(None) == []
+
+
+def test_srcset_picks_the_widest_candidate():
+    html = '<img src="/s.jpg" srcset="/a.jpg 320w, /c.jpg 1200w, /b.jpg 640w">'
+    assert img(html, "hp", base_url="https://www.hp.com/pe-es/") == "https://www.hp.com/c.jpg"
+    # Un placeholder en el srcset no gana aunque sea el más ancho.
+    assert img('<img data-srcset="//cdn.x/a.jpg 320w, //cdn.x/lazy.gif 2000w">', "hp") == "https://cdn.x/a.jpg"
+
+
+def test_data_src_wins_over_placeholder_src():
+    assert is_placeholder("https://x.pe/img/loader.gif")
+    assert is_placeholder("data:image/gif;base64,R0lGOD")
+    assert not is_placeholder("https://x.pe/img/laptop-1.jpg")
+    html = '<img src="https://x.pe/img/loader.gif" data-src="https://x.pe/img/laptop-1.jpg">'
+    assert img(html, "infotec") == "https://x.pe/img/laptop-1.jpg"
+
+
+def test_noscript_fallback():
+    html = ('<div><img src="data:image/gif;base64,R0lGOD">'
+            '<noscript><img src="https://x.pe/real.jpg"></noscript></div>')
+    assert img(html, "hp") == "https://x.pe/real.jpg"
+    assert img('<div><img src="data:image/gif;base64,R0lGOD"></div>', "hp") == NO_IMAGE
+
+
+def test_oechsle_src_needs_arquivos_ids_and_is_resized():
+    # El src sin "arquivos/ids" es un ícono: se busca la foto en los atributos lazy.
+    html = f'<img src="https://oechsle.pe/icon-tienda.png" data-src="{VTEX}-300-300/laptop.jpg">'
+    assert img(html, "oechsle") == f"{VTEX}-500-500/laptop.jpg"
+    assert img(f'<img srcset="{VTEX}-200-200/a.jpg 200w, {VTEX}-600-600/a.jpg 600w">', "oechsle") == \
+        f"{VTEX}-500-500/a.jpg"
+    # Sin alternativa se usa el src aunque no tenga la marca.
+    assert img('<img src="https://oechsle.pe/foto.png">', "oechsle") == "https://oechsle.pe/foto.png"
+    # Las demás tiendas no reescriben el tamaño.
+    assert img(f'<img src="{VTEX}-300-300/laptop.jpg">', "hp") == f"{VTEX}-300-300/laptop.jpg"
+
+
+def test_covered(monkeypatch):
+    monkeypatch.delenv("SCRAPER_NO_SCROLL", raising=False)
+    products = [{"image_url": "https://x.pe/1.jpg"}, {"image_url": "https://x.pe/2.jpg"}]
+    assert covered("hp", products)
+    assert not covered("hp", products + [{"image_url": NO_IMAGE}])
+    assert not covered("hp", [])
+    assert not covered("asus", products)
+    monkeypatch.setenv("SCRAPER_NO_SCROLL", "0")
+    assert not covered("hp", products)
@@ -0,0 +1,43 @@
+from core.matching import MatchIndex, model_codes, tokenize
+
+
+def names(groups):
+    return sorted(sorted((p["store"], p["name"]) for p in group) for group in groups)
+
+
+def test_model_codes_skip_generic_specs():
+    tokens = tokenize("Laptop HP 15-fd0005la Intel Core i5-1334U 16GB 512GB RTX4050")
+    assert "fd0005la" in model_codes(tokens)
+    assert not model_codes(tokens) & {"16gb", "512gb", "rtx4050", "i51334u"}
+    assert tokenize("Portátil Lenovo") == ["lenovo"]
+
+
+def test_same_part_number_matches_across_stores():
+    index = MatchIndex()
+    index.add("falabella", {"name": "Laptop Lenovo IdeaPad Slim 3 82XV00ABLM 15.6\""})
+    index.add("oechsle", {"name": "LENOVO 82XV00ABLM IdeaPad Slim3 Intel Core i5"})
+    index.add("oechsle", {"name": "Lenovo IdeaPad Slim 3 82XV00CDLM"})
+    assert names(index.matches()) == [[
+        ("falabella", "Laptop Lenovo IdeaPad Slim 3 82XV00ABLM 15.6\""),
+        ("oechsle", "LENOVO 82XV00ABLM IdeaPad Slim3 Intel Core i5"),
+    ]]
+
+
+def test_similar_names_without_codes_match_only_across_stores():
+    index = MatchIndex()
+    name = "Asus Vivobook 15 Intel Core i7 16GB 512GB SSD Azul"
+    index.add("realplaza", {"name": name})
+    index.add("falabella", {"name": name + " Oferta"})
+    index.add("falabella", {"name": name})
+    index.add("hp", {"name": "HP Victus 16 AMD Ryzen 7 RTX 4060"})
+
+    groups = index.matches()
+    assert len(groups) == 1
+    assert {p["store"] for p in groups[0]} == {"realplaza", "falabella"}
+    assert all(index.rows[i]["store"] != index.rows[j]["store"] for i, j in index.candidates())
+
+
+def test_signatures_are_deterministic():
+    first, second = MatchIndex(), MatchIndex()
+    tokens = {"asus", "vivobook", "asus vivobook"}
+    assert first._signature(tokens) == second._signature(tokens)
@@ -0,0 +1,66 @@
+import os
+
+from core import memory
+
+UID = os.getuid() if hasattr(os, "getuid") else None
+
+
+def proc(pid, ppid, name, cmdline=""):
+    return {"pid": pid, "ppid": ppid, "name": name, "cmdline": cmdline, "rss_mb": 10.0, "uid": UID}
+
+
+class FakeDriver:
+    def __init__(self, pid):
+        self.service = type("Service", (), {"process": type("Process", (), {"pid": pid})()})()
+
+
+def table_with_init(init_name="systemd", own_pid=500):
+    return [
+        proc(1, 0, init_name),
+        proc(own_pid, 1, "python3"),
+        # Driver propio: hijo de este proceso.
+        proc(501, own_pid, "chromedriver"),
+        proc(502, 501, "chrome", "--remote-debugging-port=0"),
+        # Huérfanos de una corrida anterior.
+        proc(600, 1, "chromedriver"),
+        proc(601, 600, "chrome", "--remote-debugging-port=0"),
+        proc(700, 1, "chrome", "--remote-debugging-port=9222"),
+        # Chrome del usuario (sin depuración remota) y un renderer suelto.
+        proc(800, 1, "chrome", "--user-data-dir=/home/x"),
+        proc(801, 1, "chrome", "--type=renderer --remote-debugging-port=0"),
+    ]
+
+
+def test_orphans_finds_only_reparented_automation_processes():
+    found = {p["pid"] for p in memory.orphans(table_with_init(), pid=500)}
+    assert found == {600, 700}
+
+
+def test_orphans_skips_tracked_drivers(monkeypatch):
+    driver = FakeDriver(600)
+    monkeypatch.setattr(memory, "_tracked", {driver})
+    found = {p["pid"] for p in memory.orphans(table_with_init(), pid=500)}
+    assert found == {700}
+
+
+def test_orphans_disabled_when_running_as_pid_one():
+    table = [proc(1, 0, "python3"), proc(2, 1, "chromedriver"), proc(3, 2, "chrome", "--remote-debugging-port=0")]
+    assert memory.orphans(table, pid=1) == []
+
+
+def test_orphans_disabled_when_pid_one_is_not_init():
+    # browserd (o un scraper) es el PID 1 del contenedor: su Chrome tiene padre 1 y está vivo.
+    table = table_with_init(init_name="python3")
+    assert memory.orphans(table, pid=500) == []
+
+
+def test_orphans_ignores_other_users():
+    table = table_with_init()
+    table[4] = dict(table[4], uid=(UID or 0) + 1)
+    assert 600 not in {p["pid"] for p in memory.orphans(table, pid=500)}
+
+
+def test_descendants_walks_the_whole_tree():
+    table = table_with_init()
+    assert {p["pid"] for p in memory.descendants(600, table)} == {601}
+    assert {p["pid"] for p in memory.descendants(500, table)} == {501, 502}
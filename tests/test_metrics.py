@@ -0,0 +1,83 @@
+import json
+import socket
+import threading
+import time
+
+from core import metrics
+
+
+def test_concurrent_counts_with_file_output_never_raise(tmp_path, monkeypatch):
+    path = tmp_path / "metrics.json"
+    monkeypatch.setenv("SCRAPER_METRICS_FILE", str(path))
+    monkeypatch.setattr(metrics, "FILE_INTERVAL", 0)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(200):
+                metrics.count("pages_fetched", "test-concurrent")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    metrics.write_file()
+    snapshot = json.loads(path.read_text(encoding='utf-8'))
+    assert snapshot["counters"]["pages_fetched"]["test-concurrent"] == 1600
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_write_errors_do_not_escape(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCRAPER_METRICS_FILE", str(tmp_path / "missing-dir" / "metrics.prom"))
+    monkeypatch.setattr(metrics, "FILE_INTERVAL", 0)
+    metrics.count("retries", "test-errors")
+    metrics.write_file()
+
+
+def test_render_exposes_counters_and_histograms():
+    metrics.count("timeouts", "test-render", 2)
+    metrics.observe("test-render", "load", 0.3)
+    text = metrics.render()
+    assert 'scraper_timeouts_total{store="test-render"} 2' in text
+    assert 'scraper_phase_seconds_bucket{store="test-render",phase="load",le="0.5"} 1' in text
+    assert 'scraper_phase_seconds_count{store="test-render",phase="load"} 1' in text
+
+
+def test_endpoint_starts_once_under_concurrent_workers(monkeypatch):
+    monkeypatch.setitem(metrics._state, "started", False)
+    monkeypatch.setenv("SCRAPER_METRICS_PORT", "9999")
+    monkeypatch.delenv("SCRAPER_METRICS_FILE", raising=False)
+    started = []
+
+    def serve(port):
+        time.sleep(0.05)
+        started.append(port)
+
+    monkeypatch.setattr(metrics, "serve", serve)
+    threads = [threading.Thread(target=metrics.count, args=("retries", "test-serve")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert started == [9999]
+
+
+def test_bad_or_busy_port_does_not_fail_the_scrape(monkeypatch, capsys):
+    monkeypatch.delenv("SCRAPER_METRICS_FILE", raising=False)
+    monkeypatch.setitem(metrics._state, "started", False)
+    monkeypatch.setenv("SCRAPER_METRICS_PORT", "no-es-un-puerto")
+    metrics.count("retries", "test-port")
+
+    with socket.socket() as busy:
+        busy.bind(("0.0.0.0", 0))
+        busy.listen()
+        monkeypatch.setitem(metrics._state, "started", False)
+        monkeypatch.setenv("SCRAPER_METRICS_PORT", str(busy.getsockname()[1]))
+        with metrics.timer("test-port", "load"):
+            pass
+    assert capsys.readouterr().out.count("No se pudo abrir el endpoint de métricas") == 2
@@ -0,0 +1,72 @@
+import json
+import os
+import urllib.request
+
+import pytest
+from bs4 import BeautifulSoup
+
+from core import plugins
+from core.mock_server import FIXTURES_DIR, MockConfig, start_server
+
+ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), FIXTURES_DIR)
+
+
+@pytest.fixture(scope="module")
+def mock_url():
+    server = start_server(MockConfig(fixtures=ROOT), port=0)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode("utf-8")
+
+
+def manifest(store):
+    with open(os.path.join(ROOT, store, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check(products):
+    assert products
+    for item in products:
+        assert item["name"] != "Sin Nombre"
+        assert "S/" in item["price"] or "$" in item["price"]
+        assert item["image_url"].startswith("http")
+
+
+@pytest.mark.parametrize("store", plugins.names())
+def test_every_store_has_a_fixture_its_extractor_reads(store, mock_url):
+    plugin = plugins.get(store)
+    for route in manifest(store)["pages"]:
+        html = fetch(f"{mock_url}/{store}{route}")
+        assert BeautifulSoup(html, "html.parser").select(plugin.ready)
+        products = plugin.extract(html)
+        check(products)
+        if store != "lenovo":
+            assert all(item["url"] for item in products)
+
+
+def test_units_hit_the_recorded_routes(mock_url, monkeypatch):
+    monkeypatch.setenv("SCRAPER_MOCK_URL", mock_url)
+    for store in plugins.names():
+        first = plugins.get(store).units()[0][0]
+        assert plugins.get(store).extract(fetch(first)), store
+
+
+def test_pages_past_the_recording_are_empty(mock_url):
+    html = fetch(f"{mock_url}/hp/pe-es/shop/laptops.html?p=2")
+    assert plugins.get("hp").extract(html) == []
+
+
+def test_lenovo_batches_and_supertec_ajax(mock_url):
+    lenovo = plugins.get("lenovo")
+    first = lenovo.extract(fetch(f"{mock_url}/lenovo/pe/es/d/ofertas/intel/"))
+    batch = lenovo.extract("<ul>" + fetch(f"{mock_url}/lenovo/__batch/1") + "</ul>")
+    assert len(first) == 2 and len(batch) == 2
+    assert {p["name"] for p in first}.isdisjoint(p["name"] for p in batch)
+
+    page_2 = plugins.get("supertec").extract(fetch(f"{mock_url}/supertec/__ajax?page=2"))
+    check(page_2)
+    assert all("productos-por-marcas" not in p["url"] for p in page_2)
@@ -0,0 +1,148 @@
+import threading
+
+from core import fanout, pagination, retry
+from core.output import Run
+from core.pagination import Paginator
+
+NUMBERS = pagination.SELECTORS["infotec"]["numbers"]
+NEXT = pagination.SELECTORS["infotec"]["next"]
+
+
+def page(n):
+    return [{"url": f"https://infotec.pe/p/{n}-{i}", "name": f"P{n}-{i}"} for i in range(3)]
+
+
+class Element:
+    def __init__(self, text="", disabled=False):
+        self.text = text
+        self.disabled = disabled
+
+    def get_attribute(self, name):
+        return "disabled" if name == "class" and self.disabled else None
+
+
+class FakeDriver:
+    """
+    Listado de `total` páginas que muestra una ventana de números alrededor de la actual,
+    y que pasado el final devuelve otra vez la última página.
+    """
+
+    def __init__(self, total, window=2):
+        self.total = total
+        self.window = window
+        self.page = 1
+        self.closed = False
+
+    def load(self, url):
+        self.page = min(int(url.rsplit("=", 1)[1]), self.total)
+        return page(self.page)
+
+    def find_elements(self, by, selector):
+        if selector == NUMBERS:
+            return [Element(str(n)) for n in range(1, min(self.page + self.window, self.total) + 1)]
+        if selector == NEXT:
+            return [Element(disabled=self.page >= self.total)]
+        return []
+
+    def quit(self):
+        self.closed = True
+
+
+def url(n):
+    return f"https://infotec.pe/10-laptop?page={n}"
+
+
+def test_accept_stops_on_empty_and_repeated_pages():
+    pager = Paginator("infotec", url, max_pages=10)
+    pages = iter(pager)
+    next(pages)
+    assert pager.accept(page(1))
+    next(pages)
+    assert not pager.accept(page(1))
+    assert list(pages) == []
+
+    pager = Paginator("infotec", url, max_pages=10)
+    next(iter(pager))
+    assert not pager.accept([])
+
+
+def test_serial_walk_follows_next_past_the_number_window():
+    driver = FakeDriver(total=7)
+    pager = Paginator("infotec", url, max_pages=3)
+    visited = []
+    for n, target in pager:
+        products = driver.load(target)
+        if not pager.accept(products, driver):
+            break
+        visited.append(n)
+    assert visited == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_fanout_keeps_going_while_new_pages_appear(monkeypatch):
+    monkeypatch.setattr(fanout.random, "uniform", lambda a, b: 0)
+    monkeypatch.setitem(retry._breakers, "infotec", retry.CircuitBreaker("infotec"))
+    monkeypatch.delenv("SCRAPER_EXPORT_DIR", raising=False)
+
+    first = FakeDriver(total=7)
+    pager = Paginator("infotec", url, max_pages=3)
+    catalog = Run("infotec")
+    for n, target in pager:
+        products = first.load(target)
+        assert pager.accept(products, first)
+        catalog.add(products)
+        break
+    # En la página 1 solo se ven los números 1..3.
+    assert pager.last_page == 3
+
+    lock = threading.Lock()
+    loaded = []
+
+    opened = []
+    live = []
+
+    def scrape(driver, target):
+        with lock:
+            loaded.append(target)
+            live.append(sum(not d.closed for d in [first] + opened))
+        return driver.load(target)
+
+
+    def setup_driver():
+        opened.append(FakeDriver(total=7))
+        return opened[-1]
+
+    fanout.run_pages("infotec", pager, scrape, setup_driver, 2, catalog, driver=first)
+    # El driver de la primera página lo toma un worker: con 2 workers nunca hay 3 navegadores abiertos.
+    assert max(live) == 2
+    assert first.closed and all(d.closed for d in opened)
+    assert len(catalog.products) == 7 * 3
+    assert [p["url"] for p in catalog.products][-1] == "https://infotec.pe/p/7-2"
+    assert catalog.complete
+    assert url(7) in loaded
+
+
+def test_domain_slot_is_released_during_backoff(monkeypatch):
+    held = []
+    monkeypatch.setitem(retry._breakers, "infotec", retry.CircuitBreaker("infotec"))
+    monkeypatch.setattr(fanout.random, "uniform", lambda a, b: 0)
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(fanout, "_domain_slots", lambda store: slots)
+
+    def sleep(seconds):
+        # Durante la espera entre reintentos el cupo tiene que estar libre.
+        free = slots.acquire(blocking=False)
+        if free:
+            slots.release()
+        held.append(not free)
+
+    monkeypatch.setattr(retry.time, "sleep", sleep)
+    attempts = []
+
+    def scrape(driver, target):
+        attempts.append(target)
+        if len(attempts) == 1:
+            raise TimeoutError("lento")
+        return page(1)
+
+    assert fanout.run("infotec", [url(1)], scrape, lambda: FakeDriver(total=1), 1) == [page(1)]
+    assert held and not any(held)
@@ -0,0 +1,124 @@
+import types
+
+from core import plugins, retry
+from core.plugins import StorePlugin
+
+
+def page(n):
+    return [{"url": f"https://fake.pe/p/{n}-{i}", "name": f"P{n}-{i}"} for i in range(2)]
+
+
+def fake_plugin(monkeypatch, scrape_page, paginated=True, units=None):
+    module = types.SimpleNamespace(
+        READY_SELECTOR=".grilla",
+        TOTAL_PAGES=10,
+        page_url=lambda n: f"https://fake.pe/?page={n}",
+        listing_units=lambda: units or [(f"https://fake.pe/?page={n}",) for n in range(1, 11)],
+        scrape_page=scrape_page,
+    )
+    plugin = StorePlugin("fake", "fake.module", lambda m, html, *unit: [], "scroll", paginated=paginated)
+    plugin._module = module
+    monkeypatch.setitem(plugins.REGISTRY, "fake", plugin)
+    monkeypatch.setattr(retry.time, "sleep", lambda s: None)
+    monkeypatch.setitem(retry._breakers, "fake", retry.CircuitBreaker("fake"))
+    monkeypatch.delenv("SCRAPER_EXPORT_DIR", raising=False)
+    return plugin
+
+
+def test_ready_comes_from_the_script(monkeypatch):
+    plugin = fake_plugin(monkeypatch, lambda driver, url: [])
+    assert plugin.ready == ".grilla"
+
+
+def test_paginated_run_stops_at_repeated_page(monkeypatch):
+    visited = []
+
+    def scrape_page(driver, url):
+        n = int(url.rsplit("=", 1)[1])
+        visited.append(n)
+        return page(min(n, 3))
+
+    fake_plugin(monkeypatch, scrape_page)
+    result = plugins.run(["fake"], driver=object())["fake"]
+    assert visited == [1, 2, 3, 4]
+    assert len(result.products) == 6
+    assert result.complete
+
+
+def test_paginated_run_stops_at_empty_page(monkeypatch):
+    visited = []
+
+    def scrape_page(driver, url):
+        n = int(url.rsplit("=", 1)[1])
+        visited.append(n)
+        if n > 2:
+            raise retry.EmptyPage("sin productos")
+        return page(n)
+
+    fake_plugin(monkeypatch, scrape_page)
+    result = plugins.run(["fake"], driver=object())["fake"]
+    assert visited == [1, 2, 3]
+    assert len(result.products) == 4
+
+
+def test_unit_errors_mark_the_run_incomplete(monkeypatch):
+    def scrape_page(driver, url, category):
+        if category == "B":
+            raise ValueError("selector roto")
+        return page(category)
+
+    units = [("https://fake.pe/a", "A"), ("https://fake.pe/b", "B"), ("https://fake.pe/c", "C")]
+    fake_plugin(monkeypatch, scrape_page, paginated=False, units=units)
+    result = plugins.run(["fake"], driver=object())["fake"]
+    assert len(result.products) == 4
+    assert not result.complete
+
+
+class Driver:
+    def __init__(self, store, log):
+        self.store = store
+        self.log = log
+        log.append(("open", store))
+
+    def quit(self):
+        self.log.append(("quit", self.store))
+
+
+def two_stores(monkeypatch, log):
+    seen, registered = {}, {}
+    for name in ("fake", "other"):
+        def scrape_page(driver, url, name=name):
+            seen.setdefault(name, driver.store)
+            raise retry.EmptyPage("sin productos")
+
+        plugin = fake_plugin(monkeypatch, scrape_page)
+        plugin.name = name
+        plugin._module.setup_driver = lambda name=name: Driver(name, log)
+        registered[name] = plugin
+        monkeypatch.setitem(retry._breakers, name, retry.CircuitBreaker(name))
+    # fake_plugin registra siempre como "fake": se vuelve a registrar cada una con su nombre.
+    for name, plugin in registered.items():
+        monkeypatch.setitem(plugins.REGISTRY, name, plugin)
+    monkeypatch.delenv("SCRAPER_BROWSERD", raising=False)
+    monkeypatch.delenv("SCRAPER_BACKEND", raising=False)
+    return seen
+
+
+def test_each_store_gets_its_own_driver_when_settings_differ(monkeypatch):
+    log = []
+    seen = two_stores(monkeypatch, log)
+    monkeypatch.setenv("OTHER_PAGE_LOAD", "none")
+    monkeypatch.setenv("SCRAPER_PROFILES", "0")
+    plugins.run(["fake", "other"])
+    assert seen == {"fake": "fake", "other": "other"}
+    assert log == [("open", "fake"), ("quit", "fake"), ("open", "other"), ("quit", "other")]
+
+
+def test_stores_with_the_same_settings_share_the_driver(monkeypatch):
+    log = []
+    seen = two_stores(monkeypatch, log)
+    monkeypatch.delenv("OTHER_PAGE_LOAD", raising=False)
+    monkeypatch.setenv("SCRAPER_PROFILES", "0")
+    plugins.run(["fake", "other"])
+    assert seen == {"fake": "fake", "other": "fake"}
+    assert log == [("open", "fake"), ("quit", "fake")]
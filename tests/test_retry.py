@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from core import retry
+from core.retry import BLOCK, DRIVER_CRASH, TIMEOUT, CircuitBreaker, CircuitOpen, PageBlocked
+
+
+def test_classify():
+    assert retry.classify(PageBlocked("captcha")) == BLOCK
+    assert retry.classify(TimeoutError()) == TIMEOUT
+    assert retry.classify(ConnectionError()) == DRIVER_CRASH
+    assert retry.classify(RuntimeError("chrome not reachable")) == DRIVER_CRASH
+    assert retry.classify(ValueError("selector roto")) == retry.ERROR
+
+
+def test_opens_after_consecutive_failures_of_one_kind():
+    circuit = CircuitBreaker("hp")
+    circuit.record_failure(TIMEOUT)
+    circuit.record_failure(BLOCK)
+    circuit.record_failure(retry.ERROR)  # sin umbral: no cuenta
+    assert circuit.allow()
+
+    circuit.record_success()
+    circuit.record_failure(BLOCK)
+    assert circuit.allow()
+    circuit.record_failure(BLOCK)
+    assert not circuit.allow()
+
+
+def test_half_open_reopens_on_first_failure_and_closes_on_success():
+    circuit = CircuitBreaker("hp", cooldown=60)
+    circuit.open_until = time.time() - 1  # enfriamiento vencido
+    assert circuit.allow()
+    circuit.record_failure(TIMEOUT)
+    assert not circuit.allow()
+
+    circuit.open_until = time.time() - 1
+    circuit.record_success()
+    assert circuit.open_until == 0.0
+    circuit.record_failure(TIMEOUT)
+    assert circuit.allow()
+
+
+def test_state_survives_between_runs(tmp_path):
+    state = str(tmp_path / "circuitos.json")
+    first = CircuitBreaker("hp", state_file=state)
+    for _ in range(2):
+        first.record_failure(BLOCK)
+    CircuitBreaker("asus", state_file=state).record_failure(TIMEOUT)
+
+    assert not CircuitBreaker("hp", state_file=state).allow()
+    assert CircuitBreaker("asus", state_file=state).allow()
+
+    first.record_success()
+    assert CircuitBreaker("hp", state_file=state).allow()
+
+
+def test_call_retries_then_stops_at_open_circuit(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda s: None)
+    monkeypatch.setitem(retry._breakers, "hp", CircuitBreaker("hp"))
+    calls = []
+
+    def blocked():
+        calls.append(1)
+        raise PageBlocked("captcha")
+
+    with pytest.raises(PageBlocked):
+        retry.call("hp", blocked)
+    # El segundo bloqueo abre el circuito: no hay tercer intento y el siguiente call ni entra.
+    assert len(calls) == 2
+    with pytest.raises(CircuitOpen):
+        retry.call("hp", blocked)
+    assert len(calls) == 2
+
+
+def test_empty_page_is_not_retried_unless_the_store_asks(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda s: None)
+    monkeypatch.setitem(retry._breakers, "hp", CircuitBreaker("hp"))
+    calls = []
+
+    def empty():
+        calls.append(1)
+        raise retry.EmptyPage("0 productos")
+
+    with pytest.raises(retry.EmptyPage):
+        retry.call("hp", empty)
+    assert len(calls) == 1
+
+    with pytest.raises(retry.EmptyPage):
+        retry.call("hp", empty, policy=retry.RetryPolicy(attempts={retry.EMPTY: 3}))
+    assert len(calls) == 4
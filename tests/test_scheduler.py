@@ -0,0 +1,52 @@
+import time
+
+from core.scheduler import DEFAULT_COST_S, HOUR, FreshnessScheduler
+from core.workqueue import SQLiteQueue
+
+ASUS_URL = "https://www.asus.com/pe/laptops/for-gaming/all-series/"
+
+
+def products(price):
+    return [{"url": "https://x.pe/p/1", "price": price}, {"url": "https://x.pe/p/2", "price": "S/ 10"}]
+
+
+def test_plan_on_empty_db_uses_seeds_with_their_args(tmp_path):
+    with FreshnessScheduler(str(tmp_path / "f.db")) as scheduler:
+        selected = scheduler.plan(10, seeds=[("asus", ASUS_URL, ("Gaming",)), ("hp", "https://hp/p1")])
+    assert [(e["store"], e["unit"], e["args"]) for e in selected] == [
+        ("asus", ASUS_URL, ["Gaming"]), ("hp", "https://hp/p1", []),
+    ]
+
+
+def test_plan_respects_budget(tmp_path):
+    seeds = [("hp", f"https://hp/p{i}") for i in range(10)]
+    with FreshnessScheduler(str(tmp_path / "f.db")) as scheduler:
+        selected = scheduler.plan(DEFAULT_COST_S * 3 / 60, seeds=seeds)
+    assert len(selected) == 3
+
+
+def test_recorded_args_survive_queue_round_trip(tmp_path):
+    with SQLiteQueue(str(tmp_path / "q.db")) as queue, FreshnessScheduler(str(tmp_path / "f.db")) as scheduler:
+        queue.enqueue("job", [("asus", ASUS_URL, ["Gaming"])])
+        unit = queue.lease("job", "w1")[0]
+        assert unit["args"] == ["Gaming"]
+        queue.complete(unit["id"], "w1", products("S/ 1"))
+        assert scheduler.record_queue(queue, "job") == 1
+
+        estimate = scheduler.estimates()[0]
+        assert estimate["args"] == ["Gaming"]
+
+        # Vencida, vuelve a encolarse con la categoría.
+        selected = scheduler.plan(10, now=time.time() + 30 * 24 * HOUR)
+        queue.enqueue("job2", [(e["store"], e["unit"], e["args"]) for e in selected])
+        assert queue.lease("job2", "w1")[0]["args"] == ["Gaming"]
+
+
+def test_changing_unit_gets_a_higher_rate(tmp_path):
+    with FreshnessScheduler(str(tmp_path / "f.db")) as scheduler:
+        for i in range(6):
+            scheduler.record("hp", "stable", products("S/ 1"), observed_at=i * HOUR)
+            scheduler.record("hp", "busy", products(f"S/ {i}"), observed_at=i * HOUR)
+        rates = {e["unit"]: e["rate_per_hour"] for e in scheduler.estimates(now=6 * HOUR)}
+    assert rates["busy"] > rates["stable"]
+
@@ -0,0 +1,60 @@
+from core import scrolling
+
+
+class GrowingPage:
+    """
+    Listado con scroll infinito: cada scroll agrega `grow` px al documento.
+    """
+
+    def __init__(self, height=2000, grow=0):
+        self.height = height
+        self.grow = grow
+        self.scrolls = []
+
+    def execute_script(self, script, *args):
+        if script == scrolling.PENDING_JS:
+            return [0, self.height]
+        if script.startswith("return document.body.scrollHeight"):
+            return self.height
+        if script.startswith("window.scrollTo"):
+            self.scrolls.append(script)
+            self.height += self.grow
+        return None
+
+
+def no_wait(monkeypatch):
+    monkeypatch.setenv("SCRAPER_SCROLL_ADAPT", "0")
+    monkeypatch.setattr(scrolling.time, "sleep", lambda s: None)
+
+
+def test_finite_page_scrolls_to_the_bottom(monkeypatch):
+    no_wait(monkeypatch)
+    page = GrowingPage(height=2000)
+    stats = scrolling.scroll("hp", page)
+    assert stats["steps"] == 4 and not stats["capped"]
+    assert page.scrolls[-1] == "window.scrollTo(0, document.body.scrollHeight);"
+
+
+def test_infinite_page_stops_at_max_steps(monkeypatch):
+    no_wait(monkeypatch)
+    page = GrowingPage(height=2000, grow=1000)
+    stats = scrolling.scroll("realplaza", page)
+    assert stats["capped"]
+    assert stats["steps"] == scrolling.STORE_LIMITS["realplaza"]["max_steps"]
+    # Cortado por el tope: no salta al fondo.
+    assert "document.body.scrollHeight" not in page.scrolls[-1]
+
+
+def test_infinite_page_stops_at_max_seconds(monkeypatch, tmp_path):
+    no_wait(monkeypatch)
+    monkeypatch.setenv("SCRAPER_SCROLL_ADAPT", "1")
+    path = tmp_path / "scroll.json"
+    monkeypatch.setenv("SCRAPER_SCROLL_FILE", str(path))
+    scrolling.save_tuning("oechsle", {"max_steps": 1000, "max_seconds": 5})
+    clock = iter(range(0, 1000))
+    monkeypatch.setattr(scrolling.time, "monotonic", lambda: next(clock))
+
+    stats = scrolling.scroll("oechsle", GrowingPage(height=2000, grow=1000))
+    assert stats["capped"] and stats["steps"] < 5
+    # Lo aprendido no pisa los topes fijados a mano.
+    assert scrolling.load_tuning()["oechsle"]["max_seconds"] == 5
@@ -0,0 +1,47 @@
+import pytest
+
+from core import specs
+from core.specs import SAMPLE_NAMES, extract_specs
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("ASUS ROG Strix G16 G614JV-N3094W i7-13650HX 16GB DDR5 1TB SSD RTX 4060 16\"",
+     {"cpu_family": "Core i7", "cpu_gen": 13, "ram_gb": 16, "ssd_gb": 1024, "gpu": "RTX 4060", "screen_in": 16.0}),
+    ("Laptop ASUS Zenbook 14 OLED Intel Core Ultra 7 155H 32GB 1TB Intel Arc 14\"",
+     {"cpu_family": "Core Ultra 7", "cpu_gen": 1, "ram_gb": 32, "ssd_gb": 1024, "gpu": "Intel Arc", "screen_in": 14.0}),
+    ("Laptop Acer Aspire 5 Intel Core i7 12va Gen 16GB 512GB Iris Xe 14 pulgadas",
+     {"cpu_family": "Core i7", "cpu_gen": 12, "ram_gb": 16, "ssd_gb": 512, "gpu": "Intel Iris Xe", "screen_in": 14.0}),
+    ("Apple MacBook Air 13.6'' Chip M2 8GB 256GB SSD",
+     {"cpu_family": "M2", "cpu_gen": 2, "ram_gb": 8, "ssd_gb": 256, "gpu": None, "screen_in": 13.6}),
+])
+def test_extract_specs(name, expected):
+    assert extract_specs(name) == expected
+
+
+@pytest.mark.parametrize("name, ssd_gb", [
+    ("Lenovo 1TB HDD 8GB", None),
+    ("Lenovo HDD de 1TB 8GB RAM", None),
+    ("Laptop HP 1TB HDD + 256GB SSD 8GB", 256),
+    ("HP 15 Core i5 8GB 1TB", 1024),
+])
+def test_hdd_capacity_is_not_ssd(name, ssd_gb):
+    result = extract_specs(name)
+    assert result["ssd_gb"] == ssd_gb
+    assert result["ram_gb"] == 8
+
+
+def test_slow_rows_are_counted_not_truncated(monkeypatch):
+    fast = specs.benchmark(SAMPLE_NAMES, rounds=1)
+    # Cada fila "tarda" 1 s: todas pasan el presupuesto pero se extraen completas.
+    clock = iter(range(0, 10 ** 15, 10 ** 9))
+    monkeypatch.setattr(specs.time, "perf_counter_ns", lambda: next(clock))
+    slow = specs.benchmark(SAMPLE_NAMES, rounds=1)
+    assert slow["p50_us"] == 10 ** 6
+    assert slow["over_budget"] == len(SAMPLE_NAMES)
+    assert slow["coverage"] == fast["coverage"]
+
+
+def test_benchmark_reports_over_budget_without_truncating():
+    report = specs.benchmark(SAMPLE_NAMES, budget_us=0, rounds=1)
+    assert report["over_budget"] == len(SAMPLE_NAMES)
+    assert report["coverage"]["screen_in"] == 1.0
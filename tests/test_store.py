@@ -0,0 +1,66 @@
+from core.output import Run
+from core.store import ProductStore
+
+
+def item(n, price="S/ 100"):
+    return {"name": f"Laptop {n}", "url": f"https://x.pe/p/{n}", "price": price, "image_url": f"https://x.pe/{n}.jpg"}
+
+
+def test_sync_reports_new_changed_removed_and_unchanged(tmp_path):
+    with ProductStore(str(tmp_path / "p.db")) as db:
+        assert db.sync("hp", [item(1), item(2), item(3)], timestamp=100) == {
+            "new": 3, "changed": 0, "removed": 0, "unchanged": 0,
+        }
+        summary = db.sync("hp", [item(1), item(2, price="S/ 90"), item(4)], timestamp=200)
+        assert summary == {"new": 1, "changed": 1, "removed": 1, "unchanged": 1}
+
+        kinds = {(c["product_id"], c["kind"]) for c in db.changes_since(150, "hp")}
+        assert kinds == {("https://x.pe/p/2", "changed"), ("https://x.pe/p/4", "new"), ("https://x.pe/p/3", "removed")}
+        assert {p["url"] for p in db.current("hp")} == {"https://x.pe/p/1", "https://x.pe/p/2", "https://x.pe/p/4"}
+
+
+def test_incomplete_sync_keeps_unseen_products(tmp_path):
+    with ProductStore(str(tmp_path / "p.db")) as db:
+        db.sync("hp", [item(1), item(2), item(3)], timestamp=100)
+        summary = db.sync("hp", [item(1)], timestamp=200, mark_removed=False)
+        assert summary["removed"] == 0
+        assert len(db.current("hp")) == 3
+
+
+def test_failed_run_does_not_mark_removed(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "p.db")
+    monkeypatch.setenv("SCRAPER_DB", db_path)
+    monkeypatch.delenv("SCRAPER_EXPORT_DIR", raising=False)
+
+    first = Run("hp")
+    first.add([item(1), item(2)])
+    first.save(str(tmp_path / "hp.json"))
+
+    # La página 2 se bloqueó: la corrida solo vio el producto 1.
+    second = Run("hp")
+    second.add([item(1)])
+    second.fail("Tienda bloqueada")
+    assert not second.complete
+    assert second.save(str(tmp_path / "hp.json"))["removed"] == 0
+
+    third = Run("hp")
+    third.add([item(1)])
+    assert third.save(str(tmp_path / "hp.json"))["removed"] == 1
+
+    with ProductStore(db_path) as db:
+        assert [p["url"] for p in db.current("hp")] == ["https://x.pe/p/1"]
+
+
+def vtex(size, price="S/ 100"):
+    return {"name": "Laptop", "url": "https://oechsle.pe/laptop/p", "price": price,
+            "image_url": f"https://oechsle.vteximg.com.br/arquivos/ids/123-{size}-{size}/laptop.jpg"}
+
+
+def test_vtex_resize_is_not_a_change(tmp_path):
+    with ProductStore(str(tmp_path / "p.db")) as db:
+        db.sync("oechsle", [vtex(300)], timestamp=100)
+        assert db.sync("oechsle", [vtex(500)], timestamp=200)["unchanged"] == 1
+        assert db.changes_since(150, "oechsle") == []
+        assert db.current("oechsle")[0]["image_url"].endswith("123-500-500/laptop.jpg")
+
+        assert db.sync("oechsle", [vtex(500, price="S/ 90")], timestamp=400)["changed"] == 1